@@ -0,0 +1,200 @@
+#!/usr/bin/env python
+# encoding: utf-8
+
+
+import hashlib
+import io
+import json
+import logging
+import os
+import random
+import sys
+import tempfile
+import time
+from benchmarks.scenarios import SCENARIOS
+from elevator_simulation.generators.json import write_simulation
+from elevator_simulation.generators.binary import write_simulation as write_binary_simulation
+from elevator_simulation.readers.json import ENGINES, read_simulation
+from elevator_simulation.readers.binary import read_simulation as read_binary_simulation
+from elevator_simulation.sinks import CsvTripSink
+from generate_simulation import generate_simulation
+
+logger = logging.getLogger(__name__)
+
+BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+PHASES = ("load_secs", "run_secs", "output_secs")
+
+
+def get_args():
+    from argparse import ArgumentParser
+    parser = ArgumentParser(description="Runs the reference scenarios and compares their timings with a baseline.")
+    parser.add_argument("-v", "--verbose", default=0, action="count", help="the logging verbosity (more gives more detail)")
+    parser.add_argument("-s", "--scenario", nargs="+", default=["small", "tall"], choices=sorted(SCENARIOS), help="the scenarios to run (default: %(default)s)")
+    parser.add_argument("--format", default="json", choices=["json", "binary"], help="the format the scenarios are loaded from (default: %(default)s)")
+    parser.add_argument("--fast_forward", action="store_true", help="run the scenarios in fast forward mode")
+    parser.add_argument("--engine", nargs="+", default=["simpy"], choices=sorted(ENGINES), help="the engines running the scenarios, one after the other on the same scenario files, so that their timings compare (default: %(default)s)")
+    parser.add_argument("-r", "--repeat", default=1, type=int, help="the number of times each scenario runs, the fastest run counts (default: %(default)s)")
+    parser.add_argument("--baseline", default=BASELINE, help="the baseline json file (default: benchmarks/baseline.json)")
+    parser.add_argument("--update_baseline", action="store_true", help="store the results in the baseline instead of comparing with it")
+    parser.add_argument("--tolerance", default=0.25, type=float, help="the relative slowdown of a phase reported as a regression (default: %(default)s)")
+    parser.add_argument("--min_secs", default=0.05, type=float, help="slowdowns of less seconds than this are never regressions (default: %(default)s)")
+    args = parser.parse_args()
+
+    if args.verbose >= 1:
+        level = logging.DEBUG
+    else:
+        level = logging.INFO
+
+    logging.basicConfig(format="%(levelname)s %(asctime)s: %(message)s")
+    logger.setLevel(level)
+
+    return args
+
+
+def benchmark_key(name, fmt="json", fast_forward=False, engine="simpy"):
+    """returns the key of the results of a scenario run in the given mode, in the baseline"""
+    return "{}/{}{}{}".format(name, fmt, "/fast_forward" if fast_forward else "", "" if engine == "simpy" else "/" + engine)
+
+
+def write_scenario(name, directory, fmt="json"):
+    """generates the named reference scenario and writes it to a file in the directory
+
+    :param name str: the name of the scenario in SCENARIOS
+    :param directory str: the directory the file is written to
+    :param fmt str: json or binary (def: json)
+    :rtype str: the path of the scenario file
+    """
+    simulation = generate_simulation(**SCENARIOS[name])
+    if fmt == "binary":
+        filename = os.path.join(directory, name + ".sim")
+        with open(filename, "wb") as fh:
+            write_binary_simulation(simulation, fh)
+    else:
+        filename = os.path.join(directory, name + ".json")
+        with open(filename, "w", encoding="utf-8") as fh:
+            write_simulation(simulation, fh)
+    return filename
+
+
+def run_benchmark(filename, seed=None, fast_forward=False, engine="simpy"):
+    """loads, runs and writes out the trips of a simulation, timing each phase
+
+    :param filename str: the json or binary scenario file
+    :param seed int: the seed of the random number generator the simulation uses (def: None, unseeded)
+    :param fast_forward bool: run the simulation in fast forward mode (def: False)
+    :param engine str: the engine running the simulation, see readers.json.ENGINES (def: simpy)
+    :rtype dict: the time of each phase in seconds, the number of trips and events, the events processed per second
+    of the run phase and a checksum of the trips written out
+    """
+    random.seed(seed)
+    trips = []
+
+    start = time.perf_counter()
+    if filename.endswith(".sim"):
+        simulation = read_binary_simulation(filename, trip_complete=trips.append, engine=engine)
+    else:
+        simulation = read_simulation(filename, trip_complete=trips.append, engine=engine)
+    load_secs = time.perf_counter() - start
+
+    simulation.fast_forward = fast_forward
+    start = time.perf_counter()
+    simulation.run()
+    run_secs = time.perf_counter() - start
+
+    start = time.perf_counter()
+    output = io.StringIO()
+    with CsvTripSink(output) as sink:
+        for trip in trips:
+            sink.append(trip)
+    output_secs = time.perf_counter() - start
+
+    events = simulation.env.processed
+    return {"load_secs": load_secs,
+            "run_secs": run_secs,
+            "output_secs": output_secs,
+            "trips": len(trips),
+            "events": events,
+            "events_per_sec": events / run_secs if run_secs else 0.0,
+            "checksum": hashlib.sha1(output.getvalue().encode("utf-8")).hexdigest()}
+
+
+def compare(result, baseline, tolerance=0.25, min_secs=0.05):
+    """compares the results of a scenario with its baseline
+
+    :param result dict: the results of run_benchmark
+    :param baseline dict: the baseline results of the same scenario
+    :param tolerance float: the relative slowdown of a phase reported as a regression (def: 0.25)
+    :param min_secs float: slowdowns of less seconds than this are never regressions (def: 0.05)
+    :rtype tuple: the list of regressions and the list of changes in what was simulated, as messages
+    """
+    regressions = []
+    for phase in PHASES:
+        slowdown = result[phase] - baseline[phase]
+        if slowdown > min_secs and slowdown > tolerance * baseline[phase]:
+            regressions.append("{} took {:.3f}s, {:.0%} over the baseline {:.3f}s".format(
+                phase, result[phase], slowdown / baseline[phase], baseline[phase]))
+
+    changes = []
+    for key in ("trips", "events", "checksum"):
+        if result[key] != baseline[key]:
+            changes.append("{} changed from {} to {}".format(key, baseline[key], result[key]))
+    return regressions, changes
+
+
+def load_baseline(filename):
+    """returns the baseline results by benchmark key, empty if the file does not exist"""
+    if not os.path.exists(filename):
+        return dict()
+    with open(filename, "r", encoding="utf-8") as fh:
+        return json.load(fh)
+
+
+def save_baseline(filename, baseline):
+    with open(filename, "w", encoding="utf-8") as fh:
+        json.dump(baseline, fh, indent=2, sort_keys=True)
+        fh.write("\n")
+
+
+def main():
+    args = get_args()
+    baseline = load_baseline(args.baseline)
+    regressed = False
+
+    print("{:<28} {:>9} {:>9} {:>9} {:>9} {:>10} {:>12}".format("scenario", "load", "run", "output", "trips", "events", "events/sec"))
+    with tempfile.TemporaryDirectory() as directory:
+        for name in args.scenario:
+            logger.info("generating the {} scenario".format(name))
+            filename = write_scenario(name, directory, args.format)
+            for engine in args.engine:
+                key = benchmark_key(name, args.format, args.fast_forward, engine)
+                result = None
+                for _ in range(args.repeat):
+                    logger.debug("running {}".format(key))
+                    run = run_benchmark(filename, SCENARIOS[name].get("seed"), args.fast_forward, engine)
+                    if result is None or run["run_secs"] < result["run_secs"]:
+                        result = run
+                print("{:<28} {:>8.3f}s {:>8.3f}s {:>8.3f}s {:>9} {:>10} {:>12.0f}".format(
+                    key, result["load_secs"], result["run_secs"], result["output_secs"], result["trips"],
+                    result["events"], result["events_per_sec"]))
+
+                if args.update_baseline:
+                    baseline[key] = result
+                elif key in baseline:
+                    regressions, changes = compare(result, baseline[key], args.tolerance, args.min_secs)
+                    for message in changes:
+                        logger.warning("{}: {}".format(key, message))
+                    for message in regressions:
+                        logger.error("{}: regression, {}".format(key, message))
+                    regressed = regressed or bool(regressions)
+                else:
+                    logger.warning("{}: no baseline to compare with".format(key))
+
+    if args.update_baseline:
+        save_baseline(args.baseline, baseline)
+        logger.info("baseline written to {}".format(args.baseline))
+    elif regressed:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,16 @@
+#!/usr/bin/env python
+# encoding: utf-8
+
+
+# the reference scenarios, as arguments of generate_simulation.generate_simulation; each is generated from its seed,
+# so every run of a scenario simulates the very same building, elevators and schedules
+SCENARIOS = {
+    "small": dict(people=1000, lunch_on_floor=[5], floors=10,
+                  num_elevator_banks=1, num_elevators_per_bank=4, seed=1),
+    "tall": dict(people=1000, lunch_on_floor=[25], floors=50,
+                 num_elevator_banks=2, num_elevators_per_bank=4, call_strategy="call_strategy_all", seed=2),
+    "medium": dict(people=10000, lunch_on_floor=[10, 30], floors=40,
+                   num_elevator_banks=4, num_elevators_per_bank=6, seed=3),
+    "large": dict(people=100000, lunch_on_floor=[25, 50, 75], floors=100,
+                  num_elevator_banks=8, num_elevators_per_bank=8, seed=4),
+}
@@ -0,0 +1,48 @@
+#!/usr/bin/env python
+# encoding: utf-8
+
+import json
+import logging
+from elevator_simulation.generators.binary import write_scenario
+from elevator_simulation.readers.binary import BinaryScenario, is_binary_simulation
+
+
+logger = logging.getLogger(__name__)
+
+
+def get_args():
+    from argparse import ArgumentParser
+    parser = ArgumentParser(description="Converts a simulation file between the json and the binary scenario formats.")
+    parser.add_argument("-v", "--verbose", action="count", help="the logging verbosity (more gives more detail)")
+    parser.add_argument("-i", "--input_file", required=True, help="the simulation file to convert, binary files are converted to json and json files to binary")
+    parser.add_argument("-o", "--output_file", required=True, help="the converted simulation file")
+    args = parser.parse_args()
+
+    if args.verbose == 1:
+        level = logging.DEBUG
+    else:
+        level = logging.INFO
+
+    logging.basicConfig(format="%(levelname)s %(asctime)s: %(message)s")
+    logger.setLevel(level)
+
+    return args
+
+
+def main():
+    args = get_args()
+    if is_binary_simulation(args.input_file):
+        logger.info("converting binary scenario {} to json {}".format(args.input_file, args.output_file))
+        data = BinaryScenario(args.input_file).to_data()
+        with open(args.output_file, "w", encoding="utf-8") as fh:
+            json.dump(data, fh)
+    else:
+        logger.info("converting json {} to binary scenario {}".format(args.input_file, args.output_file))
+        with open(args.input_file, "r", encoding="utf-8") as fh:
+            data = json.load(fh)
+        with open(args.output_file, "wb") as fh:
+            write_scenario(data, fh)
+
+
+if __name__ == '__main__':
+    main()
@@ -1,8 +1,8 @@
 #!/usr/bin/env python
 # encoding: utf-8
 
-from elevator_simulation.agents.agent import AgentMixin
+from elevator_simulation.agents.agent import AgentMixin, Channel
 from elevator_simulation.agents.elevator import ElevatorBank, Elevator
 from elevator_simulation.agents.person import Person
 from elevator_simulation.agents.building import Building
-from elevator_simulation.agents.simulation import Simulation
+from elevator_simulation.agents.simulation import Simulation, Environment
@@ -2,13 +2,73 @@
 # encoding: utf-8
 
 
+class Channel(object):
+    """A broadcast channel: notifications wake everyone waiting on it and are passed to its subscribers.
+
+    The event processes wait on is only created once someone waits, and a notification nobody waits on or subscribes
+    to allocates nothing. When an event is needed, a single dispatcher among its callbacks invokes the subscribers in
+    the order they subscribed, so no list of callbacks is copied per notification. The dispatcher comes before the
+    waiters, unless they were already waiting when the first subscriber subscribed.
+    """
+
+    def __init__(self, env):
+        """creates a channel of the simpy environment
+
+        :param env Environment: the environment of the events the channel triggers
+        """
+        self.__env = env
+        self.__event = None  # the event the current waiters wait on, created on demand
+        self.__subscribers = []
+        self.notifications = 0  # number of notifications sent on the channel
+        self.deliveries = 0  # number of notifications that woke a waiter or reached a subscriber
+
+    def subscribe(self, callback):
+        """has the callback invoked with the triggered event on every notification
+
+        :param callback function: The function to invoke as a callback.
+        """
+        if not self.__subscribers and self.__event is not None:
+            self.__event.callbacks.append(self.__dispatch)
+        self.__subscribers.append(callback)
+
+    def wait(self):
+        """returns the event triggered, with the notified value, by the next notification"""
+        if self.__event is None:
+            self.__event = self.__env.event()
+            if self.__subscribers:
+                self.__event.callbacks.append(self.__dispatch)
+        return self.__event
+
+    @property
+    def waiting(self):
+        """True if an event is waiting for the next notification"""
+        return self.__event is not None
+
+    def notify(self, value=None):
+        """triggers the event of the current waiters with the value, subscribers are invoked when it is processed"""
+        self.notifications += 1
+        event = self.__event
+        if event is None:
+            if not self.__subscribers:
+                return
+            event = self.__env.event()
+            event.callbacks.append(self.__dispatch)
+        self.__event = None
+        self.deliveries += 1
+        event.succeed(value)
+
+    def __dispatch(self, event):
+        for callback in self.__subscribers:
+            callback(event)
+
+
 class AgentMixin(object):
     """Mixin class defining agents of a simpy simulation."""
 
     def __init__(self, simulation, events=[]):
         self.__simulation = simulation
-        self.__event_callbacks = {event: [] for event in events}
-        self.__events = {event: self.env.event() for event in events}
+        self.tracer = simulation.tracer  # checked in hot loops, hence a plain attribute
+        self.__channels = {event: Channel(self.env) for event in events}
 
     @property
     def simulation(self):
@@ -20,12 +80,16 @@ class AgentMixin(object):
         """the simpy environment under which the simulation is running"""
         return self.__simulation.env
 
-    def event(self, event_name):
-        """returns the events with the given name"""
-        if event_name not in self.__events:
+    def channel(self, event_name):
+        """returns the channel of the events with the given name"""
+        if event_name not in self.__channels:
             raise ValueError("No event '{}' exists for this agent".format(event_name))
 
-        return self.__events[event_name]
+        return self.__channels[event_name]
+
+    def event(self, event_name):
+        """returns the events with the given name"""
+        return self.channel(event_name).wait()
 
     def register_event_callback(self, event_name, callback):
         """registers an event callback for the given event
@@ -33,25 +97,11 @@ class AgentMixin(object):
         :param event_name str: Name of the event
         :param callback function: The function to invoke as a callback.
         """
-        if event_name not in self.__events:
-            raise ValueError("No event '{}' exists for this agent".format(event_name))
-
-        # appends to the callbacks
-        self.__events[event_name].callbacks.append(callback)
-
-        # saves for later
-        self.__event_callbacks[event_name].append(callback)
+        self.channel(event_name).subscribe(callback)
 
     def notify_event(self, event_name, value=None):
         """triggers the event owned by this event with the given event name
 
         :param event_name str: name of the event to notify
         """
-        if event_name not in self.__events:
-            raise ValueError("No event '{}' exists for this agent".format(event_name))
-
-        event = self.__events[event_name]
-        self.__events[event_name] = self.env.event()
-        for cb in self.__event_callbacks[event_name]:
-            self.__events[event_name].callbacks.append(cb)
-        event.succeed(value)
+        self.channel(event_name).notify(value)
@@ -1,47 +1,94 @@
 #!/usr/bin/env python
 # encoding: utf-8
 
-from elevator_simulation.agents import AgentMixin
+from elevator_simulation.agents import AgentMixin, Channel
 from elevator_simulation.models import ElevatorBank as ElevatorBankModel
 from elevator_simulation.models import Elevator as ElevatorModel
+from elevator_simulation.models import level_of
+from elevator_simulation.agents import trace
+import abc
 import logging
+import simpy
 
 
 logger = logging.getLogger(__name__)
 
 
-class ElevatorBank(AgentMixin, ElevatorBankModel):
-    """Docstring for ElevatorControllerAgent. """
+class ElevatorBankMixin(object):
+    """Mixin class for what an elevator bank agent decides, whichever engine runs it.
 
-    def __init__(self, sim, **kwargs):
-        """Constructs an elevator controller agent for simpy.
+    The bank has its elevators catch up with the clock before dispatching, cuts their fast forwarded legs short when
+    someone starts waiting on their way, and notifies the people waiting in the halls when its elevators open their
+    doors or move on. The agent provides the AgentMixin attributes and the ElevatorBank model, passes the hall events
+    of its elevators to _elevator_door_open and _elevator_moving_on, and waits on the hall channels the way its
+    engine waits.
+    """
 
-        The elevator controller agent has information about how the elevator controller operates in the simulation.
+    def __init__(self, channel_cls):
+        """
+        :param channel_cls class: the Channel class of the engine, hall events are broadcast on its channels
+        """
+        self.__channel_cls = channel_cls
+        self.__hall_events = {"elevator_door_open": dict(), "elevator_moving_on": dict()}
 
-        For example, the agent controls how quickly the elevator doors open and close, how quickly the elevators can
-        move.
+    def wait(self, person, floor, direction):
+        ElevatorBankModel.wait(self, person, floor, direction, self.env.now)
+        for elevator in self.elevators:
+            elevator.interrupt_leg(floor, direction)
+
+    def call_to(self, floor, direction, destination=None):
+        for elevator in self.elevators:
+            elevator.catch_up()
+        return ElevatorBankModel.call_to(self, floor, direction, destination)
+
+    def _hall_channel(self, event_name, floor, direction):
+        """returns the channel of the hall event of the floor and direction, created on demand
+
+        Hall events occur when one of the bank's elevators opens its doors for the people waiting on the floor to go
+        the direction ('elevator_door_open') or moves on from their floor ('elevator_moving_on').
+
+        :param event_name str: name of the event
+        :param floor Floor: the floor people wait on, or its level
+        :param direction int: the direction people wait to go
         """
-        AgentMixin.__init__(self, sim, events=["elevator_door_open", "elevator_moving_on"])
-        kwargs["elevator_cls"] = Elevator  # elevator class to instantiate on calls to add_elevator
-        ElevatorBankModel.__init__(self, sim.building.floors, **kwargs)
+        channels = self.__hall_events.get(event_name)
+        if channels is None:
+            raise ValueError("No hall event '{}' exists for this elevator bank".format(event_name))
+        if not direction:
+            raise ValueError("Not a valid direction: {}".format(direction))
+        key = (level_of(floor), 1 if direction > 0 else -1)
+        channel = channels.get(key)
+        if channel is None:
+            channel = channels[key] = self.__channel_cls(self.env)
+        return channel
 
-        self.register_event_callback("elevator_door_open", self.__elevator_door_open)
-        self.register_event_callback("elevator_moving_on", self.__elevator_moving_on)
+    def hall_channels(self):
+        """returns the (event name, level, direction, channel) of each hall channel created so far"""
+        return [(event_name, level, direction, channel) for event_name, channels in self.__hall_events.items()
+                for (level, direction), channel in channels.items()]
 
-    def __elevator_moving_on(self, event):
-        elevator = event.value
+    def _elevator_moving_on(self, elevator):
         direction = elevator.direction
-        logger.debug("elevator({}) is moving on, notifying all people waiting on floor({}) to go {}".format(elevator.uuid, elevator.location.level, direction))
-        for person in self.waiting_passengers(elevator.location, direction):
-            person.notify_event("elevator_moving_on", elevator)
+        if self.tracer.categories & trace.DISPATCH:
+            self.tracer.trace(self.env.now, trace.ELEVATOR_MOVING_ON, elevator.ident, elevator.level, direction)
+        self.__notify_hall("elevator_moving_on", elevator, direction)
 
-    def __elevator_door_open(self, event):
-        elevator = event.value
+    def _elevator_door_open(self, elevator):
         direction = elevator.next_direction
         if not direction:
-            direction = 1 if self.waiting_passengers(elevator.location, 1) else -1
-        for person in self.waiting_passengers(elevator.location, direction):
-            person.notify_event("elevator_door_open", elevator)
+            direction = 1 if self.has_waiting(elevator.level, 1) else -1
+        self.__notify_hall("elevator_door_open", elevator, direction)
+
+    def __notify_hall(self, event_name, elevator, direction):
+        """notifies the people waiting on the floor of the elevator to go the direction of the hall event
+
+        With destination dispatch, people waiting to go the other way are notified too: they only take the car they
+        were assigned, when it turns on their floor to go their way, and otherwise call again once it moved on, see
+        goes_their_way.
+        """
+        self._hall_channel(event_name, elevator.level, direction).notify(elevator)
+        if self.destination_dispatch:
+            self._hall_channel(event_name, elevator.level, -direction).notify(elevator)
 
     def _create_elevator(self, **kwargs):
         """wrapper for creating an elevator object"""
@@ -49,28 +96,212 @@ class ElevatorBank(AgentMixin, ElevatorBankModel):
         return self._elevator_cls(self.simulation, self.floors, **kwargs)
 
 
-class Elevator(AgentMixin, ElevatorModel):
-    """agent for an elevator"""
-    def __init__(self, sim, floors, **kwargs):
-        """Constructs an elevator agent for simpy
+class ElevatorMixin(abc.ABC):
+    """Mixin class for what an elevator agent decides, whichever engine runs it.
+
+    The elevator moves on toward its next stop, floor by floor or, fast forwarded, over as many floors as it can
+    travel without anything happening on the way. A fast forwarded leg is brought up to date with the clock when the
+    bank dispatches, and cut short when a stop is added, or someone starts waiting, on a floor still to pass. The
+    agent provides the AgentMixin attributes and the Elevator model, keeps the chain of its travel timeouts in
+    _travel, and implements _interrupt_leg to finish the step it is on when its leg is cut short.
+    """
 
+    def __init__(self, **kwargs):
+        """
         :param elevator_bank ElevatorBank: the owning elevator bank
         :param elevator_open_secs int: seconds it takes to open the elevator doors.
         :param elevator_close_secs int: seconds it takes to close the elevator doors.
         :param elevator_wait_secs int: seconds between the elevator doors opening and closing.
         :param elevator_travel_secs int: number of seconds to move between two levels in the building.
         """
-        AgentMixin.__init__(self, sim, events=["new_stop_added"])
-        ElevatorModel.__init__(self, floors, **kwargs)
-        self.action = self.env.process(self.run())
         self.__elevator_bank = kwargs["elevator_bank"]
-
+        self._travel = None  # chain of the travel timeouts since the last stop
+        self.__leg = None  # (start level, direction, step completion times) of a fast forwarded leg
 
         self.elevator_open_secs = kwargs.get("elevator_open_secs", 5)
         self.elevator_close_secs = kwargs.get("elevator_close_secs", 5)
         self.elevator_wait_secs = kwargs.get("elevator_wait_secs", 5)
         self.elevator_travel_secs = kwargs.get("elevator_travel_secs", 7)
 
+    def _move_on(self):
+        """moves on from the floor toward the next stop, turning if need be
+
+        :rtype int: the number of floors to travel in one go, more than one for a fast forwarded leg
+        """
+        tracer = self.tracer
+        self.__elevator_bank.notify_event("elevator_moving_on", self)
+        if tracer.categories & trace.MOVEMENT and self.direction != self.next_direction:
+            tracer.trace(self.env.now, trace.ELEVATOR_TURNING, self.ident, self.level, self.next_direction)
+        self.direction = self.next_direction
+        return self.__clear_steps() if self.simulation.fast_forward else 1
+
+    def __clear_steps(self):
+        """the number of floors ahead the elevator can travel without anything happening on the way
+
+        Travel ends on the nearest stop ahead, or earlier on a floor where people wait to go the same direction (any
+        direction with destination dispatch), since they are notified when the elevator moves on from their floor.
+        """
+        level, direction = self.level, self.direction
+        stop = self.nearest_stop_ahead()
+        if stop is None:
+            return 1
+        target = stop.level
+        for step, intermediate in enumerate(range(level + direction, target, direction), 1):
+            if self.__elevator_bank.hears_hall_events(intermediate, direction):
+                return step
+        return abs(target - level)
+
+    def _start_leg(self, steps):
+        """starts a fast forwarded leg of the given number of floors, travelled with a single timeout
+
+        :rtype list: the time each step completes, added up like the stepwise timeouts, the last one ends the leg
+        """
+        boundaries = []
+        at = self.env.now
+        for _ in range(steps):
+            at += self.elevator_travel_secs
+            boundaries.append(at)
+        self.__leg = (self.level, self.direction, boundaries)
+        return boundaries
+
+    def _finish_leg(self, boundaries):
+        """moves the elevator to the end of the leg of the given step completion times
+
+        :rtype bool: False if the leg was cut short in the meantime, and the elevator left where it was
+        :note: legs are told apart by their step completion times, which two legs of an elevator never share, so the
+        leg of an elevator restored from a snapshot is still recognised
+        """
+        if self.__leg is None or self.__leg[2] != boundaries:
+            return False
+        level, direction, _ = self.__leg
+        self.__leg = None
+        self.level = level + len(boundaries) * direction
+        return True
+
+    def travel_state(self):
+        """returns the chain of the travel timeouts and the fast forwarded leg as plain data, see checkpoint.snapshot"""
+        leg = self.__leg
+        return {"travel": list(self._travel) if self._travel is not None else None,
+                "leg": [leg[0], leg[1], list(leg[2])] if leg is not None else None}
+
+    def restore_travel(self, state):
+        """restores the chain of the travel timeouts and the fast forwarded leg given by travel_state"""
+        self._travel = list(state["travel"]) if state["travel"] is not None else None
+        leg = state["leg"]
+        self.__leg = (leg[0], leg[1], list(leg[2])) if leg is not None else None
+
+    def __completed_steps(self):
+        """the number of steps of the current leg a stepwise run would have completed by now"""
+        level, direction, boundaries = self.__leg
+        completed = 0
+        while completed < len(boundaries) and self.env.processed_before_active(boundaries[completed], self._travel):
+            completed += 1
+        return completed
+
+    def catch_up(self):
+        """brings the location of an elevator fast forwarding through a leg up to date with the simulation clock"""
+        if self.__leg is not None:
+            level, direction, boundaries = self.__leg
+            self.level = level + self.__completed_steps() * direction
+
+    def interrupt_leg(self, floor, direction=None):
+        """interrupts the current leg if the elevator still has to pass the floor, going the given direction
+
+        :param floor Floor: the floor of a new stop or of a new waiting person, or its level
+        :param direction int: the direction the person waits to go, None for a new stop, ignored with destination
+        dispatch
+        """
+        if self.__leg is None:
+            return
+        level, leg_direction, boundaries = self.__leg
+        if direction is not None and direction != leg_direction and not self.__elevator_bank.destination_dispatch:
+            return
+        completed = self.__completed_steps()
+        # the elevator is between the floor of the last completed step and the next one
+        if completed < (level_of(floor) - level) * leg_direction < len(boundaries):
+            self.__leg = None
+            self.level = level + completed * leg_direction
+            self._interrupt_leg(boundaries[completed])
+
+    @abc.abstractmethod
+    def _interrupt_leg(self, at):
+        """has the elevator finish the step it is on at the given time, its leg cut short, and carry on stepwise"""
+
+    def _floor_reached(self):
+        """notifies the passengers that the elevator reached a floor, in the order they got in"""
+        for person in self.riders:
+            person.notify_event("floor_reached", self.location)
+
+    def _doors_opened(self):
+        """opens the doors on the stop, notifying the passengers and the people waiting in the hall"""
+        self.open_doors()
+        self.remove_stop(self.level)
+        for person in self.riders:
+            person.notify_event("elevator_door_open", self)
+        self.__elevator_bank.notify_event("elevator_door_open", self)
+
+    @property
+    def total_elevator_travel_secs(self):
+        return self.elevator_travel_secs + self.elevator_open_secs + self.elevator_close_secs + self.elevator_wait_secs
+
+    def add_stop(self, floor, add=True):
+        """adds a new stop to the elevator and signals that it should start moving."""
+        ElevatorModel.add_stop(self, floor)
+        self.interrupt_leg(floor)
+        self.notify_event("new_stop_added")
+
+
+class ElevatorBank(ElevatorBankMixin, AgentMixin, ElevatorBankModel):
+    """Docstring for ElevatorControllerAgent. """
+
+    def __init__(self, sim, **kwargs):
+        """Constructs an elevator controller agent for simpy.
+
+        The elevator controller agent has information about how the elevator controller operates in the simulation.
+
+        For example, the agent controls how quickly the elevator doors open and close, how quickly the elevators can
+        move.
+        """
+        AgentMixin.__init__(self, sim, events=["elevator_door_open", "elevator_moving_on"])
+        kwargs["elevator_cls"] = Elevator  # elevator class to instantiate on calls to add_elevator
+        kwargs.setdefault("idents", sim.idents)
+        ElevatorBankModel.__init__(self, sim.building.floors, **kwargs)
+        ElevatorBankMixin.__init__(self, Channel)
+
+        self.register_event_callback("elevator_door_open", self.__elevator_door_open)
+        self.register_event_callback("elevator_moving_on", self.__elevator_moving_on)
+
+    def hall_event(self, event_name, floor, direction):
+        """returns the event that wakes the people waiting on the floor to go the direction
+
+        Everyone waiting there shares one event, triggered with the elevator as its value the next time the hall event
+        occurs, see ElevatorBankMixin._hall_channel.
+
+        :param event_name str: name of the event
+        :param floor Floor: the floor people wait on, or its level
+        :param direction int: the direction people wait to go
+        """
+        return self._hall_channel(event_name, floor, direction).wait()
+
+    def __elevator_moving_on(self, event):
+        self._elevator_moving_on(event.value)
+
+    def __elevator_door_open(self, event):
+        self._elevator_door_open(event.value)
+
+
+class Elevator(ElevatorMixin, AgentMixin, ElevatorModel):
+    """agent for an elevator"""
+    def __init__(self, sim, floors, **kwargs):
+        """Constructs an elevator agent for simpy
+
+        :note: see ElevatorMixin for the parameters
+        """
+        AgentMixin.__init__(self, sim, events=["new_stop_added"])
+        ElevatorModel.__init__(self, floors, **kwargs)
+        ElevatorMixin.__init__(self, **kwargs)
+        self.action = self.env.process(self.run())
+
     def run(self):
         while True:
             # wait until we add a new stop to the elevator
@@ -81,37 +312,57 @@ class Elevator(AgentMixin, ElevatorModel):
 
     def move(self):
         """moves toward the destination until it runs out of stops"""
-        while self.stops:
-            logger.debug("{}: elevator({}) moving {} on {}".format(self.env.now, self.uuid, self.direction, self.location))
-            if self.location not in self.stops:
-                self.__elevator_bank.notify_event("elevator_moving_on", self)
-                if self.direction != self.next_direction:
-                    logger.debug("{}: elevator({}) changed direction {}".format(self.env.now, self.uuid, self.next_direction))
-                self.direction = self.next_direction
-
-                # move to the next floor
-                yield self.env.timeout(self.elevator_travel_secs)
-                self.location = self.next_location
-                for person in self.passengers:
-                    person.notify_event("floor_reached", self.location)
-            else:
-                logger.debug("elevator({}) is located at a stop location".format(self.uuid))
-
-            if self.location in self.stops:
-                logger.debug("elevator is at stop {}, opening doors".format(self.location))
+        tracer = self.tracer
+        while self.has_stops:
+            if tracer.categories & trace.MOVEMENT:
+                tracer.trace(self.env.now, trace.ELEVATOR_MOVING, self.ident, self.level, self.direction or 0)
+            if not self.has_stop(self.level):
+                steps = self._move_on()
+                if steps > 1:
+                    yield from self.__fast_forward(steps)
+                else:
+                    # move to the next floor
+                    yield self.__travel_until(self.env.now + self.elevator_travel_secs)
+                    self.level = self.next_level
+                    self._floor_reached()
+
+            if self.has_stop(self.level):
+                if tracer.categories & trace.DOORS:
+                    tracer.trace(self.env.now, trace.ELEVATOR_AT_STOP, self.ident, self.level)
+                self._travel = None
                 yield from self.__open_doors()
                 yield from self.wait_for_passengers()
                 yield from self.__close_doors()
 
+        self._travel = None
         self.direction = 0  # idle, no more stops
 
+    def __travel_until(self, at):
+        """returns the timeout of travelling until the given time
+
+        The timeouts between two stops form a chain, so travel keeps its place among simultaneous events whether it
+        is stepwise or fast forwarded.
+        """
+        event, self._travel = self.env.timeout_at(at, self._travel)
+        return event
+
+    def __fast_forward(self, steps):
+        """travels the given number of floors with a single timeout, see ElevatorMixin"""
+        boundaries = self._start_leg(steps)
+        try:
+            yield self.__travel_until(boundaries[-1])
+            self._finish_leg(boundaries)
+        except simpy.Interrupt as interrupt:
+            yield self.__travel_until(interrupt.cause)
+            self.level = self.next_level
+        self._floor_reached()
+
+    def _interrupt_leg(self, at):
+        self.action.interrupt(at)
+
     def __open_doors(self):
         yield self.env.timeout(self.elevator_open_secs)
-        self.open_doors()
-        self.remove_stop(self.location)
-        for person in self.passengers:
-            person.notify_event("elevator_door_open", self)
-        self.__elevator_bank.notify_event("elevator_door_open", self)
+        self._doors_opened()
 
     def __close_doors(self):
         yield self.env.timeout(self.elevator_close_secs)
@@ -119,12 +370,3 @@ class Elevator(AgentMixin, ElevatorModel):
 
     def wait_for_passengers(self):
         yield self.env.timeout(self.elevator_wait_secs)
-
-    @property
-    def total_elevator_travel_secs(self):
-        return self.elevator_travel_secs + self.elevator_open_secs + self.elevator_close_secs + self.elevator_wait_secs
-
-    def add_stop(self, floor, add=True):
-        """adds a new stop to the elevator and signals that it should start moving."""
-        ElevatorModel.add_stop(self, floor)
-        self.notify_event("new_stop_added")
@@ -1,117 +1,387 @@
 #!/usr/bin/env python
 # encoding: utf-8
 
+import hashlib
+import random
+import struct
 from datetime import timedelta
+from operator import attrgetter
 from elevator_simulation.data import ElevatorTrip
-from elevator_simulation.data import to_csv
 from elevator_simulation.agents import AgentMixin
+from elevator_simulation.agents import trace
 from elevator_simulation.models import Person as PersonModel
 import logging
 
 
 logger = logging.getLogger(__name__)
 
+_start_time = attrgetter("start_time")  # the start time of a schedule event, see next_due_event
 
-def call_strategy_all(elevator_banks):
+
+def call_strategy_all(elevator_banks, rng=random):
     return tuple(elevator_banks)
 
 
-def call_strategy_random(elevator_banks):
-    import random
-    bank_index = random.randint(0, len(elevator_banks)-1)
+def call_strategy_random(elevator_banks, rng=random):
+    bank_index = rng.randint(0, len(elevator_banks)-1)
     return (elevator_banks[bank_index], )
 
 
-class Person(AgentMixin, PersonModel):
+CALL_STRATEGIES = {"call_strategy_all": call_strategy_all, "call_strategy_random": call_strategy_random}
+
+
+def get_call_strategy(name):
+    """returns the call strategy of the given name, see CALL_STRATEGIES"""
+    if name not in CALL_STRATEGIES:
+        raise ValueError("Unknown call strategy '{}', expected one of: {}".format(name, sorted(CALL_STRATEGIES)))
+    return CALL_STRATEGIES[name]
+
+
+class CallStream(object):
+    """The random numbers a person of a seeded simulation draws on one of its calls.
+
+    The stream is counter based: the j-th number of the n-th call of a person is a hash of (n, j) keyed by the seed
+    and the person. A person thus keeps nothing but the number of calls it made, the stream of any of its calls is
+    created in constant time, and the person draws the same numbers on its n-th call whatever the others do, whether
+    it is an agent or a row of an engine.PersonStore. It offers the methods of random.Random the call strategies use.
+    """
+
+    def __init__(self, seed, name, call):
+        """
+        :param seed int: the seed of the simulation
+        :param name str: what identifies the person from one run to the next, see Person
+        :param call int: the number of calls the person made before this one
+        """
+        self.__key = hashlib.blake2b("{}:{}".format(seed, name).encode("utf-8"), digest_size=16).digest()
+        self.__call = call
+        self.__draws = 0
+
+    def __next(self):
+        """returns the next 64 random bits"""
+        data = struct.pack("<QQ", self.__call, self.__draws)
+        self.__draws += 1
+        return int.from_bytes(hashlib.blake2b(data, digest_size=8, key=self.__key).digest(), "little")
+
+    def random(self):
+        """returns the next float in [0, 1)"""
+        return (self.__next() >> 11) * 2.0 ** -53
+
+    def randint(self, a, b):
+        """returns the next integer in [a, b], both included"""
+        return a + ((self.__next() * (b - a + 1)) >> 64)
+
+
+def call_stream(seed, name, calls):
+    """returns what a person draws from on the call following the given number of calls
+
+    :param seed int: the seed of the simulation, None for the shared random module of unseeded simulations
+    :param name str: what identifies the person from one run to the next, see Person
+    :param calls int: the number of calls the person made so far
+    """
+    return random if seed is None else CallStream(seed, name, calls)
+
+
+def stream_name(seed, uuid, index):
+    """returns what identifies a person to its call streams from one run to the next, see CallStream
+
+    :param seed int: the seed of the simulation, None for unseeded simulations, whose people need no name
+    :param uuid str: the uuid the person was given, None for none
+    :param index int: the position of the person among the people of the scenario, None if unknown
+    """
+    if uuid is not None:
+        return uuid
+    if index is not None:
+        return "#{}".format(index)
+    if seed is not None:
+        raise ValueError("A person of a seeded simulation needs a uuid or its index in the scenario")
+    return None
+
+
+def next_due_event(now, advance, start_time, stays=None):
+    """returns the next event of a schedule from the given time and the time it is due
+
+    With stays, the events the person would stay where it is for are skipped over in one go, as the stepwise loop
+    would one by one, moving on a millisecond after each of them.
+
+    :param advance func: called with a timedelta, returns the next event from then and moves the cursor past it, None
+    if no events remain, see models.Schedule.advance
+    :param start_time func: returns the start time of an event as a timedelta
+    :param stays func: returns whether an event is on the floor the person is on (def: None, skip nothing)
+    :rtype tuple: the next event, None if there is none, and the time it is due, or the time the schedule ran out
+    """
+    now_td = timedelta(seconds=now)
+    event = advance(now_td)
+    while event is not None:
+        event_secs = now + (start_time(event) - now_td).total_seconds()
+        if stays is None or not stays(event):
+            return event, event_secs
+        now = event_secs + 0.001
+        now_td = timedelta(seconds=now)
+        event = advance(now_td)
+    return None, now
+
+
+def may_board(assigned, elevator):
+    """returns False if the elevator belongs to a destination dispatch bank which assigned the person another car
+
+    :param assigned list: the (elevator bank, car) pairs of the cars assigned to the person
+    """
+    return all(car is elevator or elevator not in bank.elevators for bank, car in assigned)
+
+
+def goes_their_way(assigned, elevator, direction):
+    """returns False if destination dispatch assigned the elevator to the person and it leaves the floor the other way
+
+    An assigned car serves its riders on its sweeps: it takes them when it sets off their way, or when it has no other
+    stop left and goes wherever they do. Cars of the other banks are only heard going the person's way.
+
+    :param assigned list: the (elevator bank, car) pairs of the cars assigned to the person
+    :param direction int: the direction the person goes
+    """
+    if not elevator.has_stops or all(car is not elevator for bank, car in assigned):
+        return True
+    return elevator.next_direction == direction
+
+
+def release(assigned, destination, keep=None):
+    """releases the cars assigned to the person, but the one kept, and returns what is left of the assignments
+
+    :param assigned list: the (elevator bank, car) pairs of the cars assigned to the person
+    :param destination int: the level the person goes to
+    :param keep Elevator: the car the person boarded (def: None, release every car)
+    """
+    for bank, car in assigned:
+        if car is not keep:
+            bank.release(car, destination)
+    return [(bank, car) for bank, car in assigned if car is keep]
+
+
+class PersonMixin(object):
+    """Mixin class for what a person agent decides on an elevator trip, whichever engine runs it.
+
+    The person calls the elevator banks its call strategy picks, boards the first car to open its doors on the floor
+    with room left, unless destination dispatch assigned it another one, or its assigned car sets off the other way,
+    calls again once such a car moved on, and gets out on the destination, releasing the cars it was assigned. The agent provides the AgentMixin attributes, ident,
+    uuid and call_strategy, and waits for the hall events in between the way its engine waits.
+    """
+
+    def _new_trip(self, level, destination, description, called_secs):
+        """returns the trip from the level to the destination, with the elevator called at the given time"""
+        trip = ElevatorTrip()
+        trip.person = self.uuid
+        trip.start = level
+        trip.destination = destination
+        trip.description = description
+        trip.distance = abs(destination - level)
+        trip.direction = 1 if destination > level else -1
+        trip.elevator_called_secs = called_secs
+        return trip
+
+    def _choose_banks(self, level, rng):
+        """returns the elevator banks the call strategy picks to call from the level
+
+        :param rng Random: what the call strategy draws from, see call_stream
+        """
+        elevator_banks = self.call_strategy(self.simulation.elevator_banks, rng)
+        if self.tracer.categories & trace.DISPATCH:
+            self.tracer.trace(self.env.now, trace.PERSON_CALLING, self.ident, level, len(elevator_banks))
+        return elevator_banks
+
+    def _call(self, trip, elevator_banks):
+        """waits in the halls of the banks and calls an elevator of each
+
+        :rtype list: the (elevator bank, car) pairs of the cars destination dispatch banks assigned to the person
+        """
+        assigned = []
+        for agent in elevator_banks:
+            agent.wait(self, trip.start, trip.direction)
+            elevator = agent.call_to(trip.start, trip.direction, trip.destination)
+            if agent.destination_dispatch:
+                assigned.append((agent, elevator))
+        return assigned
+
+    def _board(self, trip, elevator_banks, assigned, elevator):
+        """gets in the elevator which opened its doors on the floor, unless it is full or an assigned car going the
+        other way, see goes_their_way
+
+        :rtype list: what is left of the assignments once in the elevator, see release, None to call again once the
+        elevator moved on
+        """
+        tracer = self.tracer
+        if elevator.full:
+            if tracer.categories & trace.PEOPLE:
+                tracer.trace(self.env.now, trace.PERSON_ELEVATOR_FULL, self.ident, trip.start, other=elevator.ident)
+            return None
+        if not goes_their_way(assigned, elevator, trip.direction):
+            if tracer.categories & trace.PEOPLE:
+                tracer.trace(self.env.now, trace.PERSON_ELEVATOR_GOING_AWAY, self.ident, trip.start,
+                             elevator.next_direction, other=elevator.ident)
+            return None
+
+        assigned = release(assigned, trip.destination, elevator)
+        for agent in elevator_banks:
+            agent.stop_waiting(self, trip.start, trip.direction)
+        trip.elevator_arrived_secs = self.env.now
+        if tracer.categories & trace.PEOPLE:
+            tracer.trace(self.env.now, trace.PERSON_ENTERING, self.ident, trip.destination, other=elevator.ident)
+        elevator.enter(self)
+        elevator.add_stop(trip.destination)
+        return assigned
+
+    def _call_again(self, trip, elevator_banks, assigned, elevator):
+        """leaves the halls once the full elevator moved on, releasing the cars assigned, to call again"""
+        if self.tracer.categories & trace.PEOPLE:
+            self.tracer.trace(self.env.now, trace.PERSON_CALLING_AGAIN, self.ident, trip.start, other=elevator.ident)
+        for agent in elevator_banks:
+            agent.stop_waiting(self, trip.start, trip.direction)
+        release(assigned, trip.destination)
+
+    def _get_out(self, trip, assigned, elevator):
+        """gets out of the elevator on the destination, completing the trip"""
+        if self.tracer.categories & trace.PEOPLE:
+            self.tracer.trace(self.env.now, trace.PERSON_ARRIVED, self.ident, trip.destination, other=elevator.ident)
+        elevator.exit(self)
+        release(assigned, trip.destination)
+        trip.travel_secs = self.env.now - trip.elevator_arrived_secs
+
+
+class Person(PersonMixin, AgentMixin, PersonModel):
     """Behavior for person agent"""
 
     def __init__(self, sim, **kwargs):
         """creates a person agent that defines how an individual behaves.
 
         :param elevator_call_strategy func: The strategy to use when deciding the elevator bank to use.
-        :param trip_complete func: The function to invoke when elevator arrives (def: logs)
+        :param trip_complete func: The function to invoke when elevator arrives (def: the simulation's trip sink)
+        :param index int: the position of the person among the people of the scenario (def: None)
+        :note: when the simulation has a seed, the person draws from random streams of its own, a CallStream per call
+        keyed by the seed and the uuid of the person, or its index without a uuid, so the same person makes the same
+        draws whatever the others do; a person of a seeded simulation needs one of the two
+        :note: the person only has a process while it is active: between two elevator trips it is parked in the
+        calendar of the simulation until its next event is due
         """
         AgentMixin.__init__(self, sim, events=["floor_reached", "elevator_door_open", "elevator_moving_on"])
+        kwargs.setdefault("idents", sim.idents)
         PersonModel.__init__(self, **kwargs)
 
         self.action = self.env.process(self.run())
-        self.call_strategy = globals()[kwargs.get("elevator_call_strategy", "call_strategy_random")]
-        self.trip_complete = kwargs.get("trip_complete", lambda obj: print(to_csv(obj)))
+        self.call_strategy = get_call_strategy(kwargs.get("elevator_call_strategy", "call_strategy_random"))
+        self.trip_complete = kwargs.get("trip_complete", sim.trip_complete)
+        self.__stream_name = stream_name(sim.seed, self.uuid if "uuid" in kwargs else None, kwargs.get("index"))
+        self.calls = 0  # the number of elevator calls made so far
+        self.__idle = None  # chain of the calendar entries between elevator trips
+
+    @property
+    def rng(self):
+        """what the person draws from on its next call, see call_stream"""
+        return call_stream(self.simulation.seed, self.__stream_name, self.calls)
 
     def run(self):
-        logger.debug("starting person agent for {}".format(self))
+        tracer = self.tracer
+        if tracer.categories & trace.PEOPLE:
+            tracer.trace(self.env.now, trace.PERSON_STARTED, self.ident)
         # set the model location to the first floor
         self.location = self.simulation.building.floors[0]
+        self.schedule.rewind()
+        self.__idle = None
+        yield from self.__live(None)
+
+    def __activate(self, next_event):
+        """starts the process of the parked person, once the time it waited for in the calendar has come"""
+        self.action = self.env.process(self.__live(next_event))
+
+    def __live(self, next_event):
+        """goes through the schedule, from the event that came due if any, until the person parks or is done
+
+        :param next_event Event: the schedule event that came due, None to look for the next one
+        """
+        tracer = self.tracer
         while True:
-            now_td = timedelta(seconds=self.env.now)
-            next_event = self.schedule.next_event(now_td)
-            # if no event left, we are done
             if next_event is None:
-                logger.debug("done with {}".format(self))
-                break
-
-            time_until_next_event = next_event.start_time - now_td
-
-            # TODO: check if time is negative, if so, proceed directly without
-            # waiting...
-            # waits until the next event time
-            logger.debug("{} waiting until {}".format(self, time_until_next_event.total_seconds()))
-            yield self.env.timeout(time_until_next_event.total_seconds())
-            logger.debug("{} resuming at {}".format(self, self.env.now))
-
-            if next_event.location == self.location:
-                logger.debug("event detected on current location -- skipping elevator")
-                yield self.env.timeout(0.001)
-                continue
-
-            trip = ElevatorTrip()
-            trip.person = self.uuid
-            trip.start = self.location.level
-            trip.destination = next_event.location.level
-            trip.description = next_event.description
-            trip.distance = self.location.distance(next_event.location)
-            trip.direction = self.location.direction(next_event.location)
+                # TODO: check if time is negative, if so, proceed directly without
+                # waiting...
+                next_event, next_event_secs = next_due_event(self.env.now, self.schedule.advance, _start_time,
+                                                             self.__stays if self.simulation.fast_forward else None)
+                # if no event left, we are done
+                if next_event is None:
+                    if tracer.categories & trace.PEOPLE:
+                        tracer.trace(self.env.now, trace.PERSON_DONE, self.ident)
+                    return
+
+                # parks until the next event time
+                if tracer.categories & trace.PEOPLE:
+                    tracer.trace(self.env.now, trace.PERSON_WAITING, self.ident, self.location.level, next_event_secs)
+                self.__idle = self.simulation.calendar.add(next_event_secs, self.__activate, self.__idle, next_event)
+                return
+
+            if tracer.categories & trace.PEOPLE:
+                tracer.trace(self.env.now, trace.PERSON_RESUMING, self.ident, self.location.level)
+
+            level, destination = self.location.level, next_event.location.level
+            if destination == level:
+                if tracer.categories & trace.PEOPLE:
+                    tracer.trace(self.env.now, trace.PERSON_STAYING, self.ident, level)
+                self.__idle = self.simulation.calendar.add(self.env.now + 0.001, self.__activate, self.__idle)
+                return
+
+            self.__idle = None
             # TODO: correct later to check for stairs
             # determine whether to take the steps or call the elevator
             # if elevator, call elevator and wait
-            trip.elevator_called_secs = self.env.now
-            elevator_banks = self.call_strategy(self.simulation.elevator_banks)
-            logger.debug("{} chose {} elevator_bank(s) to call".format(self, len(elevator_banks)))
+            trip = self._new_trip(level, destination, next_event.description, self.env.now)
+            rng = self.rng
+            self.calls += 1
+            elevator_banks = self._choose_banks(level, rng)
 
             while True:
-                for agent in elevator_banks:
-                    agent.wait(self, self.location, trip.direction)
-                    agent.call_to(self.location, trip.direction)
-
-                # Wait until notified of elevator open door on floor
-                event = self.event("elevator_door_open")
-                yield event
-                elevator_agent = event.value
-
-                if not elevator_agent.full:
-                    for agent in elevator_banks:
-                        agent.stop_waiting(self, self.location, trip.direction)
-                    trip.elevator_arrived_secs = self.env.now
-                    logger.debug("person({}) entering elevator({}) and going to floor({})".format(self.uuid, elevator_agent.uuid, next_event.location.level))
-                    elevator_agent.enter(self)
-                    elevator_agent.add_stop(next_event.location)
+                assigned = self._call(trip, elevator_banks)
+
+                # Wait until notified of elevator open door on floor, of the assigned car with destination dispatch
+                elevator_agent = yield from self.__wait_for(elevator_banks, "elevator_door_open", trip.direction)
+                while not may_board(assigned, elevator_agent):
+                    elevator_agent = yield from self.__wait_for(elevator_banks, "elevator_door_open", trip.direction)
+
+                boarded = self._board(trip, elevator_banks, assigned, elevator_agent)
+                if boarded is not None:
+                    assigned = boarded
                     break
-                else:
-                    logger.debug("person({}) saw elevator({}) is full, waiting until elevator moves on to call again".format(self.uuid, elevator_agent.uuid))
-                    yield self.event("elevator_moving_on")
-                    logger.debug("person({}) saw elevator({}) moved on, calling elevator again".format(self.uuid, elevator_agent.uuid))
-                    for agent in elevator_banks:
-                        agent.stop_waiting(self, self.location, trip.direction)
+                yield from self.__wait_for(elevator_banks, "elevator_moving_on", trip.direction)
+                self._call_again(trip, elevator_banks, assigned, elevator_agent)
 
             # TODO: need to wait for the elevator doors to open
-            while elevator_agent.location != next_event.location:
+            while elevator_agent.level != destination:
                 yield self.event("elevator_door_open")
-            logger.debug("person({}) eached floor({}) using elevator({})".format(self.uuid, next_event.location.level, elevator_agent.uuid))
-            elevator_agent.exit(self)
+            self._get_out(trip, assigned, elevator_agent)
 
-            trip.travel_secs = self.env.now - trip.elevator_arrived_secs
             self.location = next_event.location  # we reached our location, yay!
             self.trip_complete(trip)
+            next_event = None
 
             # TODO: ELEVATOR: check that we ONLY stop when we are going in the
             # direction of the user (we'll get them on the way back)
+
+    def __wait_for(self, elevator_banks, event_name, direction):
+        """waits with everyone else on this floor for the named hall event of any of the banks
+
+        :returns Elevator: the elevator that triggered the event
+        """
+        events = [agent.hall_event(event_name, self.location.level, direction) for agent in elevator_banks]
+        if len(events) == 1:
+            yield events[0]
+            return events[0].value
+
+        # the first bank to trigger its event wakes the person
+        wake = self.env.event()
+
+        def wake_up(event):
+            if not wake.triggered:
+                wake.succeed(event.value)
+
+        for event in events:
+            event.callbacks.append(wake_up)
+        yield wake
+        return wake.value
+
+    def __stays(self, event):
+        """returns whether the person stays where it is for the event, see next_due_event"""
+        return event.location == self.location
@@ -1,34 +1,210 @@
 #!/usr/bin/env python
 # encoding: utf-8
 
+import itertools
+import logging
+import math
 import simpy
+from simpy.events import NORMAL
 from elevator_simulation.agents import Building
+from elevator_simulation.agents import trace
+from elevator_simulation.calendar import Calendar
+from elevator_simulation.data import to_csv
+from elevator_simulation.models import IdentRegistry
 
-class Simulation(object):
-    """Holds all of the objects in the simulation."""
 
-    EOD = 24*3600
+# spacing of the event ids of the timeouts of a chain, small enough to keep them between two ordinary event ids
+_CHAIN_SPACING = 2.0 ** -20
 
-    def __init__(self, **kwargs):
-        """Constructs a simulation from the models passed.
 
-        :param number_of_floors int: Number of floors in the building (def: 10)
+class ChainMixin(object):
+    """Mixin class for the chains of timeouts of an environment, whichever engine it drives.
+
+    Simultaneous events of the same priority are processed in the order of their event ids, the order they were
+    scheduled in. An agent waiting through a series of timeouts, like an elevator travelling floor by floor, schedules
+    them as a chain whose event ids follow the event id of its first timeout, closer to it than the next ordinary one.
+    Simultaneous events are then processed in the same order however the series is split up, which is what lets a fast
+    forwarded run record the same trips as a stepwise one.
+
+    The environment provides now, and the (time, priority, event id) of the event being processed in active, None
+    before the first one. The event ids are drawn from eids.
+    """
+
+    def __init__(self):
+        self.eids = itertools.count()
+        self.active = None
+
+    def reserve(self, chain=None):
+        """returns the event id of the next timeout of the chain, and the chain, without scheduling the timeout
+
+        :param chain list: the chain of the previous timeout of the series, None to start a new one
+        :rtype tuple: the event id and the chain
+        """
+        if chain is None:
+            chain = [next(self.eids), 0]
+        eid = chain[0] + chain[1] * _CHAIN_SPACING
+        chain[1] += 1
+        return eid, chain
+
+    def processed_before_active(self, at, chain):
+        """returns True if an event of the chain at the given time is processed before the active event"""
+        if at != self.now or self.active is None:
+            return at < self.now
+        return (NORMAL, chain[0]) < self.active[1:3]
+
+
+class ChainedTimeout(simpy.Timeout):
+    """A timeout of a chain, processed in the place of the event id reserved for it, see Environment.timeout_at"""
+
+    def __init__(self, env, at, eid):
         """
-        self.__env = simpy.Environment()
-        self.__building = Building(self, kwargs.get("number_of_floors", 10))
+        :param at float: the simulation time of the timeout, not before now
+        :param eid float: the event id of the timeout, see ChainMixin.reserve
+        """
+        self.eid = eid
+        now = env.now
+        delay = at - now
+        # simpy adds the delay up to the time of the timeout, which has to come out as the time given
+        while now + delay != at:
+            delay = math.nextafter(delay, math.inf if now + delay < at else -math.inf)
+        simpy.Timeout.__init__(self, env, delay)
+
+
+class Environment(ChainMixin, simpy.Environment):
+    """simpy environment where a series of timeouts can keep the place of the first one among simultaneous events
+
+    Every event is scheduled with a (priority, event id) pair as its simpy priority, the event id drawn from the
+    environment, or reserved for a ChainedTimeout, see ChainMixin. simpy then orders simultaneous events by the pair,
+    and only breaks ties between equal pairs with its own event ids, which never happens.
+
+    The number of events processed so far is kept in processed.
+    """
+
+    def __init__(self, *args, **kwargs):
+        simpy.Environment.__init__(self, *args, **kwargs)
+        ChainMixin.__init__(self)
+        self.processed = 0
+        self.__activate = self._activate
+
+    def schedule(self, event, priority=NORMAL, delay=0):
+        """schedules the event, see simpy.Environment.schedule, after the events of the same time and priority
+        scheduled before it or in the place of its chain for a ChainedTimeout"""
+        eid = event.eid if type(event) is ChainedTimeout else next(self.eids)
+        event.entry = (self.now + delay, priority, eid)
+        # activates the event before any of its callbacks run
+        event.callbacks.insert(0, self.__activate)
+        simpy.Environment.schedule(self, event, (priority, eid), delay)
+
+    def _activate(self, event):
+        """remembers the (time, priority, event id) of the event being processed, and counts it"""
+        self.active = event.entry
+        self.processed += 1
+
+    def timeout_at(self, at, chain=None):
+        """returns a timeout triggered at the given time and the chain it belongs to
+
+        :param at float: the simulation time of the timeout, not before now
+        :param chain list: the chain returned with the previous timeout of the series, None to start a new one
+        :rtype tuple: the timeout event and its chain
+        """
+        if at < self.now:
+            raise ValueError("Timeout at {} is before the current time {}".format(at, self.now))
+        eid, chain = self.reserve(chain)
+        return ChainedTimeout(self, at, eid), chain
+
+    def call_at(self, at, eid, callback):
+        """has the callback called with an event processed at the given time, with an event id from reserve"""
+        ChainedTimeout(self, at, eid).callbacks.append(callback)
+
+
+class SimulationMixin(object):
+    """Mixin class for what holds the objects of a simulation, whichever engine runs it.
+
+    The simulation provides nothing more: the engine is given by the environment, whose run(until) processes the
+    events due before a time, and the building it creates.
+    """
+
+    EOD = 24*3600
+
+    def __init__(self, env, create_building, **kwargs):
+        """
+        :param env Environment: what drives the simulation, an Environment or an engine.EventQueue
+        :param create_building func: called with the simulation and the number of floors, returns the building
+        :note: see agents.Simulation for the other parameters
+        """
+        self.__env = env
+        if "trace" in kwargs:
+            self.__tracer = trace.Tracer(kwargs["trace"])
+        else:
+            self.__tracer = trace.Tracer(trace.ALL if trace.logger.isEnabledFor(logging.DEBUG) else 0)
+        self.trip_sink = kwargs.get("trip_sink")
+        self.fast_forward = kwargs.get("fast_forward", False)
+        self.seed = kwargs.get("seed")
+        self.__building = create_building(self, kwargs.get("number_of_floors", 10))
         self.__people = []
         self.__elevator_banks = []
+        self.__calendar = Calendar(self.__env)
+        self.__idents = IdentRegistry()
 
     def __eq__(self, obj):
         return self.building == obj.building and self.people == obj.people and self.elevator_banks == obj.elevator_banks
 
-    def run(self):
-        self.env.run(until=Simulation.EOD)
+    def run(self, until=None):
+        """runs the simulation up to the given time, from where it stopped if it already ran
+
+        Events due at the given time are left for the next run, so a run stopped at some time and continued records
+        the same trips as a run straight through.
+
+        :param until float: the time to stop at, in seconds since midnight (def: None, the end of the day EOD)
+        """
+        until = self.EOD if until is None else min(until, self.EOD)
+        if until > self.env.now:
+            self.env.run(until=until)
+        if self.trip_sink is not None:
+            self.trip_sink.flush()
+
+    def add_person_later(self, start_secs, create_person):
+        """has a person created and added to the people once the simulation reaches the given time
+
+        People are meant to be added this way before the simulation runs, typically when their first event is
+        due, so that only the people who have already started their day hold an agent. They wait in the calendar
+        until then, people added for the same time being created in the order they were added.
+
+        :param start_secs float: the time, in seconds since midnight, at which to create the person
+        :param create_person func: called without arguments to create the person agent
+        """
+        self.__calendar.add(start_secs, self.__admit_person, value=create_person)
+
+    def __admit_person(self, create_person):
+        self.people.append(create_person())
+
+    def trip_complete(self, trip):
+        """records a completed trip in the trip sink, prints it if the simulation has no sink"""
+        if self.trip_sink is not None:
+            self.trip_sink.append(trip)
+        else:
+            print(to_csv(trip))
 
     @property
     def env(self):
+        """what drives the simulation, see the environment parameter"""
         return self.__env
 
+    @property
+    def idents(self):
+        """the registry of the identities of the elevators and people of the simulation, see models.IdentRegistry"""
+        return self.__idents
+
+    @property
+    def calendar(self):
+        """the arrival calendar, where people wait for their next event and for their creation, see Calendar"""
+        return self.__calendar
+
+    @property
+    def tracer(self):
+        """the tracer of what the agents do, see agents.trace"""
+        return self.__tracer
+
     @property
     def building(self):
         return self.__building
@@ -40,3 +216,21 @@ class Simulation(object):
     @property
     def elevator_banks(self):
         return self.__elevator_banks
+
+
+class Simulation(SimulationMixin):
+    """Holds all of the objects in the simulation."""
+
+    def __init__(self, **kwargs):
+        """Constructs a simulation from the models passed.
+
+        :param number_of_floors int: Number of floors in the building (def: 10)
+        :param trip_sink TripSink: where people record completed trips (def: None, printed as csv)
+        :param fast_forward bool: have elevators travel clear stretches and people skip events that need no
+        elevator with a single timeout, recording the same trips as a stepwise run (def: False)
+        :param trace int: the categories of what the agents do to trace, see agents.trace (def: all of them when
+        debug logging is on, none otherwise)
+        :param seed int: the seed of the random streams of the agents, see agents.Person (def: None, agents draw from
+        the global random module)
+        """
+        SimulationMixin.__init__(self, Environment(), Building, **kwargs)
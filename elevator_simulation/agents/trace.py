@@ -0,0 +1,120 @@
+#!/usr/bin/env python
+# encoding: utf-8
+
+import logging
+import numpy as np
+
+
+logger = logging.getLogger(__name__)
+
+# categories of trace records, combined as flags
+MOVEMENT = 1  # elevators moving and turning
+DOORS = 2  # elevators stopping to open their doors
+DISPATCH = 4  # people calling elevators, banks telling waiting people an elevator moved on
+PEOPLE = 8  # people waiting, riding and arriving
+ALL = MOVEMENT | DOORS | DISPATCH | PEOPLE
+CATEGORIES = {"movement": MOVEMENT, "doors": DOORS, "dispatch": DISPATCH, "people": PEOPLE}
+
+# the kinds of trace records, with their category and how they read; agent and other are identities
+KINDS = (
+    ("elevator_moving", MOVEMENT, "{time}: elevator({agent}) moving {value:g} on floor {level}"),
+    ("elevator_turning", MOVEMENT, "{time}: elevator({agent}) changed direction {value:g}"),
+    ("elevator_at_stop", DOORS, "{time}: elevator({agent}) is at stop on floor {level}, opening doors"),
+    ("elevator_moving_on", DISPATCH, "{time}: elevator({agent}) is moving on, notifying all people waiting on floor {level} to go {value:g}"),
+    ("person_started", PEOPLE, "{time}: starting person({agent})"),
+    ("person_done", PEOPLE, "{time}: done with person({agent})"),
+    ("person_waiting", PEOPLE, "{time}: person({agent}) waiting until {value}"),
+    ("person_resuming", PEOPLE, "{time}: person({agent}) resuming"),
+    ("person_staying", PEOPLE, "{time}: person({agent}) event detected on current location {level} -- skipping elevator"),
+    ("person_calling", DISPATCH, "{time}: person({agent}) chose {value:g} elevator_bank(s) to call to floor {level}"),
+    ("person_entering", PEOPLE, "{time}: person({agent}) entering elevator({other}) and going to floor {level}"),
+    ("person_elevator_full", PEOPLE, "{time}: person({agent}) saw elevator({other}) is full, waiting until elevator moves on to call again"),
+    ("person_calling_again", PEOPLE, "{time}: person({agent}) saw elevator({other}) moved on, calling elevator again"),
+    ("person_arrived", PEOPLE, "{time}: person({agent}) reached floor {level} using elevator({other})"),
+    ("person_elevator_going_away", PEOPLE, "{time}: person({agent}) saw its elevator({other}) is going {value:g}, waiting until elevator moves on to call again"),
+)
+(ELEVATOR_MOVING, ELEVATOR_TURNING, ELEVATOR_AT_STOP, ELEVATOR_MOVING_ON, PERSON_STARTED, PERSON_DONE, PERSON_WAITING,
+ PERSON_RESUMING, PERSON_STAYING, PERSON_CALLING, PERSON_ENTERING, PERSON_ELEVATOR_FULL, PERSON_CALLING_AGAIN,
+ PERSON_ARRIVED, PERSON_ELEVATOR_GOING_AWAY) = range(len(KINDS))
+
+TRACE_RECORD = np.dtype([("time", "f8"),
+                         ("kind", "u1"),
+                         ("agent", "i8"),
+                         ("other", "i8"),
+                         ("level", "i4"),
+                         ("value", "f8")])
+
+
+def describe(record):
+    """returns the trace record as the line it is logged as"""
+    name, category, message = KINDS[record["kind"]]
+    return message.format(time=record["time"], agent=record["agent"], other=record["other"], level=record["level"],
+                          value=record["value"])
+
+
+def load_trace(filename):
+    """returns the trace records saved by Tracer.save"""
+    return np.load(filename)
+
+
+class Tracer(object):
+    """Traces what the agents of a simulation do, by category.
+
+    Agents only build a record once they find its category enabled in categories, a plain bitmask, so a disabled
+    category costs a single test. Records are logged at debug level and, once keep_records is called, also kept in a
+    ring buffer of the most recent records for post-mortem replay.
+    """
+
+    def __init__(self, categories=0):
+        """
+        :param categories int: the categories to trace, combined as flags (def: 0, none)
+        """
+        self.categories = categories
+        self.__buffer = None
+        self.__count = 0
+
+    def enable(self, categories):
+        """starts tracing the categories"""
+        self.categories |= categories
+
+    def disable(self, categories):
+        """stops tracing the categories"""
+        self.categories &= ~categories
+
+    def keep_records(self, size):
+        """keeps the given number of the most recent trace records, from now on
+
+        :param size int: the capacity of the ring buffer
+        """
+        self.__buffer = np.zeros(size, dtype=TRACE_RECORD)
+        self.__count = 0
+
+    def trace(self, time, kind, agent, level=0, value=0, other=0):
+        """records what an agent did
+
+        :param time float: the simulation time
+        :param kind int: the kind of record, one of the indexes of KINDS
+        :param agent int: the identity of the agent
+        :param level int: the level of the floor involved (def: 0)
+        :param value float: the direction, count or time involved (def: 0)
+        :param other int: the identity of another agent involved (def: 0)
+        """
+        if self.__buffer is not None:
+            self.__buffer[self.__count % len(self.__buffer)] = (time, kind, agent, other, level, value)
+            self.__count += 1
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(KINDS[kind][2].format(time=time, agent=agent, other=other, level=level, value=value))
+
+    def records(self):
+        """returns the kept trace records, oldest first"""
+        if self.__buffer is None:
+            return np.zeros(0, dtype=TRACE_RECORD)
+        size = len(self.__buffer)
+        if self.__count <= size:
+            return self.__buffer[:self.__count].copy()
+        start = self.__count % size
+        return np.concatenate((self.__buffer[start:], self.__buffer[:start]))
+
+    def save(self, filename):
+        """saves the kept trace records, oldest first, as a NumPy .npy file"""
+        np.save(filename, self.records())
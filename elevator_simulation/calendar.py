@@ -0,0 +1,84 @@
+#!/usr/bin/env python
+# encoding: utf-8
+
+import heapq
+
+
+class Calendar(object):
+    """The arrival calendar of a simulation: everything due at a later time, kept off the event queue until it is due.
+
+    People waiting for the next event of their schedule are parked in the calendar rather than sleeping on a timeout
+    of their own, and so are the people who have not been created yet. Only the earliest entry has an event in the
+    event queue, which takes the place the timeout of the entry would have taken among simultaneous events, so entries
+    come due in the very order their timeouts would have.
+
+    The event queue is an agents.Environment or an engine.EventQueue.
+    """
+
+    def __init__(self, env):
+        """creates an empty calendar of the event queue"""
+        self.__env = env
+        self.__entries = []  # heap of (time, event id, handler, value)
+        self.__scheduled = set()  # the event ids of the entries with an event in the queue
+
+    def __len__(self):
+        """the number of entries waiting in the calendar"""
+        return len(self.__entries)
+
+    def peek(self):
+        """returns the time of the earliest entry, infinity if there is none"""
+        return self.__entries[0][0] if self.__entries else float("inf")
+
+    def add(self, at, handler, chain=None, value=None):
+        """has the handler called with the value at the given time, as a timeout of the chain would be
+
+        :param at float: the simulation time the entry is due, not before now
+        :param handler func: called with the value when the entry is due
+        :param chain list: the chain of the previous timeout of the series, None to start a new one, see
+        agents.Environment.timeout_at
+        :rtype list: the chain of the entry
+        """
+        if at < self.__env.now:
+            raise ValueError("Entry at {} is before the current time {}".format(at, self.__env.now))
+        eid, chain = self.__env.reserve(chain)
+        heapq.heappush(self.__entries, (at, eid, handler, value))
+        if self.__entries[0][1] == eid:
+            self.__schedule_first()
+        return chain
+
+    def checkpoint(self):
+        """returns the entries of the calendar as (time, event id, handler, value) tuples, in the order they come due
+
+        The event of the earliest entry in the event queue is not part of the entries, restore schedules it again.
+        """
+        return sorted(self.__entries, key=lambda entry: entry[:2])
+
+    def restore(self, entries):
+        """replaces the entries of the calendar by the given ones, see checkpoint
+
+        :param entries list: (time, event id, handler, value) tuples, with event ids reserved in the event queue
+        """
+        self.__entries = list(entries)
+        heapq.heapify(self.__entries)
+        self.__scheduled = set()
+        if self.__entries:
+            self.__schedule_first()
+
+    def is_due_event(self, handler):
+        """returns True if the handler of an event queue entry is the event of an entry of this calendar"""
+        return handler == self.__due
+
+    def __schedule_first(self):
+        """schedules the event of the earliest entry, unless it already has one"""
+        at, eid = self.__entries[0][:2]
+        if eid not in self.__scheduled:
+            self.__scheduled.add(eid)
+            self.__env.call_at(at, eid, self.__due)
+
+    def __due(self, event=None):
+        # the earliest entry is the one whose event is being processed, entries are ordered like their events
+        at, eid, handler, value = heapq.heappop(self.__entries)
+        self.__scheduled.discard(eid)
+        if self.__entries:
+            self.__schedule_first()
+        handler(value)
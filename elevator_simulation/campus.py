@@ -0,0 +1,118 @@
+#!/usr/bin/env python
+# encoding: utf-8
+
+import json
+import os
+import random
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from elevator_simulation.data import ElevatorTrip, TRIP_COLUMNS
+from elevator_simulation.data import to_csv_header
+from elevator_simulation.readers import binary
+from elevator_simulation.readers.json import build_simulation, read_simulation
+from elevator_simulation.sinks import TripStore
+
+
+Site = namedtuple("Site", "name scenario")
+
+
+def read_campus(filename):
+    """Reads a campus file, a json object whose 'buildings' list the buildings of the campus.
+
+    Each building is either the path of its json or binary simulation file, relative to the campus file, given as
+    {"name": ..., "scenario": ...}, or its simulation settings inline, as in a json simulation file, with a name.
+    Buildings without a name are named after their position in the list.
+
+    :param filename str: path to the campus file
+    :rtype list: the site of each building, in the order of the file
+    """
+    with open(filename, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    if "buildings" not in data:
+        raise ValueError("Expected 'buildings' element in file")
+
+    directory = os.path.dirname(os.path.abspath(filename))
+    sites = []
+    for i, building in enumerate(data["buildings"]):
+        name = str(building.get("name", "building{}".format(i)))
+        if "scenario" in building:
+            scenario = os.path.join(directory, building["scenario"])
+        else:
+            scenario = {key: value for key, value in building.items() if key != "name"}
+        sites.append(Site(name, scenario))
+
+    names = [site.name for site in sites]
+    if len(set(names)) != len(names):
+        raise ValueError("The buildings of campus '{}' must have distinct names".format(filename))
+    return sites
+
+
+def run_building(site, fast_forward=False, seed=None, engine="simpy"):
+    """Runs the simulation of a single building of the campus (executed in the worker processes).
+
+    Buildings share nothing, so each runs in an environment of its own. With a seed, the random number generator of
+    each building is seeded from it and the name of the building, so results do not depend on the worker it ran on.
+
+    :param site Site: the building to simulate
+    :param fast_forward bool: run the simulation in fast forward mode, see agents.Simulation (def: False)
+    :param seed int: the seed of the campus (def: None, unseeded)
+    :param engine str: the engine running the simulation, see readers.json.ENGINES (def: simpy)
+    :rtype tuple: the site and a TripStore of the elevator trips completed during the run
+    """
+    if seed is not None:
+        random.seed("{}:{}".format(seed, site.name))
+
+    store = TripStore()
+    if isinstance(site.scenario, dict):
+        simulation = build_simulation(site.scenario, engine=engine)
+    elif binary.is_binary_simulation(site.scenario):
+        simulation = binary.read_simulation(site.scenario, engine=engine)
+    else:
+        simulation = read_simulation(site.scenario, engine=engine)
+    simulation.trip_sink = store
+    simulation.fast_forward = fast_forward
+    simulation.run()
+    return site, store
+
+
+def run_campus(sites, max_workers=None, fast_forward=False, seed=None, engine="simpy"):
+    """Fans the buildings of the campus out over a pool of worker processes.
+
+    :param sites list: the buildings to simulate
+    :param max_workers int: the number of worker processes (def: number of processors)
+    :param fast_forward bool: run the simulations in fast forward mode (def: False)
+    :param seed int: the seed of the campus, see run_building (def: None, unseeded)
+    :param engine str: the engine running the simulations (def: simpy)
+    :rtype generator: yields (site, store) in the order the sites were given
+    """
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        for result in executor.map(partial(run_building, fast_forward=fast_forward, seed=seed, engine=engine), sites):
+            yield result
+
+
+def merge_stores(stores):
+    """returns a TripStore holding the trips of every store, people numbered across the campus by their identity"""
+    merged = TripStore()
+    for store in stores:
+        merged.extend(store)
+    return merged
+
+
+def to_tagged_csv_header(tag="building"):
+    """returns the csv header of merged trips tagged with the name of their building, or with another tag"""
+    return tag + "," + to_csv_header(ElevatorTrip)
+
+
+def to_tagged_csv(name, store):
+    """returns the trips of the store as comma separated value lines tagged with the name of their building, or
+    whatever else they came from"""
+    values = [[name] * len(store)]
+    for column_name, _ in TRIP_COLUMNS:
+        column = store.column(column_name).tolist()
+        if column_name == "person":
+            column = [store.people[index] for index in column]
+        elif column_name == "description":
+            column = [store.descriptions[index] for index in column]
+        values.append(column)
+    return "".join([",".join(map(str, row)) + "\n" for row in zip(*values)])
@@ -0,0 +1,343 @@
+#!/usr/bin/env python
+# encoding: utf-8
+
+import functools
+import json
+import multiprocessing
+import os
+import random
+import traceback
+from elevator_simulation.engine import EventQueue
+from elevator_simulation.engine.person import _Wake
+from elevator_simulation.models import Elevator as ElevatorModel
+from elevator_simulation.sinks import TripStore
+
+
+def snapshot(simulation):
+    """returns the state of the model of the simulation at the time it stopped, as plain data
+
+    Elevators fast forwarding through a leg are first brought up to date with the clock.
+
+    The snapshot of a simulation of the events engine whose people were all created holds, under resume, what restore
+    needs to carry on from it in another process: the events still to process, the entries of the arrival calendar,
+    the callbacks waiting on channels, who waits in the halls and rides the elevators, the travel of the elevators and
+    the trips under way. Agents are referred to by their place in the simulation, people by their place in the people
+    of the snapshot. The snapshot of any other simulation is only for inspection, its resume is None.
+
+    :param simulation Simulation: the simulation, stopped by Simulation.run(until)
+    :rtype dict: the time, the number of trips recorded by the trip sink so far (None without a sink), the
+    location, direction, stops, doors and passengers of each elevator, the people waiting on each floor for each
+    bank, in the order they called, with the time of their call, the location, schedule position and number of calls
+    of each person, and resume
+    """
+    population = getattr(simulation, "population", None)
+    travellers = _travellers(simulation) if population is not None else dict()
+    people = list(enumerate(simulation.people))
+    people.extend((len(simulation.people) + i, traveller) for i, traveller in sorted(travellers.items()))
+    numbers = {id(person): p for p, person in people}
+    resume = _resume(simulation, people, numbers) if isinstance(simulation.env, EventQueue) else None
+
+    elevators, waiting = [], []
+    for bank in simulation.elevator_banks:
+        for elevator in bank.elevators:
+            elevator.catch_up()
+            elevators.append({"bank": bank.uuid,
+                              "uuid": elevator.uuid,
+                              "level": elevator.level,
+                              "direction": elevator.direction,
+                              "stops": [stop.level for stop in elevator.stops],
+                              "doors_open": elevator.is_open,
+                              "passengers": [person.uuid for person in elevator.riders]})
+        for level in range(1, len(bank.floors) + 1):
+            for direction in (1, -1):
+                if bank.hall_calls.count(level, direction):
+                    calls = bank.hall_calls.calls(level, direction)
+                    waiting.append({"bank": bank.uuid,
+                                    "level": level,
+                                    "direction": direction,
+                                    "people": [person.uuid for person, _ in calls],
+                                    "called": [time for _, time in calls]})
+
+    states = [_person_state(person) for person in simulation.people]
+    if population is not None:
+        states.extend(population.snapshot())
+    sink = simulation.trip_sink
+    return {"time": simulation.env.now,
+            "trips": sink.written + len(sink.buffer) if sink is not None else None,
+            "elevators": elevators,
+            "waiting": waiting,
+            "people": states,
+            "resume": resume}
+
+
+def _travellers(simulation):
+    """returns the agents of the people of the person store on a trip, by index in the store
+
+    A person on a trip is either waiting in a hall or riding an elevator.
+    """
+    travellers = dict()
+    for bank in simulation.elevator_banks:
+        for elevator in bank.elevators:
+            for person in elevator.riders:
+                travellers[person.index] = person
+        for level in range(1, len(bank.floors) + 1):
+            for direction in (1, -1):
+                for person in bank.hall_calls.waiting(level, direction):
+                    travellers[person.index] = person
+    return travellers
+
+
+def _person_state(person):
+    """returns the location, schedule position and number of calls of a person as plain data"""
+    return {"uuid": person.uuid,
+            "level": person.location.level if person.location is not None else None,
+            "position": person.schedule.position,
+            "calls": person.calls}
+
+
+def _resume(simulation, people, numbers):
+    """returns what the agents of a simulation of the events engine wait for as plain data, see snapshot
+
+    :param people list: the (number, agent) of the people with an agent, those of the person store last
+    :param numbers dict: the number of each of those people, by id of the agent
+    :rtype dict: None if an event or a calendar entry is not one of an agent, such as the creation of a person
+    """
+    banks = simulation.elevator_banks
+    agents = [(bank, ["bank", b]) for b, bank in enumerate(banks)]
+    agents.extend((elevator, ["elevator", b, e])
+                  for b, bank in enumerate(banks) for e, elevator in enumerate(bank.elevators))
+    agents.extend((person, ["person", p]) for p, person in people)
+    if simulation.population is not None:
+        agents.append((simulation.population, ["population"]))
+    references = {id(agent): reference for agent, reference in agents}
+    wakes = dict()
+
+    def handler_reference(handler):
+        """returns the agent and the name of the handler, None if it is not one of an agent"""
+        if isinstance(handler, _Wake):
+            reference = handler_reference(handler.handler)
+            if reference is not None:
+                reference.update(wake=wakes.setdefault(id(handler), len(wakes)), triggered=handler.triggered)
+            return reference
+        agent = getattr(handler, "__self__", None)
+        if id(agent) in references:
+            for name, candidate in agent._handlers().items():
+                if candidate == handler:
+                    return {"agent": references[id(agent)], "handler": name}
+        return None
+
+    env, calendar = simulation.env, simulation.calendar
+    next_eid, events = env.checkpoint()
+    queue = [[at, priority, eid, handler_reference(handler), value] for at, priority, eid, handler, value in events
+             if not calendar.is_due_event(handler)]
+    entries = [[at, eid, handler_reference(handler), value] for at, eid, handler, value in calendar.checkpoint()]
+    channels = []
+    for b, bank in enumerate(banks):
+        for event_name, level, direction, channel in bank.hall_channels():
+            if channel.waiters:
+                channels.append({"agent": ["bank", b], "event": event_name, "level": level, "direction": direction,
+                                 "waiters": [handler_reference(waiter) for waiter in channel.waiters]})
+    for agent, reference in agents:
+        for event_name, channel in getattr(agent, "channels", dict()).items():
+            if channel.waiters:
+                channels.append({"agent": reference, "event": event_name,
+                                 "waiters": [handler_reference(waiter) for waiter in channel.waiters]})
+    handlers = [event[3] for event in queue] + [entry[2] for entry in entries]
+    handlers.extend(waiter for channel in channels for waiter in channel["waiters"])
+    if any(reference is None for reference in handlers):
+        return None
+
+    hall_calls = []
+    for b, bank in enumerate(banks):
+        for level in range(1, len(bank.floors) + 1):
+            for direction in (1, -1):
+                calls = bank.hall_calls.calls(level, direction)
+                if calls:
+                    hall_calls.append([b, level, direction, [numbers[id(person)] for person, _ in calls],
+                                       [time for _, time in calls]])
+    elevators = [elevator for bank in banks for elevator in bank.elevators]
+    agent_states = [person.checkpoint() for person in simulation.people]
+    if simulation.population is not None:
+        agent_states.extend(simulation.population.checkpoint())
+        for p, traveller in people[len(simulation.people):]:
+            agent_states[p]["trip"] = traveller.trip_state()
+    return {"next_eid": next_eid,
+            "processed": env.processed,
+            "queue": queue,
+            "calendar": entries,
+            "channels": channels,
+            "elevators": [elevator.travel_state() for elevator in elevators],
+            "people": agent_states,
+            "hall_calls": hall_calls,
+            "riders": [[numbers[id(person)] for person in elevator.riders] for elevator in elevators],
+            # the people of an unseeded simulation draw their calls from the shared random stream
+            "random": random.getstate() if simulation.seed is None else None}
+
+
+def save_snapshot(simulation, fh):
+    """writes the snapshot of the simulation to a text stream as json"""
+    json.dump(snapshot(simulation), fh)
+
+
+def load_snapshot(fh):
+    """reads a snapshot written by save_snapshot from a text stream"""
+    return json.load(fh)
+
+
+def restore(simulation, state):
+    """Puts a simulation in the state of a snapshot, to carry on from there instead of running the day from its start.
+
+    The simulation is built from the scenario the snapshot was taken of, with the same settings, and has not run yet.
+    Run from there, it records the very trips the simulation of the snapshot records after the snapshot, and its trip
+    sink, if any, counts the trips recorded before the snapshot as written. The shared random stream is put back in
+    its state at the snapshot for the people of an unseeded simulation to draw from. Only a simulation of the events
+    engine whose people are created up front or held in a person store can be restored, from the snapshot of one.
+
+    :param simulation Simulation: the simulation to restore
+    :param state dict: the snapshot, see snapshot
+    """
+    env = simulation.env
+    resume = state.get("resume")
+    if resume is None:
+        raise ValueError("The snapshot is only for inspection, resuming needs that of a simulation of the events engine "
+                         "with every person created")
+    if not isinstance(env, EventQueue) or env.processed or len(simulation.calendar):
+        raise ValueError("Only a simulation of the events engine which has not run yet, with every person created, "
+                         "can be restored")
+    banks = simulation.elevator_banks
+    elevators = [elevator for bank in banks for elevator in bank.elevators]
+    population = simulation.population
+    people = list(simulation.people)
+    count = len(people) + (len(population) if population is not None else 0)
+    if len(elevators) != len(state["elevators"]) or count != len(state["people"]):
+        raise ValueError("The snapshot is of {} elevators and {} people, not {} and {}".format(
+            len(state["elevators"]), len(state["people"]), len(elevators), count))
+
+    if simulation.trip_sink is not None and state["trips"]:
+        simulation.trip_sink.skip(state["trips"])
+
+    for person, person_state, agent_state in zip(people, state["people"], resume["people"]):
+        person.restore(person_state, agent_state)
+    if population is not None:
+        population.restore(state["people"][len(people):], resume["people"][len(people):])
+        for i, agent_state in enumerate(resume["people"][len(people):]):
+            traveller = None
+            if agent_state["trip"] is not None:
+                traveller = population.traveller(i)
+                traveller.restore_trip(agent_state["trip"], functools.partial(population.arrived, i))
+            people.append(traveller)
+
+    for elevator, elevator_state, travel, riders in zip(elevators, state["elevators"], resume["elevators"],
+                                                        resume["riders"]):
+        elevator.level = elevator_state["level"]
+        elevator.direction = elevator_state["direction"]
+        for level in elevator_state["stops"]:
+            ElevatorModel.add_stop(elevator, level)
+        elevator.restore_travel(travel)
+        elevator.open_doors()
+        for p in riders:
+            elevator.enter(people[p])
+        if not elevator_state["doors_open"]:
+            elevator.close_doors()
+    for b, level, direction, callers, called in resume["hall_calls"]:
+        for p, time in zip(callers, called):
+            banks[b].hall_calls.add(people[p], level, direction, time)
+
+    def agent(reference):
+        if reference[0] == "bank":
+            return banks[reference[1]]
+        if reference[0] == "elevator":
+            return banks[reference[1]].elevators[reference[2]]
+        if reference[0] == "person":
+            return people[reference[1]]
+        return population
+
+    def handler(reference):
+        return agent(reference["agent"])._handlers()[reference["handler"]]
+
+    if resume["random"] is not None:
+        version, internal, gauss_next = resume["random"]
+        random.setstate((version, tuple(internal), gauss_next))
+    events = [(at, priority, eid, handler(reference), value) for at, priority, eid, reference, value in resume["queue"]]
+    env.restore(state["time"], resume["next_eid"], events, resume["processed"])
+    entries = [(at, eid, handler(reference), value) for at, eid, reference, value in resume["calendar"]]
+    simulation.calendar.restore(entries)
+    wakes = dict()
+    for entry in resume["channels"]:
+        owner = agent(entry["agent"])
+        if "level" in entry:
+            channel = owner._hall_channel(entry["event"], entry["level"], entry["direction"])
+        else:
+            channel = owner.channel(entry["event"])
+        for reference in entry["waiters"]:
+            callback = handler(reference)
+            if "wake" in reference:
+                if reference["wake"] not in wakes:
+                    wakes[reference["wake"]] = _Wake(env, callback, reference["triggered"])
+                callback = wakes[reference["wake"]]
+            channel.wait(callback)
+
+
+def apply_variant(simulation, variant):
+    """changes the simulation as the variant says
+
+    :param variant str|function: the name of the dispatch strategy every elevator bank switches to, or a function
+    called with the simulation to change it
+    """
+    if callable(variant):
+        variant(simulation)
+    else:
+        for bank in simulation.elevator_banks:
+            bank.dispatch_strategy = variant
+
+
+def _run_variant(simulation, variant, connection):
+    """runs the variant to the end of the day in a forked process and sends back its trips"""
+    try:
+        if not isinstance(simulation.trip_sink, TripStore):
+            simulation.trip_sink = TripStore()
+        apply_variant(simulation, variant)
+        simulation.run()
+        connection.send((True, simulation.trip_sink))
+    except Exception:
+        connection.send((False, traceback.format_exc()))
+    finally:
+        connection.close()
+
+
+def fork_variants(simulation, variants, max_workers=None):
+    """Runs each variant of the simulation from the time it stopped to the end of the day, in forked processes.
+
+    Every variant starts from the very state the simulation stopped in, random number generators included, and the
+    simulation itself is left as is, so it serves as the checkpoint of any number of later forks or can be continued.
+    A variant records its trips in a TripStore: the trip sink of the simulation when it is one, its trips before the
+    checkpoint included, a new one otherwise. Forking requires a platform with the fork start method.
+
+    :param simulation Simulation: the simulation, stopped by Simulation.run(until)
+    :param variants list: the variants to run, see apply_variant
+    :param max_workers int: the number of variants run at once (def: number of processors)
+    :rtype generator: yields (variant, store) in the order the variants were given
+    """
+    context = multiprocessing.get_context("fork")
+    max_workers = max_workers or os.cpu_count() or 1
+    if simulation.trip_sink is not None:
+        simulation.trip_sink.flush()
+
+    for first in range(0, len(variants), max_workers):
+        running = []
+        for variant in variants[first:first + max_workers]:
+            receiver, sender = context.Pipe(duplex=False)
+            process = context.Process(target=_run_variant, args=(simulation, variant, sender))
+            process.start()
+            sender.close()
+            running.append((variant, process, receiver))
+
+        for variant, process, receiver in running:
+            try:
+                ok, result = receiver.recv()
+            except EOFError:
+                ok, result = False, None
+            process.join()
+            if not ok:
+                raise RuntimeError("Variant {} failed: {}".format(variant, result or "its process exited with code {}".format(process.exitcode)))
+            yield variant, result
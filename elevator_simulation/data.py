@@ -1,6 +1,8 @@
 #!/usr/bin/env python
 # encoding: utf-8
 
+import numpy as np
+
 
 class ElevatorTrip(object):
     """models data around an elevator trip"""
@@ -31,3 +33,69 @@ def to_csv_header(cls):
 def to_csv(obj):
     """returns the slotted object as a comma separated value string"""
     return ",".join([str(getattr(obj, attr)) for attr in obj.__class__.__slots__])
+
+
+TRIP_COLUMNS = (("elevator_called_secs", "f8"),
+                ("elevator_arrived_secs", "f8"),
+                ("travel_secs", "f8"),
+                ("person", "S32"),
+                ("start", "i4"),
+                ("destination", "i4"),
+                ("description", "i4"),  # index into the descriptions of the buffer
+                ("direction", "i1"),
+                ("distance", "i4"))
+
+
+class TripBuffer(object):
+    """preallocated columnar buffer of elevator trips, one array per ElevatorTrip slot
+
+    Descriptions are stored as indexes into the descriptions list of the buffer, which only grows so that indexes
+    stay valid across clears.
+    """
+
+    def __init__(self, size):
+        """creates a buffer able to hold the given number of trips"""
+        self.__size = size
+        self.__length = 0
+        self.columns = {name: np.zeros(size, dtype=dtype) for name, dtype in TRIP_COLUMNS}
+        self.descriptions = []
+        self.__description_index = dict()
+
+    def __len__(self):
+        return self.__length
+
+    @property
+    def full(self):
+        """returns True if no more trips can be appended before clearing"""
+        return self.__length >= self.__size
+
+    def append(self, trip):
+        """copies the trip into the next row of the buffer"""
+        i = self.__length
+        columns = self.columns
+        columns["elevator_called_secs"][i] = trip.elevator_called_secs
+        columns["elevator_arrived_secs"][i] = trip.elevator_arrived_secs
+        columns["travel_secs"][i] = trip.travel_secs
+        columns["person"][i] = trip.person
+        columns["start"][i] = trip.start
+        columns["destination"][i] = trip.destination
+        columns["description"][i] = self.description_index(trip.description)
+        columns["direction"][i] = trip.direction
+        columns["distance"][i] = trip.distance
+        self.__length = i + 1
+
+    def description_index(self, description):
+        """returns the index of the description, adding it to the descriptions if it is new"""
+        index = self.__description_index.get(description)
+        if index is None:
+            index = self.__description_index[description] = len(self.descriptions)
+            self.descriptions.append(description)
+        return index
+
+    def view(self):
+        """returns the filled part of every column"""
+        return {name: column[:self.__length] for name, column in self.columns.items()}
+
+    def clear(self):
+        """empties the buffer, keeping the arrays for reuse"""
+        self.__length = 0
@@ -0,0 +1,8 @@
+#!/usr/bin/env python
+# encoding: utf-8
+
+from elevator_simulation.engine.simulation import Simulation, EventQueue, URGENT, NORMAL
+from elevator_simulation.engine.agent import AgentMixin, Channel
+from elevator_simulation.engine.elevator import ElevatorBank, Elevator
+from elevator_simulation.engine.person import Person, TripMixin
+from elevator_simulation.engine.population import PersonStore, Traveller
@@ -0,0 +1,122 @@
+#!/usr/bin/env python
+# encoding: utf-8
+
+
+def _deliver(delivery):
+    """calls each callback of a notification with its value"""
+    callbacks, value = delivery
+    for callback in callbacks:
+        callback(value)
+
+
+class Channel(object):
+    """A broadcast channel: notifications are delivered to everyone waiting on it and to its subscribers.
+
+    A notification schedules a single event delivering its value to the callbacks of the waiters and to the
+    subscribers, in the order agents.Channel invokes them, and allocates nothing when nobody waits or subscribes.
+    Waiters are called once, subscribers on every notification.
+    """
+
+    def __init__(self, env):
+        """creates a channel of the event queue
+
+        :param env EventQueue: the queue of the events the channel schedules
+        """
+        self.__env = env
+        self.__callbacks = None  # the callbacks of the current waiters, created on demand
+        self.__subscribers = []
+        self.notifications = 0  # number of notifications sent on the channel
+        self.deliveries = 0  # number of notifications that reached a waiter or a subscriber
+
+    def subscribe(self, callback):
+        """has the callback called with the notified value on every notification"""
+        if not self.__subscribers and self.__callbacks is not None:
+            self.__callbacks.append(self.__dispatch)
+        self.__subscribers.append(callback)
+
+    def wait(self, callback):
+        """has the callback called with the notified value on the next notification"""
+        if self.__callbacks is None:
+            self.__callbacks = [self.__dispatch] if self.__subscribers else []
+        self.__callbacks.append(callback)
+
+    @property
+    def waiting(self):
+        """True if a callback waits for the next notification"""
+        return self.__callbacks is not None
+
+    @property
+    def waiters(self):
+        """the callbacks waiting for the next notification, in the order they are called"""
+        if self.__callbacks is None:
+            return []
+        return [callback for callback in self.__callbacks if callback != self.__dispatch]
+
+    def notify(self, value=None):
+        """schedules the delivery of the value to the current waiters and the subscribers"""
+        self.notifications += 1
+        callbacks = self.__callbacks
+        if callbacks is None:
+            if not self.__subscribers:
+                return
+            callbacks = [self.__dispatch]
+        self.__callbacks = None
+        self.deliveries += 1
+        if len(callbacks) == 1:
+            self.__env.schedule(self.__env.now, callbacks[0], value)
+        else:
+            self.__env.schedule(self.__env.now, _deliver, (callbacks, value))
+
+    def __dispatch(self, value):
+        for callback in self.__subscribers:
+            callback(value)
+
+
+class AgentMixin(object):
+    """Mixin class defining agents driven by the event queue of a simulation."""
+
+    def __init__(self, simulation, events=[]):
+        self.__simulation = simulation
+        self.env = simulation.env  # used in every handler, hence a plain attribute
+        self.tracer = simulation.tracer
+        self.__channels = {event: Channel(self.env) for event in events}
+
+    @property
+    def simulation(self):
+        """the simulation object that this agent lives under"""
+        return self.__simulation
+
+    @property
+    def channels(self):
+        """the channels of the events of the agent, by event name"""
+        return dict(self.__channels)
+
+    def _handlers(self):
+        """the handlers the agent can leave waiting on an event or a channel, by name, see checkpoint.restore"""
+        return dict()
+
+    def channel(self, event_name):
+        """returns the channel of the events with the given name"""
+        if event_name not in self.__channels:
+            raise ValueError("No event '{}' exists for this agent".format(event_name))
+
+        return self.__channels[event_name]
+
+    def wait_event(self, event_name, callback):
+        """has the callback called with the value of the next event with the given name"""
+        self.channel(event_name).wait(callback)
+
+    def register_event_callback(self, event_name, callback):
+        """registers an event callback for the given event
+
+        :param event_name str: Name of the event
+        :param callback function: The function to call with the value of each event.
+        """
+        self.channel(event_name).subscribe(callback)
+
+    def notify_event(self, event_name, value=None):
+        """triggers the event owned by this event with the given event name
+
+        :param event_name str: name of the event to notify
+        """
+        self.channel(event_name).notify(value)
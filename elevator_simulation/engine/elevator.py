@@ -0,0 +1,139 @@
+#!/usr/bin/env python
+# encoding: utf-8
+
+from elevator_simulation.agents import trace
+from elevator_simulation.agents.elevator import ElevatorBankMixin, ElevatorMixin
+from elevator_simulation.engine.agent import AgentMixin, Channel
+from elevator_simulation.engine.simulation import URGENT
+from elevator_simulation.models import ElevatorBank as ElevatorBankModel
+from elevator_simulation.models import Elevator as ElevatorModel
+
+
+class ElevatorBank(ElevatorBankMixin, AgentMixin, ElevatorBankModel):
+    """elevator bank controller driven by the event queue, see agents.ElevatorBank"""
+
+    def __init__(self, sim, **kwargs):
+        """Constructs an elevator controller of the simulation.
+
+        :note: takes the parameters of agents.ElevatorBank
+        """
+        AgentMixin.__init__(self, sim, events=["elevator_door_open", "elevator_moving_on"])
+        kwargs["elevator_cls"] = Elevator  # elevator class to instantiate on calls to add_elevator
+        kwargs.setdefault("idents", sim.idents)
+        ElevatorBankModel.__init__(self, sim.building.floors, **kwargs)
+        ElevatorBankMixin.__init__(self, Channel)
+
+        self.register_event_callback("elevator_door_open", self._elevator_door_open)
+        self.register_event_callback("elevator_moving_on", self._elevator_moving_on)
+
+    def wait_hall_event(self, event_name, floor, direction, callback):
+        """has the callback called with the elevator the next time the hall event of the floor and direction occurs
+
+        see agents.ElevatorBankMixin._hall_channel for the hall events
+
+        :param event_name str: name of the event
+        :param floor Floor: the floor people wait on, or its level
+        :param direction int: the direction people wait to go
+        :param callback func: called with the elevator
+        """
+        self._hall_channel(event_name, floor, direction).wait(callback)
+
+
+class Elevator(ElevatorMixin, AgentMixin, ElevatorModel):
+    """Elevator driven by the event queue, see agents.Elevator.
+
+    The elevator is a state machine: each handler runs a stretch of what the agent does between two waits, and
+    schedules the handler to carry on with when the wait is over.
+    """
+
+    def __init__(self, sim, floors, **kwargs):
+        """Constructs an elevator of the simulation
+
+        :note: takes the parameters of agents.Elevator
+        """
+        AgentMixin.__init__(self, sim, events=["new_stop_added"])
+        ElevatorModel.__init__(self, floors, **kwargs)
+        ElevatorMixin.__init__(self, **kwargs)
+        self.env.schedule(self.env.now, self.__idle, priority=URGENT)
+
+    def _handlers(self):
+        return {"idle": self.__idle, "move": self.__move, "step_completed": self.__step_completed,
+                "leg_completed": self.__leg_completed, "leg_interrupted": self.__leg_interrupted,
+                "doors_opened": self.__doors_opened, "passengers_waited": self.__passengers_waited,
+                "doors_closed": self.__doors_closed}
+
+    def __idle(self, value=None):
+        """waits until a new stop is added to the elevator"""
+        self.wait_event("new_stop_added", self.__move)
+
+    def __move(self, value=None):
+        """moves toward the next stop, or goes idle once it runs out of stops"""
+        if not self.has_stops:
+            self._travel = None
+            self.direction = 0  # idle, no more stops
+            self.__idle()
+            return
+
+        tracer = self.tracer
+        if tracer.categories & trace.MOVEMENT:
+            tracer.trace(self.env.now, trace.ELEVATOR_MOVING, self.ident, self.level, self.direction or 0)
+        if not self.has_stop(self.level):
+            steps = self._move_on()
+            if steps > 1:
+                self.__fast_forward(steps)
+            else:
+                # move to the next floor
+                self.__travel_until(self.env.now + self.elevator_travel_secs, self.__step_completed)
+            return
+        self.__reached()
+
+    def __travel_until(self, at, handler, value=None):
+        """has the handler called once the elevator travelled until the given time
+
+        The timeouts between two stops form a chain, so travel keeps its place among simultaneous events whether it
+        is stepwise or fast forwarded.
+        """
+        self._travel = self.env.timeout_at(at, handler, self._travel, value)
+
+    def __step_completed(self, value=None):
+        self.level = self.next_level
+        self._floor_reached()
+        self.__reached()
+
+    def __reached(self):
+        """stops if the elevator reached one of its stops, moves on otherwise"""
+        if self.has_stop(self.level):
+            if self.tracer.categories & trace.DOORS:
+                self.tracer.trace(self.env.now, trace.ELEVATOR_AT_STOP, self.ident, self.level)
+            self._travel = None
+            self.env.timeout(self.elevator_open_secs, self.__doors_opened)
+        else:
+            self.__move()
+
+    def __fast_forward(self, steps):
+        """travels the given number of floors with a single timeout, see agents.ElevatorMixin"""
+        boundaries = self._start_leg(steps)
+        self.__travel_until(boundaries[-1], self.__leg_completed, boundaries)
+
+    def __leg_completed(self, boundaries):
+        if self._finish_leg(boundaries):  # unless the leg was interrupted
+            self._floor_reached()
+            self.__reached()
+
+    def _interrupt_leg(self, at):
+        self.env.schedule(self.env.now, self.__leg_interrupted, at, URGENT)
+
+    def __leg_interrupted(self, at):
+        """finishes the step the elevator is on when its leg was interrupted"""
+        self.__travel_until(at, self.__step_completed)
+
+    def __doors_opened(self, value=None):
+        self._doors_opened()
+        self.env.timeout(self.elevator_wait_secs, self.__passengers_waited)
+
+    def __passengers_waited(self, value=None):
+        self.env.timeout(self.elevator_close_secs, self.__doors_closed)
+
+    def __doors_closed(self, value=None):
+        self.close_doors()
+        self.__move()
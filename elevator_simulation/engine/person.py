@@ -0,0 +1,262 @@
+#!/usr/bin/env python
+# encoding: utf-8
+
+from operator import attrgetter
+from elevator_simulation.agents import trace
+from elevator_simulation.agents.person import get_call_strategy, call_stream, stream_name, next_due_event
+from elevator_simulation.agents.person import PersonMixin, may_board
+from elevator_simulation.engine.agent import AgentMixin
+from elevator_simulation.engine.simulation import URGENT
+from elevator_simulation.models import Person as PersonModel
+
+_start_time = attrgetter("start_time")  # the start time of a schedule event, see agents.person.next_due_event
+
+
+class _Wake(object):
+    """wakes a person waiting on the hall events of several banks once, when the first of them occurs"""
+
+    def __init__(self, env, handler, triggered=False):
+        self.__env = env
+        self.handler = handler
+        self.triggered = triggered
+
+    def __call__(self, elevator):
+        if not self.triggered:
+            self.triggered = True
+            self.__env.schedule(self.__env.now, self.handler, elevator)
+
+
+def _car(elevator_banks, elevator):
+    """returns the index of the bank of the elevator among the elevator banks, and of the elevator in its bank"""
+    for i, bank in enumerate(elevator_banks):
+        if elevator in bank.elevators:
+            return [i, bank.elevators.index(elevator)]
+    raise ValueError("The elevator is in none of the elevator banks")
+
+
+class TripMixin(PersonMixin):
+    """Mixin class for the people riding the elevators, from calling an elevator to arriving on the destination.
+
+    The decisions on the way are those of agents.PersonMixin, taken in handlers run by the event queue. The agent
+    provides the AgentMixin attributes, ident, uuid and call_strategy.
+    """
+
+    __trip = None  # the trip the person is on, None before the first one and between two
+    __elevator = None  # the elevator the person last had open its doors for it on the trip
+
+    def _trip_handlers(self):
+        """the handlers of a trip by name, see AgentMixin._handlers"""
+        return {"elevator_door_open": self.__elevator_door_open, "elevator_moving_on": self.__elevator_moving_on,
+                "ride": self.__ride}
+
+    def trip_state(self):
+        """returns the trip the person is on as plain data, None if it is on none, see checkpoint.snapshot
+
+        Elevator banks are given by their index in the simulation, and elevators by the index of their bank and their
+        index in it.
+        """
+        trip = self.__trip
+        if trip is None:
+            return None
+        elevator_banks = self.simulation.elevator_banks
+        return {"start": trip.start,
+                "destination": trip.destination,
+                "description": trip.description,
+                "elevator_called_secs": trip.elevator_called_secs,
+                "elevator_arrived_secs": trip.elevator_arrived_secs,
+                "elevator_banks": [elevator_banks.index(agent) for agent in self.__elevator_banks],
+                "assigned": [_car(elevator_banks, car) for agent, car in self.__assigned],
+                "elevator": _car(elevator_banks, self.__elevator) if self.__elevator is not None else None}
+
+    def restore_trip(self, state, arrived):
+        """puts the person back on the trip given by trip_state, counting the cars it was assigned again
+
+        The person still has to be put back in the hall calls or among the passengers, and on the channels it waits on.
+
+        :param arrived func: called with the trip once the person got out on the destination
+        """
+        elevator_banks = self.simulation.elevator_banks
+        trip = self.__trip = self._new_trip(state["start"], state["destination"], state["description"],
+                                            state["elevator_called_secs"])
+        trip.elevator_arrived_secs = state["elevator_arrived_secs"]
+        self.__arrived = arrived
+        self.__elevator_banks = [elevator_banks[i] for i in state["elevator_banks"]]
+        self.__assigned = []
+        for i, index in state["assigned"]:
+            agent = elevator_banks[i]
+            agent.dispatch_state.assign(index, trip.destination)
+            self.__assigned.append((agent, agent.elevators[index]))
+        elevator = state["elevator"]
+        self.__elevator = elevator_banks[elevator[0]].elevators[elevator[1]] if elevator is not None else None
+
+    def start_trip(self, level, destination, description, rng, arrived):
+        """calls the elevator banks for a trip from the level to the destination, and rides an elevator there
+
+        :param rng Random: what the call strategy draws from, see agents.person.call_stream
+        :param arrived func: called with the trip once the person got out on the destination
+        """
+        self.__trip = self._new_trip(level, destination, description, self.env.now)
+        self.__arrived = arrived
+        self.__elevator_banks = self._choose_banks(level, rng)
+        self.__call()
+
+    def __call(self):
+        """calls the elevator banks and waits for an elevator to open its doors on the floor"""
+        self.__assigned = self._call(self.__trip, self.__elevator_banks)
+        self.__wait_for("elevator_door_open", self.__elevator_door_open)
+
+    def __wait_for(self, event_name, handler):
+        """waits with everyone else on this floor for the named hall event of any of the banks
+
+        :param handler func: called with the elevator that triggered the event
+        """
+        elevator_banks, trip = self.__elevator_banks, self.__trip
+        if len(elevator_banks) == 1:
+            elevator_banks[0].wait_hall_event(event_name, trip.start, trip.direction, handler)
+            return
+
+        # the first bank to trigger its event wakes the person
+        wake = _Wake(self.env, handler)
+        for agent in elevator_banks:
+            agent.wait_hall_event(event_name, trip.start, trip.direction, wake)
+
+    def __elevator_door_open(self, elevator):
+        if not may_board(self.__assigned, elevator):
+            # another car than the one destination dispatch assigned
+            self.__wait_for("elevator_door_open", self.__elevator_door_open)
+            return
+
+        self.__elevator = elevator
+        boarded = self._board(self.__trip, self.__elevator_banks, self.__assigned, elevator)
+        if boarded is not None:
+            self.__assigned = boarded
+            self.__ride()
+        else:
+            self.__wait_for("elevator_moving_on", self.__elevator_moving_on)
+
+    def __elevator_moving_on(self, elevator):
+        self._call_again(self.__trip, self.__elevator_banks, self.__assigned, self.__elevator)
+        self.__call()
+
+    def __ride(self, value=None):
+        """rides the elevator until it opens its doors on the destination"""
+        elevator, trip = self.__elevator, self.__trip
+        if elevator.level != trip.destination:
+            self.wait_event("elevator_door_open", self.__ride)
+            return
+
+        self._get_out(trip, self.__assigned, elevator)
+        arrived = self.__arrived
+        self.__trip = self.__elevator_banks = self.__elevator = self.__assigned = self.__arrived = None
+        arrived(trip)
+
+
+class Person(TripMixin, AgentMixin, PersonModel):
+    """Person driven by the event queue, see agents.Person.
+
+    The person is a state machine: each handler runs a stretch of what the agent does between two waits, and
+    schedules the handler to carry on with when the wait is over. The trips themselves are made by TripMixin.
+    """
+
+    def __init__(self, sim, **kwargs):
+        """creates a person of the simulation
+
+        :note: takes the parameters of agents.Person
+        """
+        AgentMixin.__init__(self, sim, events=["floor_reached", "elevator_door_open", "elevator_moving_on"])
+        kwargs.setdefault("idents", sim.idents)
+        PersonModel.__init__(self, **kwargs)
+
+        self.env.schedule(self.env.now, self.__start, priority=URGENT)
+        self.call_strategy = get_call_strategy(kwargs.get("elevator_call_strategy", "call_strategy_random"))
+        self.trip_complete = kwargs.get("trip_complete", sim.trip_complete)
+        self.__stream_name = stream_name(sim.seed, self.uuid if "uuid" in kwargs else None, kwargs.get("index"))
+        self.calls = 0  # the number of elevator calls made so far
+        self.__idle = None  # chain of the calendar entries between elevator trips
+        self.__next_event = None  # the schedule event the person waits for or travels to
+
+    @property
+    def rng(self):
+        """what the person draws from on its next call, see agents.person.call_stream"""
+        return call_stream(self.simulation.seed, self.__stream_name, self.calls)
+
+    def _handlers(self):
+        return dict(self._trip_handlers(), start=self.__start, wait_for_next_event=self.__wait_for_next_event,
+                    event_due=self.__event_due)
+
+    def checkpoint(self):
+        """returns what the agent holds beyond the model of the person as plain data, see checkpoint.snapshot
+
+        :rtype dict: the chain of the calendar entries between trips and the trip, see trip_state
+        """
+        return {"idle": list(self.__idle) if self.__idle is not None else None,
+                "trip": self.trip_state()}
+
+    def restore(self, state, agent_state):
+        """puts the person back in the state of a snapshot, see checkpoint.restore
+
+        :param state dict: the level, schedule position and number of calls of the person, see checkpoint.snapshot
+        :param agent_state dict: what the agent held beyond the model, see checkpoint
+        """
+        if state["level"] is not None:
+            self.location = self.simulation.building.floors[state["level"] - 1]
+        self.schedule.seek(state["position"])
+        self.calls = state["calls"]
+        self.__idle = list(agent_state["idle"]) if agent_state["idle"] is not None else None
+        # the event the person waits for or travels to is the last one the cursor moved past
+        self.__next_event = self.schedule.events[state["position"] - 1] if state["position"] else None
+        if agent_state["trip"] is not None:
+            self.restore_trip(agent_state["trip"], self.__arrived)
+
+    def __start(self, value=None):
+        if self.tracer.categories & trace.PEOPLE:
+            self.tracer.trace(self.env.now, trace.PERSON_STARTED, self.ident)
+        # set the model location to the first floor
+        self.location = self.simulation.building.floors[0]
+        self.schedule.rewind()
+        self.__wait_for_next_event()
+
+    def __wait_for_next_event(self, value=None):
+        """waits until the next event of the schedule, or is done if none is left"""
+        tracer = self.tracer
+        now = self.env.now
+        next_event, next_event_secs = next_due_event(now, self.schedule.advance, _start_time,
+                                                     self.__stays if self.simulation.fast_forward else None)
+        # if no event left, we are done
+        if next_event is None:
+            if tracer.categories & trace.PEOPLE:
+                tracer.trace(now, trace.PERSON_DONE, self.ident)
+            return
+
+        if tracer.categories & trace.PEOPLE:
+            tracer.trace(now, trace.PERSON_WAITING, self.ident, self.location.level, next_event_secs)
+        self.__next_event = next_event
+        self.__idle = self.simulation.calendar.add(next_event_secs, self.__event_due, self.__idle)
+
+    def __event_due(self, value=None):
+        tracer = self.tracer
+        now = self.env.now
+        if tracer.categories & trace.PEOPLE:
+            tracer.trace(now, trace.PERSON_RESUMING, self.ident, self.location.level)
+
+        next_event = self.__next_event
+        level, destination = self.location.level, next_event.location.level
+        if destination == level:
+            if tracer.categories & trace.PEOPLE:
+                tracer.trace(now, trace.PERSON_STAYING, self.ident, level)
+            self.__idle = self.simulation.calendar.add(now + 0.001, self.__wait_for_next_event, self.__idle)
+            return
+
+        self.__idle = None
+        rng = self.rng
+        self.calls += 1
+        self.start_trip(level, destination, next_event.description, rng, self.__arrived)
+
+    def __arrived(self, trip):
+        self.location = self.__next_event.location  # we reached our location, yay!
+        self.trip_complete(trip)
+        self.__wait_for_next_event()
+
+    def __stays(self, event):
+        """returns whether the person stays where it is for the event, see agents.person.next_due_event"""
+        return event.location == self.location
@@ -0,0 +1,236 @@
+#!/usr/bin/env python
+# encoding: utf-8
+
+import functools
+import uuid
+from datetime import timedelta
+import numpy as np
+from elevator_simulation.agents import trace
+from elevator_simulation.agents.person import get_call_strategy, call_stream, next_due_event
+from elevator_simulation.engine.agent import AgentMixin
+from elevator_simulation.engine.person import TripMixin
+from elevator_simulation.engine.simulation import URGENT
+from elevator_simulation.generators.binary import NO_CALL_STRATEGY
+
+
+class Traveller(TripMixin, AgentMixin):
+    """A person of a PersonStore on an elevator trip, the only time the person has an agent of its own.
+
+    The traveller hashes and compares by the identity of the person, like a Person agent.
+    """
+
+    def __init__(self, store, index, call_strategy):
+        AgentMixin.__init__(self, store.simulation, events=["floor_reached", "elevator_door_open", "elevator_moving_on"])
+        self.__store = store
+        self.__index = index
+        self.ident = store.ident(index)
+        self.call_strategy = call_strategy
+
+    @property
+    def uuid(self):
+        """the uuid of the person as a hex string"""
+        return self.__store.uuid(self.__index)
+
+    @property
+    def index(self):
+        """the index of the person in the store"""
+        return self.__index
+
+    def _handlers(self):
+        return self._trip_handlers()
+
+    def __repr__(self):
+        return "{}(ident={})".format(self.__class__.__name__, self.ident)
+
+    def __hash__(self):
+        return self.ident
+
+    def __eq__(self, obj):
+        return self.ident == obj.ident
+
+
+class PersonStore(object):
+    """The people of a simulation held in arrays, with an agent only for the people on an elevator trip.
+
+    Between two trips a person is a row of small arrays: level, schedule position, call strategy, the chain
+    of its calendar entries and the number of calls it made so far, next to the schedule events of the binary
+    scenario format, which can stay in a memory map. When an event needs the elevator a Traveller makes the trip
+    and is dropped on arrival. The people wait, call and ride as engine.Person agents created up front would, so the
+    trips are the same; people never have a random stream of their own between trips, the stream of a seeded
+    simulation is the agents.person.CallStream of the number of calls the person made.
+    """
+
+    def __init__(self, simulation, call_strategies, descriptions, arrays, **kwargs):
+        """creates the people of the arrays and starts them at the current time of the simulation
+
+        :param simulation Simulation: the engine simulation the people live in
+        :param call_strategies list: the call strategies indexed by person_strategy
+        :param descriptions list: the descriptions indexed by event_description
+        :param arrays dict: the arrays of the people and their events, see generators.binary.write_scenario
+        :param call_strategy str: overrides the call strategy of every person (def: None, the arrays')
+        :param trip_complete func: the function each trip is passed to once complete (def: the simulation's)
+        """
+        self.simulation = simulation
+        self.trip_complete = kwargs.get("trip_complete", simulation.trip_complete)
+        self.__env = simulation.env
+        self.__calendar = simulation.calendar
+        self.__tracer = simulation.tracer
+        self.__descriptions = list(descriptions)
+        self.__event_start = arrays["event_start"]
+        self.__event_level = arrays["event_level"]
+        self.__event_description = arrays["event_description"]
+
+        person_strategy = np.asarray(arrays["person_strategy"], dtype=np.uint8)
+        count = len(person_strategy)
+        # the index of the first event of each person, and one past the last event
+        self.__offsets = np.searchsorted(arrays["event_person"], np.arange(count + 1))
+
+        # people without a uuid are given one, their random streams are still keyed by their index
+        person_uuid = np.asarray(arrays["person_uuid"], dtype=np.uint8).reshape(-1, 16)
+        self.__named = person_uuid.any(axis=1)
+        unnamed = np.flatnonzero(~self.__named)
+        if len(unnamed):
+            person_uuid = person_uuid.copy()
+            person_uuid[unnamed] = np.frombuffer(b"".join(uuid.uuid4().bytes for _ in unnamed), dtype=np.uint8).reshape(-1, 16)
+        self.__uuid = person_uuid
+        idents = simulation.idents
+        self.__ident = np.array([idents.ident_for(person_uuid[i].tobytes().hex()) for i in range(count)], dtype=np.int64)
+
+        call_strategy = kwargs.get("call_strategy")
+        if call_strategy is not None:
+            self.__call_strategies = [get_call_strategy(call_strategy)]
+            self.strategy = np.zeros(count, dtype=np.uint8)
+        else:
+            self.__call_strategies = [get_call_strategy(name) for name in call_strategies]
+            self.strategy = person_strategy
+            if (person_strategy == NO_CALL_STRATEGY).any():
+                self.strategy = np.where(person_strategy == NO_CALL_STRATEGY, len(call_strategies), person_strategy).astype(np.uint8)
+                self.__call_strategies.append(get_call_strategy("call_strategy_random"))  # the default of Person
+
+        self.level = np.zeros(count, dtype=np.int16)  # 0 until the person started
+        self.position = self.__offsets[:-1].copy()  # index of the first event the schedule cursor has not moved past
+        self.calls = np.zeros(count, dtype=np.uint32)  # keys the call streams, must not wrap around
+        self.__chain_eid = np.full(count, -1, dtype=np.int64)  # the chain of the calendar entries, -1 for none
+        self.__chain_length = np.zeros(count, dtype=np.int32)
+        self.__event_due_handler = self.__event_due
+        self.__wait_handler = self.__wait_for_next_event
+
+        self.__env.schedule(self.__env.now, self.__start, priority=URGENT)
+
+    def __len__(self):
+        """the number of people in the store"""
+        return len(self.level)
+
+    def ident(self, index):
+        """the integer identity of the person"""
+        return int(self.__ident[index])
+
+    def uuid(self, index):
+        """the uuid of the person as a hex string"""
+        return self.__uuid[index].tobytes().hex()
+
+    def snapshot(self):
+        """returns the uuid, level, schedule position and number of calls of each person, as in checkpoint.snapshot"""
+        return [{"uuid": self.uuid(i),
+                 "level": int(self.level[i]) or None,
+                 "position": int(self.position[i] - self.__offsets[i]),
+                 "calls": int(self.calls[i])} for i in range(len(self))]
+
+    def checkpoint(self):
+        """returns the chain of the calendar entries of each person as engine.Person.checkpoint, without the trip
+
+        The trips are those of the travellers, see traveller.
+        """
+        return [{"idle": [int(self.__chain_eid[i]), int(self.__chain_length[i])] if self.__chain_eid[i] >= 0 else None,
+                 "trip": None} for i in range(len(self))]
+
+    def restore(self, people, agent_states):
+        """puts the people back in the state given by snapshot and checkpoint, see checkpoint.restore
+
+        :param people list: the state of each person, in the order of the store
+        :param agent_states list: the chain of the calendar entries of each person, see checkpoint
+        """
+        for i, (state, agent_state) in enumerate(zip(people, agent_states)):
+            self.level[i] = state["level"] or 0
+            self.position[i] = self.__offsets[i] + state["position"]
+            self.calls[i] = state["calls"]
+            idle = agent_state["idle"]
+            self.__chain_eid[i], self.__chain_length[i] = idle if idle is not None else (-1, 0)
+
+    def _handlers(self):
+        """the handlers the store can leave waiting, by name, called with the index of a person, see
+        checkpoint.restore"""
+        return {"start": self.__start, "event_due": self.__event_due_handler, "wait_for_next_event": self.__wait_handler}
+
+    def traveller(self, i):
+        """returns a new agent for the person to make a trip with, see Traveller"""
+        return Traveller(self, i, self.__call_strategies[self.strategy[i]])
+
+    def __start(self, value=None):
+        """starts everyone on the first floor, in the order Person agents created one by one would start"""
+        tracer = self.__tracer
+        for i in range(len(self)):
+            if tracer.categories & trace.PEOPLE:
+                tracer.trace(self.__env.now, trace.PERSON_STARTED, self.ident(i))
+            self.level[i] = 1
+            self.__wait_for_next_event(i)
+
+    def __start_time(self, event):
+        return timedelta(seconds=float(self.__event_start[event]))
+
+    def __advance(self, i, now_td):
+        """returns the next event of the person starting from the given time and moves the cursor past it, None if
+        no events remain, see models.Schedule.advance"""
+        position, end = int(self.position[i]), int(self.__offsets[i + 1])
+        position += int(np.searchsorted(self.__event_start[position:end], now_td.total_seconds()))
+        if position < end:
+            self.position[i] = position + 1
+            return position
+        self.position[i] = position
+        return None
+
+    def __park(self, i, at, handler):
+        """parks the person in the calendar until the given time"""
+        chain = None if self.__chain_eid[i] < 0 else [int(self.__chain_eid[i]), int(self.__chain_length[i])]
+        self.__chain_eid[i], self.__chain_length[i] = self.__calendar.add(at, handler, chain, i)
+
+    def __wait_for_next_event(self, i):
+        tracer = self.__tracer
+        now = self.__env.now
+        level = self.level[i]
+        stays = (lambda event: self.__event_level[event] == level) if self.simulation.fast_forward else None
+        event, event_secs = next_due_event(now, functools.partial(self.__advance, i), self.__start_time, stays)
+        if event is None:
+            if tracer.categories & trace.PEOPLE:
+                tracer.trace(now, trace.PERSON_DONE, self.ident(i))
+            return
+
+        if tracer.categories & trace.PEOPLE:
+            tracer.trace(now, trace.PERSON_WAITING, self.ident(i), int(self.level[i]), event_secs)
+        self.__park(i, event_secs, self.__event_due_handler)
+
+    def __event_due(self, i):
+        tracer = self.__tracer
+        now = self.__env.now
+        event = int(self.position[i]) - 1
+        level, destination = int(self.level[i]), int(self.__event_level[event])
+        if tracer.categories & trace.PEOPLE:
+            tracer.trace(now, trace.PERSON_RESUMING, self.ident(i), level)
+        if destination == level:
+            if tracer.categories & trace.PEOPLE:
+                tracer.trace(now, trace.PERSON_STAYING, self.ident(i), level)
+            self.__park(i, now + 0.001, self.__wait_handler)
+            return
+
+        self.__chain_eid[i] = -1
+        traveller = self.traveller(i)
+        rng = call_stream(self.simulation.seed, self.uuid(i) if self.__named[i] else "#{}".format(i), int(self.calls[i]))
+        self.calls[i] += 1
+        traveller.start_trip(level, destination, self.__descriptions[self.__event_description[event]], rng,
+                             functools.partial(self.arrived, i))
+
+    def arrived(self, i, trip):
+        """records that the person arrived on the destination of the trip, and waits for the next event"""
+        self.level[i] = trip.destination
+        self.trip_complete(trip)
+        self.__wait_for_next_event(i)
@@ -0,0 +1,142 @@
+#!/usr/bin/env python
+# encoding: utf-8
+
+import heapq
+import itertools
+from operator import itemgetter
+from elevator_simulation.agents.simulation import ChainMixin, SimulationMixin
+from elevator_simulation.models import Building
+
+
+# priorities of simultaneous events, as in simpy: the start of an agent and interruptions come first
+URGENT = 0
+NORMAL = 1
+
+
+class EventQueue(ChainMixin):
+    """A single heap of the events of every agent, processed in the order simpy would process them.
+
+    Each event is a (time, priority, event id, handler, value) tuple, and processing it calls the handler with the
+    value. Events are ordered by time, then priority, then the order they were scheduled in, like simpy orders its
+    events, and a series of timeouts can keep the place of the first one, see ChainMixin.
+
+    The number of events processed so far is kept in processed, and the event being processed in active.
+    """
+
+    def __init__(self, initial_time=0):
+        ChainMixin.__init__(self)
+        self.now = initial_time
+        self.processed = 0
+        self.__queue = []
+
+    def __len__(self):
+        return len(self.__queue)
+
+    def peek(self):
+        """returns the time of the next event, infinity if there is none"""
+        return self.__queue[0][0] if self.__queue else float("inf")
+
+    def schedule(self, at, handler, value=None, priority=NORMAL):
+        """has the handler called with the value at the given time
+
+        :param at float: the simulation time of the event, not before now
+        :param handler func: called with the value when the event is processed
+        :param priority int: URGENT or NORMAL (def: NORMAL)
+        """
+        heapq.heappush(self.__queue, (at, priority, next(self.eids), handler, value))
+
+    def timeout(self, delay, handler, value=None):
+        """has the handler called with the value once the delay has passed"""
+        heapq.heappush(self.__queue, (self.now + delay, NORMAL, next(self.eids), handler, value))
+
+    def timeout_at(self, at, handler, chain=None, value=None):
+        """has the handler called with the value at the given time, as a timeout of a chain
+
+        :param at float: the simulation time of the timeout, not before now
+        :param chain list: the chain returned for the previous timeout of the series, None to start a new one
+        :rtype list: the chain of the timeout
+        """
+        if at < self.now:
+            raise ValueError("Timeout at {} is before the current time {}".format(at, self.now))
+        eid, chain = self.reserve(chain)
+        heapq.heappush(self.__queue, (at, NORMAL, eid, handler, value))
+        return chain
+
+    def call_at(self, at, eid, handler):
+        """has the handler called at the given time, with an event id from reserve"""
+        heapq.heappush(self.__queue, (at, NORMAL, eid, handler, None))
+
+    def checkpoint(self):
+        """returns the id of the next event and the events still to process, in the order they will be
+
+        :rtype tuple: the next event id, and the (time, priority, event id, handler, value) tuples of the events
+        """
+        next_eid = next(self.eids)
+        self.eids = itertools.count(next_eid)
+        return next_eid, sorted(self.__queue, key=itemgetter(0, 1, 2))
+
+    def restore(self, now, next_eid, events, processed=0):
+        """replaces the events still to process by the given ones, and moves the clock to now, see checkpoint
+
+        :param now float: the time of the checkpoint, no event is before it
+        :param next_eid int: the id of the next event scheduled, above the ids of the given events
+        :param events list: (time, priority, event id, handler, value) tuples of the events to process
+        :param processed int: the number of events processed before the checkpoint (def: 0)
+        """
+        self.now = now
+        self.active = None
+        self.processed = processed
+        self.__queue = list(events)
+        heapq.heapify(self.__queue)
+        self.eids = itertools.count(next_eid)
+
+    def step(self):
+        """processes the next event"""
+        self.active = event = heapq.heappop(self.__queue)
+        self.now = event[0]
+        self.processed += 1
+        event[3](event[4])
+
+    def run(self, until=None):
+        """processes the events due before the given time, or every event
+
+        :param until float: the time to stop at, the clock is left there (def: None, run until no event is left)
+        """
+        queue = self.__queue
+        pop = heapq.heappop
+        processed = 0
+        try:
+            while queue and (until is None or queue[0][0] < until):
+                self.active = event = pop(queue)
+                self.now = event[0]
+                processed += 1
+                event[3](event[4])
+        finally:
+            self.processed += processed
+        if until is not None:
+            self.now = until
+            self.active = None  # none of the events at the new time is processed yet
+
+
+def _create_building(simulation, number_of_floors):
+    building = Building()
+    for _ in range(number_of_floors):
+        building.add_floor()
+    return building
+
+
+class Simulation(SimulationMixin):
+    """Holds all of the objects in a simulation driven by an event queue rather than simpy processes.
+
+    Elevators and people are state machines whose handlers are called by the events of a single EventQueue. They
+    schedule the same events at the same points as the simpy agents do, so a run records the very same trips, in the
+    same order, as agents.Simulation with the same settings.
+    """
+
+    def __init__(self, **kwargs):
+        """Constructs a simulation from the models passed.
+
+        :note: takes the parameters of agents.Simulation
+        """
+        SimulationMixin.__init__(self, EventQueue(), _create_building, **kwargs)
+        self.population = None  # the people held in arrays rather than in people, see PersonStore
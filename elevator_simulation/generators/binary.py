@@ -0,0 +1,116 @@
+#!/usr/bin/env python
+# encoding: utf-8
+
+
+import json
+import struct
+import uuid
+import numpy as np
+from elevator_simulation.generators.json import simulation_to_data
+
+
+SCENARIO_MAGIC = b"ELEVSIM1"
+NO_CALL_STRATEGY = 255
+
+
+def write_simulation(simulation, fh):
+    """Writes a simulation to a binary output stream in the binary scenario format
+    """
+    write_scenario(simulation_to_data(simulation), fh)
+
+
+def write_scenario(data, fh):
+    """Writes decoded json simulation settings to a binary output stream in the binary scenario format
+
+    The format starts with SCENARIO_MAGIC and the length of a json header (little endian uint64). The header holds
+    the building, the elevator banks and their elevators, the call strategy and description tables and the dtype,
+    shape and offset of each array. The arrays follow, 8 byte aligned, so they can be used straight from a memory map:
+
+        person_uuid        uuid bytes of each person, zeros when the person has none
+        person_strategy    index of each person's call strategy, NO_CALL_STRATEGY when unset
+        event_person       index of the person of each schedule event, events are sorted by person then start
+        event_start        start of each event in seconds since midnight
+        event_level        level of each event
+        event_description  index of the description of each event
+
+    :param data dict: the decoded contents of a json simulation file
+    :param fh file: binary stream the scenario is written to
+    :note: people keys other than uuid, elevator_call_strategy and schedule are not stored
+    """
+    people = data["people"]
+    strategies = sorted({person["elevator_call_strategy"] for person in people if "elevator_call_strategy" in person})
+    if len(strategies) >= NO_CALL_STRATEGY:
+        raise ValueError("Too many call strategies for the binary scenario format: {}".format(len(strategies)))
+    strategy_index = {strategy: i for i, strategy in enumerate(strategies)}
+    descriptions = dict()
+
+    person_uuid = np.zeros((len(people), 16), dtype=np.uint8)
+    person_strategy = np.full(len(people), NO_CALL_STRATEGY, dtype=np.uint8)
+    event_person, event_start, event_level, event_description = [], [], [], []
+    for i, person in enumerate(people):
+        if "uuid" in person:
+            person_uuid[i] = np.frombuffer(uuid.UUID(person["uuid"]).bytes, dtype=np.uint8)
+        if "elevator_call_strategy" in person:
+            person_strategy[i] = strategy_index[person["elevator_call_strategy"]]
+        for event in sorted(person["schedule"], key=lambda event: event["start"]):
+            event_person.append(i)
+            event_start.append(event["start"])
+            event_level.append(event["level"])
+            event_description.append(descriptions.setdefault(event.get("description", "unknown"), len(descriptions)))
+
+    write_arrays(data["building"], data["elevator_banks"], strategies, sorted(descriptions, key=descriptions.get), fh,
+                 person_uuid=person_uuid,
+                 person_strategy=person_strategy,
+                 event_person=event_person,
+                 event_start=event_start,
+                 event_level=event_level,
+                 event_description=event_description)
+
+
+def write_arrays(building, elevator_banks, call_strategies, descriptions, fh, **arrays):
+    """Writes a scenario already held in arrays to a binary output stream in the binary scenario format
+
+    :param building dict: the building settings, as in a json simulation file
+    :param elevator_banks list: the elevator bank settings, as in a json simulation file
+    :param call_strategies list: the call strategies indexed by person_strategy
+    :param descriptions list: the descriptions indexed by event_description
+    :param fh file: binary stream the scenario is written to
+    :note: the arrays are given by name as described in write_scenario, with events sorted by person then start
+    """
+    if len(descriptions) > np.iinfo(np.uint16).max:
+        raise ValueError("Too many descriptions for the binary scenario format: {}".format(len(descriptions)))
+
+    # whole seconds are stored compactly, fractional ones exactly
+    event_start = np.asarray(arrays["event_start"], dtype=np.float64)
+    if np.array_equal(event_start, np.floor(event_start)) and (len(event_start) == 0 or event_start.max() <= np.iinfo(np.uint32).max):
+        event_start = event_start.astype(np.uint32)
+
+    arrays = [("person_uuid", np.asarray(arrays["person_uuid"], dtype=np.uint8).reshape(-1, 16)),
+              ("person_strategy", np.asarray(arrays["person_strategy"], dtype=np.uint8)),
+              ("event_person", np.asarray(arrays["event_person"], dtype=np.uint32)),
+              ("event_start", event_start),
+              ("event_level", np.asarray(arrays["event_level"], dtype=np.uint16)),
+              ("event_description", np.asarray(arrays["event_description"], dtype=np.uint16))]
+
+    header = {"building": building,
+              "elevator_banks": elevator_banks,
+              "call_strategies": call_strategies,
+              "descriptions": descriptions,
+              "arrays": []}
+    offset = 0
+    for name, array in arrays:
+        header["arrays"].append([name, array.dtype.str, list(array.shape), offset])
+        offset += _aligned(array.nbytes)
+
+    header = json.dumps(header).encode("utf-8")
+    header += b" " * (_aligned(len(header)) - len(header))
+    fh.write(SCENARIO_MAGIC)
+    fh.write(struct.pack("<Q", len(header)))
+    fh.write(header)
+    for name, array in arrays:
+        fh.write(array.tobytes())
+        fh.write(b"\0" * (_aligned(array.nbytes) - array.nbytes))
+
+
+def _aligned(length):
+    return (length + 7) // 8 * 8
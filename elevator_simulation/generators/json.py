@@ -8,6 +8,11 @@ import json
 def write_simulation(simulation, fh):
     """Writes a simulation to an output stream
     """
+    json.dump(simulation_to_data(simulation), fh)
+
+
+def simulation_to_data(simulation):
+    """returns the settings of the simulation as the data structure stored in a json simulation file"""
     data = dict()
     data["building"] = dict()
     data["building"]["floors"] = len(simulation.building.floors)
@@ -18,6 +23,8 @@ def write_simulation(simulation, fh):
         data["elevator_banks"].append(elb_dict)
         elb_dict["elevators"] = []
         elb_dict["uuid"] = elevator_bank.uuid
+        if isinstance(elevator_bank.dispatch_strategy, str):
+            elb_dict["strategy"] = elevator_bank.dispatch_strategy
         for elevator in elevator_bank.elevators:
             el_dict = dict()
             elb_dict["elevators"].append(el_dict)
@@ -39,4 +46,4 @@ def write_simulation(simulation, fh):
             event_dict["level"] = event.location.level
             event_dict["description"] = event.description
 
-    json.dump(data, fh)
+    return data
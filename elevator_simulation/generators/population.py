@@ -0,0 +1,225 @@
+#!/usr/bin/env python
+# encoding: utf-8
+
+
+import json
+import numpy as np
+from elevator_simulation.generators.binary import write_arrays
+from elevator_simulation.readers.binary import add_person_store
+from elevator_simulation.readers.json import create_simulation, add_person
+
+
+# the descriptions of the events of a working day, indexed by Population.event_description
+DESCRIPTIONS = ("starting the work day",
+                "ending the work day",
+                "going to lunch",
+                "back to work after lunch",
+                "taking a break",
+                "back to work after a break")
+(STARTING_WORK, ENDING_WORK, GOING_TO_LUNCH, BACK_FROM_LUNCH, TAKING_A_BREAK, BACK_FROM_BREAK) = range(len(DESCRIPTIONS))
+
+
+def parse_time(time_str):
+    """returns the seconds since midnight of a time given as H:M:S"""
+    hours, minutes, seconds = [int(part) for part in time_str.split(":")]
+    return hours * 3600 + minutes * 60 + seconds
+
+
+def break_window(arrival_secs, work_secs, breaks_per_day, i):
+    """returns the earliest and latest start of the i-th break of a person arriving at arrival_secs
+
+    The working day is split in breaks_per_day + 1 equal parts, and break i starts during the first half of part
+    i + 1, so that breaks are spread over the day and never run into one another.
+    """
+    part = work_secs // (breaks_per_day + 1)
+    begin = arrival_secs + (i + 1) * part
+    return begin, begin + part // 2
+
+
+def takes_break(break_secs, break_length_secs, lunch_secs, lunch_length_secs, end_secs):
+    """returns True where a break neither overlaps lunch nor runs past the end of the working day"""
+    back_secs = break_secs + break_length_secs
+    return ((back_secs < lunch_secs) | (break_secs > lunch_secs + lunch_length_secs)) & (back_secs < end_secs)
+
+
+class Population(object):
+    """The people of a generated scenario and their schedules, held in arrays rather than agents.
+
+    Events are sorted by person then start, in the layout of the binary scenario format: event_person holds the index
+    of the person of each event and event_description the index of its description in DESCRIPTIONS.
+    """
+
+    def __init__(self, person_uuid, call_strategy, event_person, event_start, event_level, event_description):
+        self.person_uuid = person_uuid
+        self.call_strategy = call_strategy
+        self.event_person = event_person
+        self.event_start = event_start
+        self.event_level = event_level
+        self.event_description = event_description
+
+    def __len__(self):
+        return len(self.person_uuid)
+
+    def arrays(self):
+        """returns the arrays of the people and their events as named in the binary scenario format, everyone with
+        call strategy 0"""
+        return {"person_uuid": self.person_uuid,
+                "person_strategy": np.zeros(len(self), dtype=np.uint8),
+                "event_person": self.event_person,
+                "event_start": self.event_start,
+                "event_level": self.event_level,
+                "event_description": self.event_description}
+
+    @property
+    def uuids(self):
+        """the uuid of each person as a hex string"""
+        return uuid_hexes(self.person_uuid)
+
+
+def random_uuids(rng, size):
+    """returns the bytes of size random version 4 uuids, one uuid per row"""
+    uuids = rng.integers(0, 256, size=(size, 16), dtype=np.uint8)
+    uuids[:, 6] = uuids[:, 6] & 0x0f | 0x40
+    uuids[:, 8] = uuids[:, 8] & 0x3f | 0x80
+    return uuids
+
+
+def uuid_hexes(uuids):
+    """returns the hex strings of the uuids given as the bytes of one uuid per row"""
+    hexes = uuids.tobytes().hex()
+    return [hexes[i:i + 32] for i in range(0, len(hexes), 32)]
+
+
+def generate_population(people, lunch_on_floor, rng, **kwargs):
+    """Draws the schedules of people working in an office building for a day, every person at once.
+
+    Each person starts the work day on a random floor above the lobby at a random time between work_begin and
+    work_end and leaves for the lobby work_length_mins later. They go to lunch, on the lunch floor nearest to their
+    own, at a random time between lunch_begin and lunch_end, and take breaks on that floor too, see break_window.
+    Breaks that would overlap lunch or the end of the day are skipped.
+
+    :param people int: the number of people in the building
+    :param lunch_on_floor list: the floors where people eat lunch
+    :param rng Generator: the NumPy random number generator drawing the schedules
+    :note: see generate_simulation.generate_simulation for the remaining parameters
+    :rtype Population: the generated people
+    """
+    floors = kwargs.get("floors", 9)
+    work_begin = parse_time(kwargs.get("work_begin", "6:00:00"))
+    work_end = parse_time(kwargs.get("work_end", "10:00:00"))
+    work_secs = kwargs.get("work_length_mins", 60*9) * 60
+    lunch_begin = parse_time(kwargs.get("lunch_begin", "12:00:00"))
+    lunch_end = parse_time(kwargs.get("lunch_end", "13:00:00"))
+    lunch_secs = kwargs.get("lunch_length_mins", 45) * 60
+    breaks_per_day = kwargs.get("breaks_per_day", 0)
+    break_secs = kwargs.get("break_length_mins", 15) * 60
+
+    person_uuid = random_uuids(rng, people)
+    arrival = work_begin + rng.integers(0, work_end - work_begin, size=people, endpoint=True)
+    work_index = rng.integers(1, floors - 1, size=people, endpoint=True)
+    lunch = lunch_begin + rng.integers(0, lunch_end - lunch_begin, size=people, endpoint=True)
+    # the lunch floor nearest to the index of the work floor, the first listed on ties
+    lunch_on_floor = np.asarray(lunch_on_floor)
+    lunch_level = lunch_on_floor[np.argmin(np.abs(work_index[:, np.newaxis] - lunch_on_floor), axis=1)]
+    work_level = work_index + 1
+    everyone = np.arange(people)
+
+    events = [(everyone, arrival, work_level, STARTING_WORK),
+              (everyone, arrival + work_secs, np.ones(people, dtype=np.int64), ENDING_WORK),
+              (everyone, lunch, lunch_level, GOING_TO_LUNCH),
+              (everyone, lunch + lunch_secs, work_level, BACK_FROM_LUNCH)]
+    for i in range(breaks_per_day):
+        begin, end = break_window(arrival, work_secs, breaks_per_day, i)
+        start = begin + rng.integers(0, end - begin, endpoint=True)
+        taken = takes_break(start, break_secs, lunch, lunch_secs, arrival + work_secs)
+        events.append((everyone[taken], start[taken], lunch_level[taken], TAKING_A_BREAK))
+        events.append((everyone[taken], start[taken] + break_secs, work_level[taken], BACK_FROM_BREAK))
+
+    event_person = np.concatenate([person for person, start, level, description in events])
+    event_start = np.concatenate([start for person, start, level, description in events])
+    event_level = np.concatenate([level for person, start, level, description in events])
+    event_description = np.concatenate([np.full(len(person), description) for person, start, level, description in events])
+    order = np.lexsort((event_start, event_person))
+    return Population(person_uuid, kwargs.get("call_strategy", "call_strategy_random"), event_person[order],
+                      event_start[order], event_level[order], event_description[order])
+
+
+def generate_elevator_banks(rng, **kwargs):
+    """returns the settings of the elevator banks of the building, as in a json simulation file
+
+    :param num_elevator_banks int: the number of elevator banks in the building (def: 1)
+    :param num_elevators_per_bank int: the number of elevators in each bank (def: 6)
+    :param elevator_capacity int: the number of people which fit in a single elevator at once (def: 10)
+    """
+    elevator_banks = []
+    for i in range(kwargs.get("num_elevator_banks", 1)):
+        uuids = uuid_hexes(random_uuids(rng, 1 + kwargs.get("num_elevators_per_bank", 6)))
+        elevator_banks.append({"uuid": uuids[0],
+                               "elevators": [{"uuid": uuid, "capacity": kwargs.get("elevator_capacity", 10)}
+                                             for uuid in uuids[1:]]})
+    return elevator_banks
+
+
+def write_json(population, building, elevator_banks, fh, chunk_size=10000):
+    """Writes the population to an output stream as a json simulation file, a chunk of people at a time
+
+    :param population Population: the people of the scenario
+    :param building dict: the building settings
+    :param elevator_banks list: the elevator bank settings
+    :param fh file: text stream the simulation is written to
+    :param chunk_size int: number of people formatted at a time (def: 10000)
+    """
+    fh.write('{{"building": {}, "elevator_banks": {}, "people": ['.format(json.dumps(building), json.dumps(elevator_banks)))
+    descriptions = [json.dumps(description) for description in DESCRIPTIONS]
+    strategy = json.dumps(population.call_strategy)
+    uuids = population.uuids
+    bounds = np.searchsorted(population.event_person, np.arange(len(population) + 1)).tolist()
+    for first in range(0, len(population), chunk_size):
+        last = min(first + chunk_size, len(population))
+        begin, end = bounds[first], bounds[last]
+        events = ['{{"start": {}, "level": {}, "description": {}}}'.format(start, level, descriptions[description])
+                  for start, level, description in zip(population.event_start[begin:end].tolist(),
+                                                        population.event_level[begin:end].tolist(),
+                                                        population.event_description[begin:end].tolist())]
+        people = ['{{"uuid": "{}", "elevator_call_strategy": {}, "schedule": [{}]}}'.format(
+                      uuids[i], strategy, ", ".join(events[bounds[i] - begin:bounds[i + 1] - begin]))
+                  for i in range(first, last)]
+        fh.write((", " if first else "") + ", ".join(people))
+    fh.write("]}")
+
+
+def write_binary(population, building, elevator_banks, fh):
+    """Writes the population to a binary output stream in the binary scenario format, straight from its arrays
+
+    :param population Population: the people of the scenario
+    :param building dict: the building settings
+    :param elevator_banks list: the elevator bank settings
+    :param fh file: binary stream the scenario is written to
+    """
+    write_arrays(building, elevator_banks, [population.call_strategy], list(DESCRIPTIONS), fh, **population.arrays())
+
+
+def build_simulation(population, building, elevator_banks, **kwargs):
+    """Builds a simulation of the population straight from its arrays, without writing a scenario
+
+    :param population Population: the people of the scenario
+    :param building dict: the building settings
+    :param elevator_banks list: the elevator bank settings
+    :param compact bool: keep the people in the arrays of a PersonStore, see readers.binary.add_person_store
+    (def: False)
+    :returns Simulation: the simulation of the population
+    :note: see readers.json.build_simulation for the remaining parameters
+    """
+    simulation = create_simulation({"building": building, "elevator_banks": elevator_banks}, **kwargs)
+    if kwargs.get("compact", False):
+        add_person_store(simulation, [population.call_strategy], list(DESCRIPTIONS), population.arrays(), **kwargs)
+        return simulation
+    uuids = population.uuids
+    bounds = np.searchsorted(population.event_person, np.arange(len(population) + 1)).tolist()
+    starts, levels = population.event_start.tolist(), population.event_level.tolist()
+    descriptions = [DESCRIPTIONS[description] for description in population.event_description.tolist()]
+    for i in range(len(population)):
+        begin, end = bounds[i], bounds[i + 1]
+        person_kwargs = {"uuid": uuids[i], "elevator_call_strategy": population.call_strategy, "index": i}
+        add_person(simulation, person_kwargs, starts[begin:end], levels[begin:end], descriptions[begin:end], **kwargs)
+    return simulation
@@ -1,7 +1,9 @@
 #!/usr/bin/env python
 # encoding: utf-8
 
-from elevator_simulation.models.id import IdentMixin
-from elevator_simulation.models.building import Building, Floor
+from elevator_simulation.models.id import IdentMixin, IdentRegistry
+from elevator_simulation.models.building import Building, Floor, level_of
+from elevator_simulation.models.calls import HallCalls
+from elevator_simulation.models.dispatch import DispatchState, dispatch_strategy
 from elevator_simulation.models.elevator import ElevatorBank, Elevator
 from elevator_simulation.models.person import Person, Schedule
@@ -37,6 +37,11 @@ class Floor(object):
         return "Floor({})".format(self.level)
 
 
+def level_of(floor):
+    """returns the level of a floor given either as a Floor or as its level"""
+    return floor.level if isinstance(floor, Floor) else floor
+
+
 class Building(object):
     """Class which models the building used in the simulation."""
 
@@ -0,0 +1,65 @@
+#!/usr/bin/env python
+# encoding: utf-8
+
+from elevator_simulation.models.building import level_of
+
+
+def _direction_index(direction):
+    """returns 1 for the up direction and -1 for down, the index of the direction in the hall call tables"""
+    if not direction:
+        raise ValueError("Not a valid direction: {}".format(direction))
+    return 1 if direction > 0 else -1
+
+
+class HallCalls(object):
+    """Index of the hall calls of an elevator bank: who waits on each floor, to go which direction, since when.
+
+    Floors are given as Floor or as their level.
+
+    The people waiting on a floor to go a direction are kept in the order they called, along with the time of their
+    call, so counts and the oldest call are known without scanning or copying.
+    """
+
+    def __init__(self, num_floors):
+        """creates an empty index for a bank serving the given number of floors"""
+        self.__waiting = (None, [dict() for _ in range(num_floors + 1)], [dict() for _ in range(num_floors + 1)])
+
+    def add(self, person, floor, direction, time=None):
+        """records that the person waits on the floor to go the direction
+
+        :param time float: the time of the call (def: None, unknown)
+        """
+        direction, level = _direction_index(direction), level_of(floor)
+        waiting = self.__waiting[direction][level]
+        if person not in waiting:
+            waiting[person] = time
+
+    def remove(self, person, floor, direction):
+        """records that the person no longer waits on the floor to go the direction"""
+        direction, level = _direction_index(direction), level_of(floor)
+        del self.__waiting[direction][level][person]
+
+    def waiting(self, floor, direction):
+        """returns the people waiting on the floor to go the direction, in the order they called
+
+        :rtype dict_keys: a live view, it changes as people call and stop waiting
+        """
+        return self.__waiting[_direction_index(direction)][level_of(floor)].keys()
+
+    def calls(self, floor, direction):
+        """returns the people waiting on the floor to go the direction with the time of their call, in the order they
+        called
+
+        :rtype list: (person, time) pairs
+        """
+        return list(self.__waiting[_direction_index(direction)][level_of(floor)].items())
+
+    def count(self, floor, direction):
+        """returns the number of people waiting on the floor to go the direction"""
+        return len(self.__waiting[_direction_index(direction)][level_of(floor)])
+
+    def first_call(self, floor, direction):
+        """returns the time of the oldest call still waiting on the floor to go the direction, None if there is none"""
+        for time in self.__waiting[_direction_index(direction)][level_of(floor)].values():
+            return time
+        return None
@@ -0,0 +1,185 @@
+#!/usr/bin/env python
+# encoding: utf-8
+
+import numpy as np
+
+
+DISPATCH_STRATEGIES = dict()
+
+
+def dispatch_strategy(name, destination=False):
+    """registers a vectorized dispatch strategy under the given name
+
+    A strategy is called with the DispatchState of the elevator bank, the level the call occurred on and the
+    direction pressed by the caller. It scores every elevator at once and returns the index of the one to dispatch.
+
+    :param name str: the name used to select the strategy, e.g. ElevatorBank(dispatch_strategy=name)
+    :param destination bool: the strategy also takes the destination the caller enters in the hall, and the car it
+    returns is assigned to the caller, see ElevatorBank.call_to (def: False)
+    """
+    def register(f):
+        f.destination = destination
+        DISPATCH_STRATEGIES[name] = f
+        return f
+    return register
+
+
+def is_destination_strategy(f):
+    """returns True if the dispatch strategy assigns cars from the destinations entered in the hall"""
+    return getattr(f, "destination", False)
+
+
+def get_dispatch_strategy(name):
+    """returns the dispatch strategy registered under the given name"""
+    if name not in DISPATCH_STRATEGIES:
+        raise ValueError("Unknown dispatch strategy '{}', expected one of: {}".format(name, sorted(DISPATCH_STRATEGIES)))
+    return DISPATCH_STRATEGIES[name]
+
+
+class DispatchState(object):
+    """Bank-wide elevator state kept in arrays, one entry per elevator in the order they were added.
+
+    Elevators write their changes into the state as they happen, so a dispatch strategy can score every elevator
+    of the bank in one vectorized pass instead of querying each elevator. The bank also sets hall_calls, the
+    HallCalls index of the people waiting on its floors.
+    """
+
+    def __init__(self, num_floors):
+        """creates an empty state for a bank serving the given number of floors"""
+        self.num_floors = num_floors
+        self.position = np.zeros(0, dtype=np.int64)
+        self.direction = np.zeros(0, dtype=np.int64)
+        self.load = np.zeros(0, dtype=np.int64)
+        self.capacity = np.zeros(0, dtype=np.int64)
+        self.stop_count = np.zeros(0, dtype=np.int64)
+        self.travel_secs = np.zeros(0, dtype=np.float64)
+        self.stop_secs = np.zeros(0, dtype=np.float64)
+        self.stops = np.zeros((0, num_floors + 1), dtype=bool)  # whether each elevator stops on each level
+        self.assigned = np.zeros((0, num_floors + 1), dtype=np.int64)  # riders assigned to each elevator by destination
+        self.riders = np.zeros(0, dtype=np.int64)  # riders assigned to each elevator, waiting or riding
+        self.hall_calls = None
+
+    def __len__(self):
+        return len(self.position)
+
+    def add(self, elevator):
+        """adds an elevator to the state and has it report its changes
+
+        :param elevator Elevator: the elevator to track
+        :rtype int: the index of the elevator in the state arrays
+        """
+        index = len(self)
+        travel_secs = getattr(elevator, "elevator_travel_secs", 1)
+        stop_secs = getattr(elevator, "total_elevator_travel_secs", travel_secs) - travel_secs
+        self.position = np.append(self.position, elevator.location.level)
+        self.direction = np.append(self.direction, elevator.direction or 0)
+        self.load = np.append(self.load, len(elevator.passengers))
+        self.capacity = np.append(self.capacity, elevator.capacity)
+        self.stop_count = np.append(self.stop_count, len(elevator.stops))
+        self.travel_secs = np.append(self.travel_secs, travel_secs)
+        self.stop_secs = np.append(self.stop_secs, stop_secs)
+        self.stops = np.vstack((self.stops, np.zeros(self.num_floors + 1, dtype=bool)))
+        self.stops[index, [stop.level for stop in elevator.stops]] = True
+        self.assigned = np.vstack((self.assigned, np.zeros(self.num_floors + 1, dtype=np.int64)))
+        self.riders = np.append(self.riders, 0)
+        elevator._track_dispatch_state(self, index)
+        return index
+
+    def distance(self, level):
+        """the distance in floors between every elevator and the level"""
+        return np.abs(self.position - level)
+
+    def moving_away(self, level):
+        """for every elevator, whether its current position and direction take it away from the level"""
+        next_position = np.clip(self.position + self.direction, 1, self.num_floors)
+        return np.abs(next_position - level) > self.distance(level)
+
+    def assign(self, index, destination):
+        """records that a rider going to the destination level was assigned the elevator of the given index"""
+        self.assigned[index, destination] += 1
+        self.riders[index] += 1
+
+    def release(self, index, destination):
+        """records that a rider assigned the elevator got out on the destination, or gave up on it"""
+        self.assigned[index, destination] -= 1
+        self.riders[index] -= 1
+
+
+@dispatch_strategy("nearest_elevator")
+def nearest_elevator(state, level, direction):
+    """Vectorized form of the 'Nearest Elevator' algorithm, see nearest_elevator_dispatch_strategy
+
+    :param state DispatchState: state of the elevators in the bank
+    :param level int: the level the call occurred on
+    :param direction int: the direction pressed by the user
+    """
+    distance = state.distance(level)
+    moving_away = state.moving_away(level) & (distance > 0)  # suitability shouldn't be low if we are on the same floor
+    same_direction = (state.direction == direction) | (state.direction == 0)  # moving in same or neutral direction
+    suitability = np.where(moving_away, 1, state.num_floors + 1 + same_direction - distance)
+    return int(np.argmax(suitability))
+
+
+@dispatch_strategy("eta")
+def estimated_time_of_arrival(state, level, direction):
+    """Dispatches the elevator expected to reach the caller first
+
+    Elevators heading towards the caller in the direction of the call travel straight there, others are assumed to
+    run out to the end of the building in their current direction before coming back. Each registered stop adds the
+    time the elevator spends with its doors open.
+
+    :param state DispatchState: state of the elevators in the bank
+    :param level int: the level the call occurred on
+    :param direction int: the direction pressed by the user
+    """
+    distance = state.distance(level)
+    direct = (state.direction == 0) | (distance == 0) | ((state.direction == direction) & ~state.moving_away(level))
+    end = np.where(state.direction > 0, state.num_floors, 1)
+    detour = np.abs(end - state.position) + np.abs(end - level)
+    route = np.where(direct, distance, detour)
+    eta = route * state.travel_secs + state.stop_count * state.stop_secs
+    return int(np.argmin(eta))
+
+
+@dispatch_strategy("destination", destination=True)
+def destination_dispatch(state, level, direction, destination=None):
+    """Assigns the car of a call entered with its destination, grouping riders going to the same floors
+
+    A car costs the time it takes to reach the caller, as in estimated_time_of_arrival, plus the time of the stops
+    the call adds to its route: on the caller's level unless the car already stops there, and on the destination
+    unless the car already stops there or carries or picks up riders going there. Cars already assigned as many
+    riders as they hold are only chosen when every car is, so a surge of calls is spread over the bank by
+    destination. Each call is scored against every car at once, whatever the number of calls.
+
+    :param state DispatchState: state of the elevators in the bank
+    :param level int: the level the call occurred on
+    :param direction int: the direction of the destination from the level
+    :param destination int: the level the caller goes to (def: None, a call without destination, scored as eta)
+    """
+    distance = state.distance(level)
+    direct = (state.direction == 0) | (distance == 0) | ((state.direction == direction) & ~state.moving_away(level))
+    end = np.where(state.direction > 0, state.num_floors, 1)
+    detour = np.abs(end - state.position) + np.abs(end - level)
+    route = np.where(direct, distance, detour)
+    new_stops = ~state.stops[:, level]
+    if destination is not None:
+        new_stops = new_stops.astype(np.int64) + ((state.assigned[:, destination] == 0) & ~state.stops[:, destination])
+    cost = route * state.travel_secs + (state.stop_count + new_stops) * state.stop_secs
+    full = state.riders >= state.capacity
+    return int(np.lexsort((cost, full))[0])
+
+
+@dispatch_strategy("load_balancing")
+def load_balancing(state, level, direction):
+    """Dispatches the least busy elevator, the nearest one when several are equally busy
+
+    Busyness is the number of passengers plus the number of registered stops, full elevators are only dispatched
+    when every elevator is full.
+
+    :param state DispatchState: state of the elevators in the bank
+    :param level int: the level the call occurred on
+    :param direction int: the direction pressed by the user
+    """
+    busy = state.load + state.stop_count
+    full = state.load >= state.capacity
+    return int(np.lexsort((state.distance(level), busy, full))[0])
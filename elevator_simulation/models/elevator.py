@@ -1,8 +1,12 @@
 #!/usr/bin/env python
 # encoding: utf-8
 
+import bisect
 from elevator_simulation.models import IdentMixin
-from elevator_simulation.models import Floor
+from elevator_simulation.models import Floor, level_of
+from elevator_simulation.models.calls import HallCalls
+from elevator_simulation.models.dispatch import DispatchState, get_dispatch_strategy, is_destination_strategy
+from elevator_simulation.validation import validated
 
 
 def nearest_elevator_dispatch_strategy(elevator_list, floor_list, floor, direction):
@@ -41,37 +45,51 @@ class ElevatorBank(IdentMixin):
     def __init__(self, floors, **kwargs):
         """Constructs an elevator controller with a particular dispatch strategy.
 
-        :param dispatch_strategy function: function that selects the elevator that should be dispatched.
+        :param dispatch_strategy str|function: name of a registered dispatch strategy (see models.dispatch) or
+        function that selects the elevator that should be dispatched.
         :param elevator_cls type: The class of the type of elevators to create
         :note: dispatch strategy has a significant impact on elevator efficiency, by default it will
         use the nearest elevator strategy.
         """
         IdentMixin.__init__(self, **kwargs)
         self.__floors = floors
-        self.__elevators = set()
-        self.__dispatch_strategy = kwargs.get("dispatch_strategy", nearest_elevator_dispatch_strategy)
+        self.__elevators = []
+        self.__hall_calls = HallCalls(len(floors))
+        self.__dispatch_state = DispatchState(len(floors))
+        self.__dispatch_state.hall_calls = self.__hall_calls
+        self.dispatch_strategy = kwargs.get("dispatch_strategy", "nearest_elevator")
         self._elevator_cls = kwargs.get("elevator_cls", Elevator)
-        self.__wait_list_up = {floor: set() for floor in self.__floors}
-        self.__wait_list_down = {floor: set() for floor in self.__floors}
 
-    def __wait_set(self, floor, direction):
-        if not direction:
-            raise ValueError("Not a valid direction: {}".format(direction))
-        elif direction > 0:
-            return self.__wait_list_up[floor]
-        elif direction < 0:
-            return self.__wait_list_down[floor]
-        else:
-            raise ValueError("Not a valid direction: {}".format(direction))
+    def wait(self, person, floor, direction, time=None):
+        """records that the person waits on the floor to go the direction
 
-    def wait(self, person, floor, direction):
-        self.__wait_set(floor, direction).add(person)
+        :param time float: the time of the call (def: None, unknown)
+        """
+        self.__hall_calls.add(person, floor, direction, time)
 
     def stop_waiting(self, person, floor, direction):
-        self.__wait_set(floor, direction).remove(person)
+        self.__hall_calls.remove(person, floor, direction)
 
     def waiting_passengers(self, floor, direction):
-        return frozenset(self.__wait_set(floor, direction))
+        return frozenset(self.__hall_calls.waiting(floor, direction))
+
+    def has_waiting(self, floor, direction):
+        """returns True if anyone waits on the floor to go the direction"""
+        return self.__hall_calls.count(floor, direction) > 0
+
+    def hears_hall_events(self, floor, direction):
+        """returns True if anyone waiting on the floor is notified of the hall events of elevators going the direction
+
+        People are notified of the elevators going their way, and with destination dispatch of every elevator.
+        """
+        if self.destination_dispatch:
+            return self.has_waiting(floor, 1) or self.has_waiting(floor, -1)
+        return self.has_waiting(floor, direction)
+
+    @property
+    def hall_calls(self):
+        """the index of the people waiting on each floor of the bank"""
+        return self.__hall_calls
 
     @property
     def floors(self):
@@ -85,9 +103,34 @@ class ElevatorBank(IdentMixin):
 
     @property
     def elevators(self):
-        """Returns a tuple of the elevators in the elevator bank"""
+        """Returns a tuple of the elevators in the elevator bank, in the order they were added"""
         return tuple(self.__elevators)
 
+    @property
+    def dispatch_strategy(self):
+        """the name of the registered dispatch strategy, or the dispatch function, used by this bank"""
+        return self.__dispatch_strategy
+
+    @dispatch_strategy.setter
+    def dispatch_strategy(self, dispatch_strategy):
+        """switches to the registered dispatch strategy of the given name, or to the dispatch function"""
+        if isinstance(dispatch_strategy, str):
+            self.__dispatch = get_dispatch_strategy(dispatch_strategy)
+        else:
+            self.__dispatch = None
+        self.__dispatch_strategy = dispatch_strategy
+        self.__destination_dispatch = is_destination_strategy(self.__dispatch)
+
+    @property
+    def dispatch_state(self):
+        """the array state of the elevators in this bank scored by the dispatch strategies"""
+        return self.__dispatch_state
+
+    @property
+    def destination_dispatch(self):
+        """True if people enter their destination in the hall and are assigned a car, see models.dispatch"""
+        return self.__destination_dispatch
+
     def _create_elevator(self, **kwargs):
         """wrapper for creating an elevator object"""
         return self._elevator_cls(self.floors, **kwargs)
@@ -99,28 +142,53 @@ class ElevatorBank(IdentMixin):
 
         :rtype Elevator: Returns the elevator that was created
         """
+        kwargs.setdefault("idents", self.idents)
         elevator = self._create_elevator(**kwargs)
-        self.__elevators.add(elevator)
+        self.__elevators.append(elevator)
+        self.__dispatch_state.add(elevator)
         return elevator
 
-    def call_to(self, floor, direction):
+    def call_to(self, floor, direction, destination=None):
         """Asks to dispatch an elevator to the requested floor.
 
-        Dispatches the elevator according to the elevator dispatch strategy set by the user.
+        Dispatches the elevator according to the elevator dispatch strategy set by the user. With destination
+        dispatch, the elevator is the car assigned to the caller, which is released once the caller gets out.
 
-        :param floor Floor: the floor the elevator should be sent to
+        :param floor Floor: the floor the elevator should be sent to, or its level
         :param direction Direction: the direction the elevator caller wants to travel
-
+        :param destination Floor: the floor the caller goes to, or its level, only used by destination dispatch
+        (def: None)
+        :rtype Elevator: the elevator dispatched
         """
-        elevator = self.__dispatch_strategy(self.elevators, self.floors, floor, direction)
+        if self.__dispatch is None:
+            elevator = self.__dispatch_strategy(self.elevators, self.floors, floor, direction)
+        elif destination is not None and self.destination_dispatch:
+            level = level_of(destination)
+            index = self.__dispatch(self.__dispatch_state, level_of(floor), direction, level)
+            self.__dispatch_state.assign(index, level)
+            elevator = self.__elevators[index]
+        else:
+            elevator = self.__elevators[self.__dispatch(self.__dispatch_state, level_of(floor), direction)]
         elevator.add_stop(floor)
         return elevator
 
+    def release(self, elevator, destination):
+        """releases the car assigned by call_to to a caller going to the destination
+
+        :param elevator Elevator: the car assigned to the caller
+        :param destination Floor: the floor the caller goes to, or its level
+        """
+        self.__dispatch_state.release(self.__elevators.index(elevator), level_of(destination))
+
     # TODO: contains for elevator
 
 
 class Elevator(IdentMixin):
-    """class to model an elevator"""
+    """class to model an elevator
+
+    The location and stops are kept as levels. Methods taking a floor accept a Floor or its level, and location,
+    next_location and stops give Floor views of them.
+    """
 
     def __init__(self, floors, **kwargs):
         """Creates an elevator with the given settings.
@@ -130,13 +198,23 @@ class Elevator(IdentMixin):
         """
         IdentMixin.__init__(self, **kwargs)
         self.__valid_floors = floors
-        self.__stops = set()
+        self.__num_floors = len(floors)
+        self.__stops = set()  # the levels of the stops
+        self.__stop_levels = []  # the levels of the stops, sorted
+        self.__next_direction = None  # cached until the location, direction or stops change
         self.__capacity = kwargs.get("capacity", 10)
         self.__direction = None
-        self.__passengers = set()
+        self.__passengers = dict()  # the passengers in the order they got in
         self.__doors_open = False
+        self.__dispatch_state = None
+        self.__dispatch_index = None
         self.location = kwargs.get("starting_location", self.__valid_floors[0])
 
+    def _track_dispatch_state(self, state, index):
+        """has the elevator report its position, direction, load and stops into the bank's dispatch state"""
+        self.__dispatch_state = state
+        self.__dispatch_index = index
+
     @property
     def capacity(self):
         """the maximum number of people allowed on this elevator."""
@@ -152,6 +230,11 @@ class Elevator(IdentMixin):
         """the passengers currently in the elevator"""
         return frozenset(self.__passengers)
 
+    @property
+    def riders(self):
+        """the passengers currently in the elevator, in the order they got in"""
+        return tuple(self.__passengers)
+
     def __contains__(self, person):
         """returns True if the passenger is in the elevator"""
         return person in self.__passengers
@@ -171,42 +254,53 @@ class Elevator(IdentMixin):
         if self.is_open:
             if self.full:
                 raise RuntimeError("Unable to enter elevator, would exceed capacity of '{}'".format(self.capacity))
-            self.__passengers.add(person)
+            self.__passengers[person] = None
+            if self.__dispatch_state is not None:
+                self.__dispatch_state.load[self.__dispatch_index] = len(self.__passengers)
         else:
             raise RuntimeError("Unable to enter elevator, doors are closed")
 
     def exit(self, person):
         if self.is_open:
-            self.__passengers.remove(person)
+            del self.__passengers[person]
+            if self.__dispatch_state is not None:
+                self.__dispatch_state.load[self.__dispatch_index] = len(self.__passengers)
         else:
             raise RuntimeError("Unable to exit elevator, doors are closed")
 
     def distance(self, floor):
         """computes the distance between an elevator and the floor"""
-        return self.location.distance(floor)
+        return abs(self.__level - level_of(floor))
 
     def moving_away(self, floor):
         """determines if the elevator in its current position and direction is moving away from the floor
 
         :param floor Floor: the floor to test if the elevator is moving away from.
         """
-        return self.next_location.distance(floor) > self.location.distance(floor)
+        level = level_of(floor)
+        return abs(self.next_level - level) > abs(self.__level - level)
 
     @property
     def direction(self):
         """Returns the direction the elevator is currently travelling"""
         return self.__direction
 
+    def _check_direction(self, value):
+        valid_values = (1, -1, 0, None)
+        if value not in valid_values:
+            raise ValueError("Direction must be one of the following values: {}".format(valid_values))
+
     @direction.setter
+    @validated(_check_direction)
     def direction(self, value):
         """Property to set the direction.
 
         :param value int: the value indicating the direction (1 - up, -1 - down, 0 / None - idle)
         """
-        valid_values = (1, -1, 0, None)
-        if value not in valid_values:
-            raise ValueError("Direction must be one of the following values: {}".format(valid_values))
         self.__direction = value
+        self.__next_direction = None
+        if self.__dispatch_state is not None:
+            self.__dispatch_state.direction[self.__dispatch_index] = value or 0
 
     @property
     def next_direction(self):
@@ -214,33 +308,52 @@ class Elevator(IdentMixin):
 
         it should continue to travel in its current direction unless that is not in the direction of any stops.
         """
-        if self.location == self.__valid_floors[0]:
-            return 1
-        elif self.location == self.__valid_floors[-1]:
-            return -1
-
-        if not self.direction:  # move towards the first stop
-            if not self.stops or self.location in self.stops:
-                return 0
-            return 1 if self.distance(list(self.stops)[0]) > 0 else -1
-        else:
-            moving_towards_stop = not all([self.moving_away(floor) for floor in self.stops])
-            if moving_towards_stop:
-                return self.direction
+        if self.__next_direction is None:
+            if self.__level == 1:
+                self.__next_direction = 1
+            elif self.__level == self.__num_floors:
+                self.__next_direction = -1
+            elif not self.direction:  # move towards the first stop
+                # every stop is at a distance, so the elevator sets off upwards
+                self.__next_direction = 0 if not self.__stops or self.__level in self.__stops else 1
+            elif self.has_stops_ahead():  # moving towards a stop
+                self.__next_direction = self.direction
             else:
-                return -1 * self.direction
+                self.__next_direction = -1 * self.direction
+        return self.__next_direction
 
     @property
     def location(self):
         """gets the current location of the elevator"""
-        return self.__location
+        return self.__valid_floors[self.__level - 1]
+
+    def _check_location(self, floor):
+        if not isinstance(floor, Floor):
+            raise TypeError("expected param floor to be of type {}".format(Floor.__name__))
 
     @location.setter
+    @validated(_check_location)
     def location(self, floor):
         """sets the location of the elevator"""
-        if not isinstance(floor, Floor):
-            raise TypeError("expected param floor to be of type {}".format(Floor.__name__))
-        self.__location = floor
+        self.level = floor.level
+
+    @property
+    def level(self):
+        """gets the level of the current location of the elevator"""
+        return self.__level
+
+    def _check_level(self, level):
+        if not 1 <= level <= self.__num_floors:
+            raise ValueError("Level {} does not exist in the list of valid floors for this elevator".format(level))
+
+    @level.setter
+    @validated(_check_level)
+    def level(self, level):
+        """sets the location of the elevator by its level"""
+        self.__level = level
+        self.__next_direction = None
+        if self.__dispatch_state is not None:
+            self.__dispatch_state.position[self.__dispatch_index] = level
 
     @property
     def next_location(self):
@@ -248,26 +361,71 @@ class Elevator(IdentMixin):
 
         :rtype Floor: the next location where the elevator will be when it completes its next step.
         """
-        if not self.direction or not self.location:
-            return self.location
+        return self.__valid_floors[self.next_level - 1]
 
-        next_level = self.location.level + self.direction
-        next_level = min(max(1, next_level), len(self.__valid_floors))  # boundaries check
-        floor = self.__valid_floors[next_level - 1]
-        return floor
+    @property
+    def next_level(self):
+        """the level of the next location, see next_location"""
+        if not self.__direction:
+            return self.__level
+        return min(max(1, self.__level + self.__direction), self.__num_floors)  # boundaries check
 
     @property
     def stops(self):
         """Returns the floors that the elevator should stop on"""
-        return frozenset(self.__stops)
+        return frozenset(self.__valid_floors[level - 1] for level in self.__stops)
+
+    @property
+    def has_stops(self):
+        """returns True if the elevator has any floor to stop on"""
+        return bool(self.__stops)
+
+    def has_stop(self, floor):
+        """returns True if the elevator should stop on the floor"""
+        return level_of(floor) in self.__stops
+
+    def has_stops_ahead(self, direction=None):
+        """returns True if the elevator has a stop beyond its location in the direction
+
+        :param direction int: the direction to look in (def: None, the direction of the elevator)
+        """
+        return self.nearest_stop_ahead(direction) is not None
+
+    def nearest_stop_ahead(self, direction=None):
+        """returns the nearest stop beyond the location of the elevator in the direction, None if there is none
+
+        :param direction int: the direction to look in (def: None, the direction of the elevator)
+        :rtype Floor: the floor of the stop
+        """
+        if direction is None:
+            direction = self.direction
+        if not direction:
+            return None
+        level = self.__level
+        if direction > 0:
+            i = bisect.bisect_right(self.__stop_levels, level)
+            if i == len(self.__stop_levels):
+                return None
+        else:
+            i = bisect.bisect_left(self.__stop_levels, level) - 1
+            if i < 0:
+                return None
+        return self.__valid_floors[self.__stop_levels[i] - 1]
 
     def add_stop(self, floor):
         """Adds a floor to the list of floors the elevator should stop on
 
         :param floor Floor: floor to stop on
         """
-        if floor in self.__valid_floors:
-            self.__stops.add(floor)
+        level = level_of(floor)
+        if 1 <= level <= self.__num_floors:
+            if level not in self.__stops:
+                self.__stops.add(level)
+                bisect.insort(self.__stop_levels, level)
+                self.__next_direction = None
+            if self.__dispatch_state is not None:
+                self.__dispatch_state.stop_count[self.__dispatch_index] = len(self.__stops)
+                self.__dispatch_state.stops[self.__dispatch_index, level] = True
         else:
             raise ValueError("Floor does not exist in the list of valid floors for this elevator".format(floor))
 
@@ -276,8 +434,14 @@ class Elevator(IdentMixin):
 
         :param floor Floor: floor to remove stop from
         """
-        if floor in self.__stops:
-            self.__stops.remove(floor)
+        level = level_of(floor)
+        if level in self.__stops:
+            self.__stops.remove(level)
+            del self.__stop_levels[bisect.bisect_left(self.__stop_levels, level)]
+            self.__next_direction = None
+            if self.__dispatch_state is not None:
+                self.__dispatch_state.stop_count[self.__dispatch_index] = len(self.__stops)
+                self.__dispatch_state.stops[self.__dispatch_index, level] = False
         else:
             raise ValueError("Floor cannot be removed because it is not a stop on the elevator".format(floor))
 
@@ -2,22 +2,113 @@
 # encoding: utf-8
 
 
+import itertools
 import uuid
 
 
+class IdentRegistry(object):
+    """Hands out the integer identities of the objects of a simulation, and keeps the uuids they map to.
+
+    Each simulation has a registry of its own, dropped with the simulation, so the tables do not grow with the
+    number of simulations run in a process, and the identities only depend on the order the objects of the
+    simulation are created in.
+    """
+
+    def __init__(self):
+        self.__idents = itertools.count(1)
+        self.__uuid_by_ident = dict()
+        self.__ident_by_uuid = dict()
+
+    def __len__(self):
+        """the number of uuids recorded"""
+        return len(self.__ident_by_uuid)
+
+    def new(self):
+        """returns a new identity, without a uuid"""
+        return next(self.__idents)
+
+    def record(self, value):
+        """returns the identity of the uuid, recording a new one the first time the uuid is seen
+
+        :param value str: the uuid as a hex string
+        """
+        ident = self.__ident_by_uuid.get(value)
+        if ident is None:
+            ident = next(self.__idents)
+            self.__ident_by_uuid[value] = ident
+            self.__uuid_by_ident[ident] = value
+        return ident
+
+    def uuid(self, ident):
+        """returns the uuid of the identity as a hex string, generating and recording one if it has none"""
+        value = self.__uuid_by_ident.get(ident)
+        if value is None:
+            value = uuid.uuid4().hex
+            self.__ident_by_uuid[value] = ident
+            self.__uuid_by_ident[ident] = value
+        return value
+
+    def ident_for(self, value):
+        """returns the integer identity an object with the given uuid would have, without recording a new one
+
+        Objects with a uuid already recorded get its identity, others a new identity of their own, so people held in
+        arrays rather than objects take no room in the uuid table.
+
+        :param value str: the uuid as a hex string
+        """
+        ident = self.__ident_by_uuid.get(value)
+        return next(self.__idents) if ident is None else ident
+
+
+# the registry of the objects created outside of a simulation
+_shared_idents = IdentRegistry()
+
+
 class IdentMixin(object):
+    """Gives objects a compact sequential integer identity.
+
+    The integer is what objects hash and compare by. UUIDs are kept in the side tables of an IdentRegistry: those
+    passed in map back to the integer they were first given, and those never passed in are only generated when first
+    asked for. Identities are only comparable within a registry: objects of different registries, such as the objects
+    of a simulation and those read back once it was written, are never equal, compare their uuids to match them.
+    """
+
     def __init__(self, **kwargs):
-        self.__uuid = uuid.UUID(kwargs.get("uuid", uuid.uuid4().hex))
+        """
+        :param uuid str: the uuid of the object, in any form accepted by uuid.UUID (def: generated on demand)
+        :param idents IdentRegistry: the registry of the identities of the simulation the object belongs to (def: the
+        registry shared by objects created outside of a simulation)
+        """
+        idents = kwargs.get("idents")
+        self.__idents = idents = _shared_idents if idents is None else idents
+        value = kwargs.get("uuid")
+        if value is None:
+            self.__ident = idents.new()
+        else:
+            self.__ident = idents.record(uuid.UUID(value).hex)
+
+    @property
+    def ident(self):
+        """the integer identity of the object"""
+        return self.__ident
 
     @property
     def uuid(self):
-        return self.__uuid.hex
+        """the uuid of the object as a hex string"""
+        return self.__idents.uuid(self.__ident)
+
+    @property
+    def idents(self):
+        """the registry the identity of the object comes from"""
+        return self.__idents
 
     def __repr__(self):
-        return "{}(uuid={})".format(self.__class__.__name__,self.uuid)
+        return "{}(ident={})".format(self.__class__.__name__, self.__ident)
 
     def __hash__(self):
-        return self.__uuid.int
+        return self.__ident
 
     def __eq__(self, obj):
-        return self.__uuid == obj.__uuid
+        if not isinstance(obj, IdentMixin):
+            return NotImplemented
+        return self.__idents is obj.__idents and self.__ident == obj.__ident
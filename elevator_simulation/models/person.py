@@ -2,10 +2,14 @@
 # encoding: utf-8
 
 
+from bisect import bisect_left, bisect_right
 from collections import namedtuple
+from heapq import merge
+from operator import itemgetter
 from datetime import timedelta
 from elevator_simulation.models import IdentMixin
 from elevator_simulation.models.building import Floor
+from elevator_simulation.validation import validated
 
 Event = namedtuple("Event", "start_time location description")
 
@@ -26,28 +30,96 @@ class Schedule(object):
     """
     def __init__(self):
         self.__events = []
+        self.__start_times = []  # sorted start times, parallel to the events for bisect lookups
+        self.__position = 0
 
     def __eq__(self, obj):
         return all([self.events[i] == obj.events[i] for i in range(len(self.events))])
 
+    def __len__(self):
+        return len(self.__events)
+
     @property
     def events(self):
         """Returns a tuple of events in this schedule."""
         return tuple(self.__events)
 
+    @property
+    def position(self):
+        """the index of the first event the cursor has not yet moved past"""
+        return self.__position
+
     def next_event(self, now):
         """tells us the next event starting from the given time."""
-        for event in self.events:
-            if now <= event.start_time:
-                return event
+        index = bisect_left(self.__start_times, now)
+        if index < len(self.__events):
+            return self.__events[index]
+        return None
+
+    def advance(self, now):
+        """returns the next event starting from the given time and moves the cursor past it.
+
+        Events the cursor has already moved past are never returned again, so an agent walking
+        forward through its schedule does not rescan the events before its position.
+
+        :param now timedelta: the time since midnight
+        :rtype Event: the next event, None if no events remain
+        """
+        index = bisect_left(self.__start_times, now, self.__position)
+        if index < len(self.__events):
+            self.__position = index + 1
+            return self.__events[index]
+        self.__position = index
         return None
 
+    def rewind(self):
+        """moves the cursor back to the first event of the schedule"""
+        self.__position = 0
+
+    def seek(self, position):
+        """moves the cursor to the given position, as if it had moved past the events before it"""
+        if not 0 <= position <= len(self.__events):
+            raise ValueError("Position {} is outside of a schedule of {} events".format(position, len(self.__events)))
+        self.__position = position
+
     def add_event(self, start_time, location, description="unknown event"):
         """Adds an event to the schedule.
 
         :param start_time timedelta: the time since midnight the event starts
         :param location Floor: the location the person should be
         """
+        self.__validate(start_time, location)
+        event = Event(start_time, location, description)
+        index = bisect_right(self.__start_times, start_time)
+        self.__events.insert(index, event)
+        self.__start_times.insert(index, start_time)
+        if index < self.__position:
+            self.__position += 1
+
+    def add_events(self, start_times, locations, descriptions):
+        """Adds many events to the schedule at once, sorting them a single time.
+
+        :param start_times list: the time since midnight each event starts, as timedelta
+        :param locations list: the location the person should be for each event, as Floor
+        :param descriptions list: the description of each event
+        """
+        events = list(map(Event, start_times, locations, descriptions))
+        for event in events:
+            self.__validate(event.start_time, event.location)
+        events.sort(key=itemgetter(0))
+
+        if self.__position:
+            # events starting before the ones the cursor moved past are inserted ahead of the cursor
+            boundary = self.__start_times[self.__position - 1]
+            self.__position += bisect_left([event.start_time for event in events], boundary)
+
+        if self.__events:
+            events = list(merge(self.__events, events, key=itemgetter(0)))
+        self.__events = events
+        self.__start_times = [event.start_time for event in events]
+
+    @staticmethod
+    def __validate(start_time, location):
         if not isinstance(start_time, timedelta):
             raise TypeError("Start time must be a timedelta since midnight")
 
@@ -57,10 +129,6 @@ class Schedule(object):
         if start_time > timedelta(days=1) or start_time < timedelta():
             raise ValueError("Start time must be 0-1 day in length, timedelta since midnight")
 
-        event = Event(start_time, location, description)
-        self.__events.append(event)
-        self.__events.sort()  # this is OK but we really should do an in place insert if we care about performance
-
 
 class Person(IdentMixin):
     """Class to model a person with a work schedule.
@@ -99,9 +167,12 @@ class Person(IdentMixin):
         """the location the individual is currently positioned"""
         return self.__location
 
+    def _check_location(self, value):
+        if not isinstance(value, Floor):
+            raise TypeError("Expected location to be of type {}".format(Floor.__name__))
+
     @location.setter
+    @validated(_check_location)
     def location(self, value):
         """sets the locations of the individual."""
-        if not isinstance(value, Floor):
-            raise TypeError("Expected location to be of type {}".format(Floor.__name__))
         self.__location = value
@@ -0,0 +1,158 @@
+#!/usr/bin/env python
+# encoding: utf-8
+
+
+import json
+import mmap
+import struct
+from functools import partial
+import numpy as np
+from elevator_simulation.engine import PersonStore
+from elevator_simulation.generators.binary import SCENARIO_MAGIC, NO_CALL_STRATEGY
+from elevator_simulation.readers.json import create_simulation, create_person as create_json_person
+
+
+def is_binary_simulation(filename):
+    """returns True if the file is in the binary scenario format"""
+    with open(filename, "rb") as f:
+        return f.read(len(SCENARIO_MAGIC)) == SCENARIO_MAGIC
+
+
+class BinaryScenario(object):
+    """A scenario in the binary scenario format, see generators.binary.write_scenario
+
+    The file is memory mapped and the arrays are views of the mapping, so nothing is parsed or copied up front.
+    """
+
+    def __init__(self, filename):
+        """opens the binary scenario file
+
+        :param filename str: path to the binary scenario file
+        """
+        with open(filename, "rb") as f:
+            self.__mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        if self.__mmap[:len(SCENARIO_MAGIC)] != SCENARIO_MAGIC:
+            raise ValueError("'{}' is not a binary scenario file".format(filename))
+
+        base = len(SCENARIO_MAGIC) + 8
+        header_length = struct.unpack_from("<Q", self.__mmap, len(SCENARIO_MAGIC))[0]
+        header = json.loads(self.__mmap[base:base + header_length].decode("utf-8"))
+        base += header_length
+
+        self.building = header["building"]
+        self.elevator_banks = header["elevator_banks"]
+        self.call_strategies = header["call_strategies"]
+        self.descriptions = header["descriptions"]
+        self.arrays = dict()
+        for name, dtype, shape, offset in header["arrays"]:
+            count = int(np.prod(shape))
+            if count:
+                array = np.frombuffer(self.__mmap, dtype=dtype, count=count, offset=base + offset)
+            else:
+                array = np.zeros(count, dtype=dtype)
+            self.arrays[name] = array.reshape(shape)
+
+        # index of the first event of each person, and one past the last event
+        self.event_offsets = np.searchsorted(self.arrays["event_person"], np.arange(len(self) + 1)).tolist()
+
+    def __len__(self):
+        """the number of people in the scenario"""
+        return len(self.arrays["person_strategy"])
+
+    def person(self, i):
+        """returns the parameters of the i-th person, without the schedule"""
+        person = dict()
+        person_uuid = self.arrays["person_uuid"][i].tobytes()
+        if any(person_uuid):
+            person["uuid"] = person_uuid.hex()
+        strategy = self.arrays["person_strategy"][i]
+        if strategy != NO_CALL_STRATEGY:
+            person["elevator_call_strategy"] = self.call_strategies[strategy]
+        return person
+
+    def events(self, i):
+        """returns the start, level and description of the events of the i-th person, sorted by start"""
+        begin, end = self.event_offsets[i], self.event_offsets[i+1]
+        starts = self.arrays["event_start"][begin:end].tolist()
+        levels = self.arrays["event_level"][begin:end].tolist()
+        descriptions = [self.descriptions[d] for d in self.arrays["event_description"][begin:end].tolist()]
+        return starts, levels, descriptions
+
+    def to_data(self):
+        """returns the scenario as the data structure stored in a json simulation file"""
+        people = []
+        for i in range(len(self)):
+            person = self.person(i)
+            person["schedule"] = [{"start": start, "level": level, "description": description}
+                                  for start, level, description in zip(*self.events(i))]
+            people.append(person)
+        return {"building": self.building, "elevator_banks": self.elevator_banks, "people": people}
+
+
+def read_simulation(filename, **kwargs):
+    """Reads a binary scenario file for simulation settings
+
+    :param filename str: path to the binary scenario file
+    :returns Simulation: the simulation described by the file
+    :note: see build_simulation for the remaining parameters
+    """
+    return build_simulation(BinaryScenario(filename), **kwargs)
+
+
+def build_simulation(scenario, **kwargs):
+    """Builds a simulation from an opened binary scenario
+
+    :param scenario BinaryScenario: the scenario to simulate
+    :param call_strategy str: overrides the call strategy of every person (def: None, the scenario's)
+    :returns Simulation: the simulation described by the scenario
+    :param compact bool: keep the people in the arrays of a PersonStore, see add_person_store (def: False)
+    :note: see readers.json.build_simulation for the remaining parameters, with lazy the people are only read from
+    the arrays once their first event comes due
+    """
+    simulation = create_simulation({"building": scenario.building, "elevator_banks": scenario.elevator_banks}, **kwargs)
+    if kwargs.get("compact", False):
+        add_person_store(simulation, scenario.call_strategies, scenario.descriptions, scenario.arrays, **kwargs)
+        return simulation
+
+    lazy = kwargs.get("lazy", False)
+    event_start, offsets = scenario.arrays["event_start"], scenario.event_offsets
+    for i in range(len(scenario)):
+        if lazy and offsets[i] < offsets[i+1]:
+            simulation.add_person_later(event_start[offsets[i]].item(), partial(create_person, simulation, scenario, i,
+                                                                               **kwargs))
+        else:
+            simulation.people.append(create_person(simulation, scenario, i, **kwargs))
+    return simulation
+
+
+def add_person_store(simulation, call_strategies, descriptions, arrays, **kwargs):
+    """adds people held in the arrays of the binary scenario format to the simulation, without an agent each
+
+    The people are kept in simulation.population rather than simulation.people, and only have an agent while on a
+    trip. They record the trips of people created up front, lazy is ignored. Only the events engine runs them.
+
+    :param call_strategies list: the call strategies indexed by person_strategy
+    :param descriptions list: the descriptions indexed by event_description
+    :param arrays dict: the arrays of the people and their events, see generators.binary.write_scenario
+    :note: see engine.PersonStore for the remaining parameters
+    """
+    if kwargs.get("engine", "simpy") != "events":
+        raise ValueError("Compact people are only run by the events engine, not '{}'".format(kwargs.get("engine", "simpy")))
+    if simulation.population is not None:
+        raise ValueError("The simulation already has a person store")
+    simulation.population = PersonStore(simulation, call_strategies, descriptions, arrays, **kwargs)
+
+
+def create_person(simulation, scenario, i, **kwargs):
+    """creates the agent of the i-th person of the scenario, without adding it to the simulation
+
+    :returns Person: the person agent of the engine
+    :note: see build_simulation for the remaining parameters
+    """
+    person_kwargs = scenario.person(i)
+    person_kwargs["index"] = i
+    call_strategy = kwargs.get("call_strategy")
+    if call_strategy is not None:
+        person_kwargs["elevator_call_strategy"] = call_strategy
+    return create_json_person(simulation, person_kwargs, *scenario.events(i), **kwargs)
@@ -3,49 +3,218 @@
 
 
 import json
+import re
 from datetime import timedelta
-from elevator_simulation.agents import ElevatorBank, Person, Simulation
+from functools import partial
+from elevator_simulation import agents, engine
 
 
-def read_simulation(filename):
+# the simulation, elevator bank and person classes of each engine: simpy processes, or the event queue of engine
+ENGINES = {"simpy": (agents.Simulation, agents.ElevatorBank, agents.Person),
+           "events": (engine.Simulation, engine.ElevatorBank, engine.Person)}
+
+
+_WHITESPACE = re.compile(r"[ \t\n\r]*")
+
+
+class _JSONStream(object):
+    """incrementally decodes json values from a text stream, reading it a chunk at a time"""
+
+    def __init__(self, fh, chunk_size):
+        self.__fh = fh
+        self.__chunk_size = chunk_size
+        self.__buffer = ""
+        self.__pos = 0
+        self.__eof = False
+        self.__decoder = json.JSONDecoder()
+
+    def __fill(self):
+        """appends the next chunk to the unconsumed part of the buffer, returns False at the end of the stream"""
+        chunk = self.__fh.read(max(self.__chunk_size, len(self.__buffer) - self.__pos))
+        self.__buffer = self.__buffer[self.__pos:] + chunk
+        self.__pos = 0
+        self.__eof = not chunk
+        return not self.__eof
+
+    def peek(self):
+        """returns the next non whitespace character without consuming it, an empty string at the end"""
+        while True:
+            self.__pos = _WHITESPACE.match(self.__buffer, self.__pos).end()
+            if self.__pos < len(self.__buffer):
+                return self.__buffer[self.__pos]
+            if not self.__fill():
+                return ""
+
+    def expect(self, char):
+        """consumes the next non whitespace character, which must be char"""
+        if self.peek() != char:
+            raise ValueError("Expected '{}' at this point of the json file".format(char))
+        self.__pos += 1
+
+    def value(self):
+        """decodes and consumes the next json value"""
+        self.peek()
+        while True:
+            try:
+                value, end = self.__decoder.raw_decode(self.__buffer, self.__pos)
+            except json.JSONDecodeError:
+                if self.__fill():
+                    continue
+                raise
+            # a value running up to the end of the buffer may continue in the next chunk, e.g. a number
+            if end == len(self.__buffer) and not self.__eof and self.__fill():
+                continue
+            self.__pos = end
+            return value
+
+    def members(self):
+        """yields (key, value) for each member of the json object that follows
+
+        The value of the 'people' member is a generator of its elements, which must be consumed before the next member.
+        """
+        self.expect("{")
+        while self.peek() != "}":
+            key = self.value()
+            self.expect(":")
+            yield key, self.elements() if key == "people" else self.value()
+            if self.peek() == ",":
+                self.expect(",")
+        self.expect("}")
+
+    def elements(self):
+        """yields each element of the json array that follows"""
+        self.expect("[")
+        while self.peek() != "]":
+            yield self.value()
+            if self.peek() == ",":
+                self.expect(",")
+        self.expect("]")
+
+
+def read_simulation(filename, **kwargs):
     """Reads a json file for simulation settings
 
-    :filename: TODO
-    :returns: TODO
+    The file is decoded incrementally: people are created from their records as they are read rather than after the
+    whole file has been decoded.
+
+    :param filename str: path to the json simulation file
+    :param chunk_size int: number of characters read from the file at a time (def: 65536)
+    :returns Simulation: the simulation described by the file
+    :note: see build_simulation for the remaining parameters
     """
+    data = dict()
     simulation = None
     with open(filename, "r", encoding="utf-8") as f:
-        data = json.load(f)
-
-        # create the buidling according to specifications
-        if "building" not in data:
-            raise ValueError("Expected 'building' element in file")
-
-        building_data = data["building"]
-        num_floors = building_data["floors"]
-        simulation = Simulation(number_of_floors=num_floors)
-
-        if "elevator_banks" not in data:
-            raise ValueError("Expected 'elevator_banks' element in file")
-
-        elevator_data = data["elevator_banks"]
-        for elevator_bank in elevator_data:
-            ctrl = ElevatorBank(simulation, **elevator_bank)  # TODO: read the strategy optionally?
-            elevator_arg_list = elevator_bank["elevators"]
-            for elevator_args in elevator_arg_list:
-                ctrl.add_elevator(**elevator_args)
-            simulation.elevator_banks.append(ctrl)
-
-        # create the people according to person/schedule specifications
-        people_data = data["people"]
-        for person_data in people_data:
-            person = Person(simulation, **person_data)
-            schedule_data = person_data["schedule"]
-            for event_data in schedule_data:
-                start_time = timedelta(seconds=event_data["start"])
-                location = simulation.building.floors[event_data["level"]-1]
-                description = event_data.get("description", "unknown")
-                person.schedule.add_event(start_time, location, description)
-            simulation.people.append(person)
+        for key, value in _JSONStream(f, kwargs.get("chunk_size", 1 << 16)).members():
+            if key != "people":
+                data[key] = value
+            elif "building" in data and "elevator_banks" in data:
+                simulation = create_simulation(data, **kwargs)
+                _add_people(simulation, value, **kwargs)
+            else:  # people before the building, keep them until it is known
+                data[key] = list(value)
+
+    if simulation is None:
+        simulation = build_simulation(data, **kwargs)
+    return simulation
+
+
+def build_simulation(data, **kwargs):
+    """Builds a simulation from already decoded json simulation settings
+
+    :param data dict: the decoded contents of a json simulation file
+    :param trip_complete func: the function each person invokes when a trip completes (def: person default)
+    :param lazy bool: create each person when its first event comes due instead of up front (def: False)
+    :param seed int: the seed of the random streams of the agents, see agents.Simulation (def: None)
+    :param engine str: the engine running the simulation, a key of ENGINES (def: simpy)
+    :returns Simulation: the simulation described by the data
+    """
+    simulation = create_simulation(data, **kwargs)
+    _add_people(simulation, data["people"], **kwargs)
+    return simulation
+
+
+def create_simulation(data, **kwargs):
+    """creates the simulation with its building and elevator banks, but no people
+
+    :param data dict: the decoded simulation settings, only 'building' and 'elevator_banks' are used
+    :param seed int: the seed of the random streams of the agents, see agents.Simulation (def: None)
+    :param engine str: the engine running the simulation, a key of ENGINES (def: simpy)
+    :returns Simulation: the simulation without people
+    """
+    # create the buidling according to specifications
+    if "building" not in data:
+        raise ValueError("Expected 'building' element in file")
+
+    Simulation, ElevatorBank, _ = engine_classes(kwargs.get("engine", "simpy"))
+    building_data = data["building"]
+    num_floors = building_data["floors"]
+    simulation = Simulation(number_of_floors=num_floors, seed=kwargs.get("seed"))
+
+    if "elevator_banks" not in data:
+        raise ValueError("Expected 'elevator_banks' element in file")
+
+    elevator_data = data["elevator_banks"]
+    for elevator_bank in elevator_data:
+        bank_kwargs = dict(elevator_bank)
+        if "strategy" in bank_kwargs:
+            bank_kwargs["dispatch_strategy"] = bank_kwargs.pop("strategy")
+        ctrl = ElevatorBank(simulation, **bank_kwargs)
+        elevator_arg_list = elevator_bank["elevators"]
+        for elevator_args in elevator_arg_list:
+            ctrl.add_elevator(**elevator_args)
+        simulation.elevator_banks.append(ctrl)
 
     return simulation
+
+
+def engine_classes(name):
+    """returns the simulation, elevator bank and person classes of the named engine, see ENGINES"""
+    if name not in ENGINES:
+        raise ValueError("No engine '{}' exists, expected one of {}".format(name, sorted(ENGINES)))
+    return ENGINES[name]
+
+
+def _add_people(simulation, people_data, **kwargs):
+    """creates the people according to person/schedule specifications"""
+    descriptions = dict()  # shares one string between the events with the same description
+    for index, person_data in enumerate(people_data):
+        person_kwargs = {key: value for key, value in person_data.items() if key != "schedule"}
+        person_kwargs["index"] = index
+        schedule_data = sorted(person_data["schedule"], key=lambda event_data: event_data["start"])
+        starts = [event_data["start"] for event_data in schedule_data]
+        levels = [event_data["level"] for event_data in schedule_data]
+        events_descriptions = [descriptions.setdefault(d, d) for d in [event_data.get("description", "unknown") for event_data in schedule_data]]
+        add_person(simulation, person_kwargs, starts, levels, events_descriptions, **kwargs)
+
+
+def add_person(simulation, person_kwargs, starts, levels, descriptions, **kwargs):
+    """adds a person, whose events are already sorted by start time, to the simulation
+
+    :param person_kwargs dict: the parameters of the person agent
+    :param starts list: start of each event in seconds since midnight, in ascending order
+    :param levels list: level of the location of each event
+    :param descriptions list: description of each event
+    :note: see build_simulation for the remaining parameters
+    """
+    if kwargs.get("lazy", False) and len(starts):
+        simulation.add_person_later(starts[0], partial(create_person, simulation, person_kwargs, starts, levels,
+                                                       descriptions, **kwargs))
+    else:
+        simulation.people.append(create_person(simulation, person_kwargs, starts, levels, descriptions, **kwargs))
+
+
+def create_person(simulation, person_kwargs, starts, levels, descriptions, **kwargs):
+    """creates a person agent with its schedule built in bulk from the presorted events, without adding it
+
+    :returns Person: the person agent of the engine
+    :note: see add_person for the parameters
+    """
+    if "trip_complete" in kwargs:
+        person_kwargs = dict(person_kwargs, trip_complete=kwargs["trip_complete"])
+
+    person_cls = engine_classes(kwargs.get("engine", "simpy"))[2]
+    floors = simulation.building.floors
+    person = person_cls(simulation, **person_kwargs)
+    person.schedule.add_events([timedelta(seconds=start) for start in starts], [floors[level-1] for level in levels], descriptions)
+    return person
@@ -0,0 +1,30 @@
+#!/usr/bin/env python
+# encoding: utf-8
+
+
+import json
+import struct
+import numpy as np
+from elevator_simulation.sinks import TRIP_FILE_MAGIC
+
+
+def read_trip_chunks(filename):
+    """Reads a binary trip file written by sinks.ChunkedTripSink one chunk at a time
+
+    :param filename str: path to the trip file
+    :rtype generator: yields a (columns, descriptions) tuple per chunk, where columns maps each column name to an array
+    """
+    with open(filename, "rb") as f:
+        if f.read(len(TRIP_FILE_MAGIC)) != TRIP_FILE_MAGIC:
+            raise ValueError("'{}' is not a trip file".format(filename))
+
+        while True:
+            length = f.read(4)
+            if not length:
+                break
+            header = json.loads(f.read(struct.unpack("<I", length)[0]).decode("utf-8"))
+            columns = dict()
+            for name, dtype in header["columns"]:
+                dtype = np.dtype(dtype)
+                columns[name] = np.frombuffer(f.read(header["rows"] * dtype.itemsize), dtype=dtype)
+            yield columns, header["descriptions"]
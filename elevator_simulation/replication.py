@@ -0,0 +1,144 @@
+#!/usr/bin/env python
+# encoding: utf-8
+
+import itertools
+import json
+import numpy as np
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from elevator_simulation.generators import population
+from elevator_simulation.readers import binary
+from elevator_simulation.readers.json import build_simulation
+from elevator_simulation.sinks import TripStore
+from elevator_simulation.stats import confidence_interval
+
+
+Replication = namedtuple("Replication", "scenario call_strategy dispatch_strategy seed")
+
+# the random streams of a generated scenario, each seeded from the seed of the replication and its own number
+ARRIVALS = 0
+ELEVATORS = 1
+
+METRICS = ("wait_mean", "wait_p95")
+
+
+def read_scenario(filename):
+    """returns the scenario of the replications in a file
+
+    A json file holding a 'population' object describes a scenario generated anew for each replication, by
+    generators.population from the arguments of generate_simulation.generate_simulation it holds. Any other file is a
+    json or binary simulation file whose people keep their schedules in every replication.
+
+    :rtype str|dict: the path of the simulation file, or the population settings
+    """
+    if binary.is_binary_simulation(filename):
+        return filename
+    with open(filename, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    return data["population"] if "population" in data else filename
+
+
+def replications(scenario, seeds, call_strategy=(None, ), dispatch_strategy=(None, )):
+    """Expands the seeds and strategies into every replication to run.
+
+    Replications with the same seed draw the same schedules and give every person the same random stream, whatever
+    the strategies, so strategies are compared with common random numbers. A strategy of None leaves the one of the
+    scenario untouched.
+
+    :param scenario str|dict: the scenario, see read_scenario
+    :param seeds list: the seed of each replication
+    :param call_strategy list: names of the call strategy every person uses
+    :param dispatch_strategy list: names of the dispatch strategy every elevator bank uses
+    :rtype list: the replications, seed by seed
+    """
+    grid = itertools.product(seeds, call_strategy, dispatch_strategy)
+    return [Replication(scenario, call, dispatch, seed) for seed, call, dispatch in grid]
+
+
+def build_replication(replication, engine="simpy"):
+    """builds the simulation of the replication, with the seed of its random streams, run by the named engine"""
+    scenario, seed = replication.scenario, replication.seed
+    if isinstance(scenario, dict):
+        settings = {key: value for key, value in scenario.items() if key not in ("people", "lunch_on_floor", "seed")}
+        if replication.call_strategy is not None:
+            settings["call_strategy"] = replication.call_strategy
+        elevator_banks = population.generate_elevator_banks(np.random.default_rng([seed, ELEVATORS]), **settings)
+        people = population.generate_population(scenario["people"], scenario["lunch_on_floor"],
+                                                np.random.default_rng([seed, ARRIVALS]), **settings)
+        simulation = population.build_simulation(people, {"floors": settings.get("floors", 9)}, elevator_banks, seed=seed,
+                                                engine=engine)
+    elif binary.is_binary_simulation(scenario):
+        simulation = binary.read_simulation(scenario, call_strategy=replication.call_strategy, seed=seed,
+                                            engine=engine)
+    else:
+        with open(scenario, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        if replication.call_strategy is not None:
+            for person in data["people"]:
+                person["elevator_call_strategy"] = replication.call_strategy
+        simulation = build_simulation(data, seed=seed, engine=engine)
+
+    if replication.dispatch_strategy is not None:
+        for bank in simulation.elevator_banks:
+            bank.dispatch_strategy = replication.dispatch_strategy
+    return simulation
+
+
+def run_replication(replication, fast_forward=False, engine="simpy"):
+    """Runs a single replication (executed in the worker processes).
+
+    :param replication Replication: the replication to simulate
+    :param fast_forward bool: run the simulation in fast forward mode, see agents.Simulation (def: False)
+    :param engine str: the engine running the simulation, see readers.json.ENGINES (def: simpy)
+    :rtype tuple: the replication and the summary of its trips, see TripStore.summary
+    """
+    simulation = build_replication(replication, engine)
+    simulation.trip_sink = TripStore()
+    simulation.fast_forward = fast_forward
+    simulation.run()
+    return replication, simulation.trip_sink.summary()
+
+
+def run_replications(replications, max_workers=None, fast_forward=False, engine="simpy"):
+    """Fans the replications out over a pool of worker processes.
+
+    :param replications list: the replications to simulate
+    :param max_workers int: the number of worker processes (def: number of processors)
+    :param fast_forward bool: run the simulations in fast forward mode (def: False)
+    :param engine str: the engine running the simulations (def: simpy)
+    :rtype generator: yields (replication, summary) in the order the replications were given
+    """
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        for result in executor.map(partial(run_replication, fast_forward=fast_forward, engine=engine), replications):
+            yield result
+
+
+def compare(results, metrics=METRICS):
+    """Estimates each metric for each combination of strategies, with 95% confidence intervals.
+
+    Each combination is also compared with the first one, from the differences between the replications that share
+    a seed. Common random numbers make these differences vary much less than the metrics themselves, so their
+    intervals tell strategies apart with fewer replications.
+
+    :param results list: the (replication, summary) of every replication
+    :param metrics tuple: the summary values to estimate (def: METRICS)
+    :rtype list: a dict per combination, in the order they first appear: call_strategy, dispatch_strategy,
+    replications, then for each metric its mean and the half width of its interval, and the mean difference with
+    the first combination and the half width of its interval
+    """
+    by_strategies = dict()
+    for replication, summary in results:
+        by_strategies.setdefault((replication.call_strategy, replication.dispatch_strategy), dict())[replication.seed] = summary
+
+    rows = []
+    baseline = next(iter(by_strategies.values()), dict())
+    for (call_strategy, dispatch_strategy), summaries in by_strategies.items():
+        row = {"call_strategy": call_strategy, "dispatch_strategy": dispatch_strategy, "replications": len(summaries)}
+        seeds = [seed for seed in summaries if seed in baseline]
+        for metric in metrics:
+            row[metric], row[metric + "_ci"] = confidence_interval([summary[metric] for summary in summaries.values()])
+            differences = [summaries[seed][metric] - baseline[seed][metric] for seed in seeds]
+            row[metric + "_diff"], row[metric + "_diff_ci"] = confidence_interval(differences)
+        rows.append(row)
+    return rows
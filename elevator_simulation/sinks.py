@@ -0,0 +1,296 @@
+#!/usr/bin/env python
+# encoding: utf-8
+
+import json
+import struct
+import numpy as np
+from elevator_simulation.data import ElevatorTrip, TripBuffer, TRIP_COLUMNS
+from elevator_simulation.data import to_csv_header
+from elevator_simulation.stats import PERCENTILES, percentiles, grouped_percentiles
+
+
+TRIP_FILE_MAGIC = b"ELEVTRIP"
+
+
+class TripSink(object):
+    """Base class for the destinations of completed elevator trips.
+
+    Trips are copied into a preallocated TripBuffer and written out in bulk whenever the buffer fills up, on flush
+    and on close. A sink can be used directly as the trip_complete function of a person, or set as the trip sink of
+    a simulation. Subclasses implement _write.
+    """
+
+    def __init__(self, chunk_size=65536):
+        """
+        :param chunk_size int: number of trips buffered before they are written (def: 65536)
+        """
+        self.buffer = TripBuffer(chunk_size)
+        self.__written = 0
+
+    def __call__(self, trip):
+        self.append(trip)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    @property
+    def written(self):
+        """the number of trips written out by the sink so far"""
+        return self.__written
+
+    def skip(self, count):
+        """counts the given number of trips as written, those recorded before the snapshot a run resumed from"""
+        self.__written += count
+
+    def append(self, trip):
+        """buffers the trip, writing the buffer out if it is full"""
+        self.buffer.append(trip)
+        if self.buffer.full:
+            self.flush()
+
+    def flush(self):
+        """writes out the buffered trips"""
+        if len(self.buffer):
+            self._write(self.buffer.view(), self.buffer.descriptions)
+            self.__written += len(self.buffer)
+            self.buffer.clear()
+
+    def close(self):
+        """flushes the remaining trips, the sink should not be used afterwards"""
+        self.flush()
+
+    def _write(self, columns, descriptions):
+        """writes a chunk of trips
+
+        :param columns dict: array of values for each trip column
+        :param descriptions list: the descriptions indexed by the description column
+        """
+        raise NotImplementedError()
+
+
+class CsvTripSink(TripSink):
+    """writes trips in bulk as comma separated values"""
+
+    def __init__(self, fh, header=True, **kwargs):
+        """
+        :param fh file: text stream the csv is written to
+        :param header bool: whether to write the header line first (def: True)
+        """
+        TripSink.__init__(self, **kwargs)
+        self.__fh = fh
+        if header:
+            fh.write(to_csv_header(ElevatorTrip) + "\n")
+
+    def _write(self, columns, descriptions):
+        values = []
+        for name, _ in TRIP_COLUMNS:
+            column = columns[name].tolist()
+            if name == "person":
+                column = [person.decode("ascii") for person in column]
+            elif name == "description":
+                column = [descriptions[index] for index in column]
+            values.append(column)
+        self.__fh.write("".join([",".join(map(str, row)) + "\n" for row in zip(*values)]))
+
+    def close(self):
+        TripSink.close(self)
+        self.__fh.flush()
+
+
+class NpyTripSink(TripSink):
+    """collects trips into compact columns and saves them as one structured NumPy .npy array on close
+
+    The person and description columns are saved as unicode strings.
+    """
+
+    def __init__(self, filename, **kwargs):
+        """
+        :param filename str: path of the .npy file to write
+        """
+        TripSink.__init__(self, **kwargs)
+        self.__filename = filename
+        self.__chunks = []
+        self.__descriptions = []
+
+    def _write(self, columns, descriptions):
+        self.__chunks.append({name: column.copy() for name, column in columns.items()})
+        self.__descriptions = descriptions
+
+    def close(self):
+        TripSink.close(self)
+        descriptions = np.array(self.__descriptions or [""])
+        dtype = []
+        for name, column_dtype in TRIP_COLUMNS:
+            if name == "person":
+                column_dtype = "U32"
+            elif name == "description":
+                column_dtype = descriptions.dtype
+            dtype.append((name, column_dtype))
+
+        trips = np.zeros(sum([len(chunk["person"]) for chunk in self.__chunks]), dtype=dtype)
+        for name, _ in TRIP_COLUMNS:
+            if self.__chunks:
+                column = np.concatenate([chunk[name] for chunk in self.__chunks])
+                trips[name] = descriptions[column] if name == "description" else column
+        np.save(self.__filename, trips)
+
+
+class ChunkedTripSink(TripSink):
+    """writes trips to a chunked binary trip file, readable with readers.trips
+
+    The file starts with TRIP_FILE_MAGIC and is followed by one record per flushed chunk: the length of a json
+    header (little endian uint32), the header itself with the number of rows, column names and dtypes and the
+    descriptions, then the raw bytes of each column in order.
+    """
+
+    def __init__(self, fh, magic=True, **kwargs):
+        """
+        :param fh file: binary stream the trips are written to
+        :param magic bool: whether to start the file with TRIP_FILE_MAGIC, False to add chunks to the end of an
+        existing trip file (def: True)
+        """
+        TripSink.__init__(self, **kwargs)
+        self.__fh = fh
+        if magic:
+            fh.write(TRIP_FILE_MAGIC)
+
+    def _write(self, columns, descriptions):
+        header = {"rows": len(columns["person"]),
+                  "columns": [[name, columns[name].dtype.str] for name, _ in TRIP_COLUMNS],
+                  "descriptions": descriptions}
+        header = json.dumps(header).encode("utf-8")
+        self.__fh.write(struct.pack("<I", len(header)))
+        self.__fh.write(header)
+        for name, _ in TRIP_COLUMNS:
+            self.__fh.write(columns[name].tobytes())
+
+    def close(self):
+        TripSink.close(self)
+        self.__fh.flush()
+
+
+class TripStore(TripSink):
+    """keeps trips in memory in growable columns and computes their summary statistics
+
+    The columns are those of TRIP_COLUMNS, except that person holds the index of the person in people and
+    description the index of the description in descriptions. The wait of a trip is the time between calling the
+    elevator and its arrival, its travel the time spent in the elevator.
+    """
+
+    def __init__(self, capacity=65536, **kwargs):
+        """
+        :param capacity int: the number of trips the columns hold before they grow (def: 65536)
+        """
+        TripSink.__init__(self, **kwargs)
+        self.__length = 0
+        self.__columns = {name: np.zeros(capacity, dtype="i8" if name == "person" else dtype)
+                          for name, dtype in TRIP_COLUMNS}
+        self.people = []
+        self.__person_index = dict()
+        self.descriptions = self.buffer.descriptions
+
+    def __len__(self):
+        """the number of trips stored, buffered ones included"""
+        return self.__length + len(self.buffer)
+
+    def column(self, name):
+        """returns the values of the named column for the trips stored so far, flushing any buffered trips"""
+        self.flush()
+        return self.__columns[name][:self.__length]
+
+    @property
+    def wait_secs(self):
+        """the time each trip waited for an elevator"""
+        return self.column("elevator_arrived_secs") - self.column("elevator_called_secs")
+
+    @property
+    def travel_secs(self):
+        """the time each trip spent in the elevator"""
+        return self.column("travel_secs")
+
+    def _write(self, columns, descriptions):
+        # people are numbered in the order of their first trip
+        people, inverse = np.unique(columns["person"], return_inverse=True)
+        indexes = self.__person_indexes([person.decode("ascii") for person in people.tolist()])
+        self.__append(dict(columns, person=indexes[inverse]))
+
+    def extend(self, store):
+        """appends the trips of another store, numbering its people and descriptions like those of this one
+
+        People are told apart by their identity, so the trips of a person recorded in both stores share an index.
+
+        :param store TripStore: the store whose trips are appended
+        """
+        self.flush()
+        columns = {name: store.column(name) for name, _ in TRIP_COLUMNS}
+        descriptions = np.array([self.buffer.description_index(d) for d in store.descriptions], dtype=np.int64)
+        people = self.__person_indexes(store.people)
+        self.__append(dict(columns, person=people[columns["person"]], description=descriptions[columns["description"]]))
+
+    def __person_indexes(self, people):
+        indexes = np.empty(len(people), dtype=np.int64)
+        for i, person in enumerate(people):
+            index = self.__person_index.get(person)
+            if index is None:
+                index = self.__person_index[person] = len(self.people)
+                self.people.append(person)
+            indexes[i] = index
+        return indexes
+
+    def __append(self, columns):
+        rows = len(columns["person"])
+        if self.__length + rows > len(self.__columns["person"]):
+            capacity = max(2 * len(self.__columns["person"]), self.__length + rows)
+            for name, column in self.__columns.items():
+                self.__columns[name] = np.resize(column, capacity)
+
+        end = self.__length + rows
+        for name, column in columns.items():
+            self.__columns[name][self.__length:end] = column
+        self.__length = end
+
+    def summary(self, q=PERCENTILES):
+        """returns the number of trips and the mean and percentiles of their wait and travel times
+
+        :param q tuple: the percentiles to compute, from 0 to 100 (def: PERCENTILES)
+        :rtype dict: trips, then wait_mean, wait_p50... and travel_mean, travel_p50...
+        """
+        summary = {"trips": len(self)}
+        for name, values in (("wait", self.wait_secs), ("travel", self.travel_secs)):
+            summary[name + "_mean"] = float(values.mean()) if len(values) else np.nan
+            for percentile, value in zip(q, percentiles(values, q)):
+                summary["{}_p{:g}".format(name, percentile)] = float(value)
+        return summary
+
+    def by_floor(self, column="start", q=PERCENTILES):
+        """returns the summary of the trips of each floor
+
+        :param column str: the floor a trip counts for, start or destination (def: start)
+        :param q tuple: the percentiles to compute, from 0 to 100 (def: PERCENTILES)
+        :rtype dict: arrays of the level, then trips and the mean and percentiles as in summary, one entry per floor
+        with trips
+        """
+        return self.__breakdown("level", self.column(column).astype(np.int64), q)
+
+    def by_hour(self, q=PERCENTILES):
+        """returns the summary of the trips called during each hour of the day
+
+        :param q tuple: the percentiles to compute, from 0 to 100 (def: PERCENTILES)
+        :rtype dict: arrays of the hour, then trips and the mean and percentiles as in summary, one entry per hour
+        with trips
+        """
+        return self.__breakdown("hour", (self.column("elevator_called_secs") // 3600).astype(np.int64), q)
+
+    def __breakdown(self, key, groups, q):
+        breakdown = dict()
+        for name, values in (("wait", self.wait_secs), ("travel", self.travel_secs)):
+            keys, counts, result = grouped_percentiles(groups, values, q)
+            breakdown[key] = keys
+            breakdown["trips"] = counts
+            breakdown[name + "_mean"] = np.bincount(np.searchsorted(keys, groups), weights=values, minlength=len(keys)) / np.maximum(counts, 1)
+            for percentile, row in zip(q, result):
+                breakdown["{}_p{:g}".format(name, percentile)] = row
+        return breakdown
@@ -0,0 +1,185 @@
+#!/usr/bin/env python
+# encoding: utf-8
+
+import numpy as np
+
+
+PERCENTILES = (50, 95, 99)
+
+# two sided 95% quantiles of Student's t distribution by degrees of freedom, tending to the normal one Z_95
+T_TABLE_95 = ((1, 12.706), (2, 4.303), (3, 3.182), (4, 2.776), (5, 2.571), (6, 2.447), (7, 2.365), (8, 2.306),
+              (9, 2.262), (10, 2.228), (11, 2.201), (12, 2.179), (13, 2.160), (14, 2.145), (15, 2.131), (16, 2.120),
+              (17, 2.110), (18, 2.101), (19, 2.093), (20, 2.086), (21, 2.080), (22, 2.074), (23, 2.069), (24, 2.064),
+              (25, 2.060), (26, 2.056), (27, 2.052), (28, 2.048), (29, 2.045), (30, 2.042), (40, 2.021), (60, 2.000),
+              (120, 1.980))
+Z_95 = 1.960
+
+# the table as quantiles by increasing 1 / df, from the normal quantile at 1 / df = 0
+_T_INVERSE_DF = np.array([0.0] + [1.0 / df for df, _ in reversed(T_TABLE_95)])
+_T_QUANTILES = np.array([Z_95] + [quantile for _, quantile in reversed(T_TABLE_95)])
+
+
+def percentiles(values, q=PERCENTILES):
+    """returns the percentiles of the values, interpolated linearly like numpy.percentile, nan if there are none
+
+    :param values ndarray: the values
+    :param q tuple: the percentiles to compute, from 0 to 100 (def: PERCENTILES)
+    :rtype ndarray: one value per percentile
+    """
+    if not len(values):
+        return np.full(len(q), np.nan)
+    return np.percentile(values, q)
+
+
+def t_quantile(df):
+    """returns the two sided 95% quantile of Student's t distribution with the given degrees of freedom
+
+    Degrees of freedom between those of T_TABLE_95 are interpolated linearly in 1 / df, the usual way of reading t
+    tables, which is within 0.001 of the exact quantile everywhere.
+    """
+    if df < 1:
+        raise ValueError("Expected at least 1 degree of freedom, not {}".format(df))
+    return float(np.interp(1.0 / df, _T_INVERSE_DF, _T_QUANTILES))
+
+
+def confidence_interval(values):
+    """returns the mean of the values and the half width of its 95% confidence interval, from Student's t
+
+    The half width is nan for fewer than two values.
+
+    :param values ndarray: independent samples, such as the results of replications
+    :rtype tuple: the mean and the half width
+    """
+    values = np.asarray(values, dtype=np.float64)
+    if len(values) < 2:
+        return float(values.mean()) if len(values) else np.nan, np.nan
+    return float(values.mean()), t_quantile(len(values) - 1) * float(values.std(ddof=1)) / np.sqrt(len(values))
+
+
+def grouped_percentiles(groups, values, q=PERCENTILES):
+    """returns the percentiles of the values of each group, without looping over the groups
+
+    The values are sorted once by group then value, and the percentiles of every group are interpolated from the
+    positions of its first and last value, like numpy.percentile does for a single group.
+
+    :param groups ndarray: the integer group of each value
+    :param values ndarray: the values
+    :param q tuple: the percentiles to compute, from 0 to 100 (def: PERCENTILES)
+    :rtype tuple: the groups that have values, in increasing order, the number of values of each and an array of
+    the percentiles of each, one row per percentile
+    """
+    order = np.lexsort((values, groups))
+    groups, values = groups[order], values[order]
+    keys, starts, counts = np.unique(groups, return_index=True, return_counts=True)
+    result = np.empty((len(q), len(keys)))
+    for i, percentile in enumerate(q):
+        position = starts + (counts - 1) * (percentile / 100.0)
+        below = np.floor(position).astype(np.int64)
+        above = np.minimum(below + 1, starts + counts - 1)
+        fraction = position - below
+        result[i] = values[below] + (values[above] - values[below]) * fraction
+    return keys, counts, result
+
+
+def histogram_percentiles(counts, bin_width, q=PERCENTILES):
+    """returns percentiles read off histograms, nan for empty ones
+
+    A percentile is the lower edge of the bin holding the value of that rank, exact for values that are whole
+    multiples of the bin width.
+
+    :param counts ndarray: the histograms, one per row, the last bin of a row holding every larger value
+    :param bin_width float: the width of the bins
+    :param q tuple: the percentiles to compute, from 0 to 100 (def: PERCENTILES)
+    :rtype ndarray: one row per percentile, one column per histogram
+    """
+    counts = np.atleast_2d(counts)
+    cumulative = np.cumsum(counts, axis=1)
+    totals = cumulative[:, -1]
+    result = np.empty((len(q), len(counts)))
+    for i, percentile in enumerate(q):
+        rank = np.maximum(np.ceil(totals * (percentile / 100.0)), 1)
+        result[i] = np.argmax(cumulative >= rank[:, np.newaxis], axis=1) * bin_width
+    result[:, totals == 0] = np.nan
+    return result
+
+
+class TripHistograms(object):
+    """Histograms of the wait and travel times of trips, overall, by distance and by time of day.
+
+    Trips are added a chunk of columns at a time and only the histograms are kept, so any number of trips is
+    summarized in the same memory: the bins of the histograms, times the number of distances and time of day buckets.
+    """
+
+    def __init__(self, bin_secs=5, max_secs=6*3600, bucket_secs=900):
+        """
+        :param bin_secs float: the width of the histogram bins in seconds (def: 5)
+        :param max_secs float: the times from which trips are counted in the last bin (def: 6 hours)
+        :param bucket_secs float: the length of the time of day buckets, by the time the elevator was called (def: 15
+        minutes)
+        """
+        self.bin_secs = bin_secs
+        self.bucket_secs = bucket_secs
+        self.bins = int(np.ceil(max_secs / bin_secs)) + 1
+        self.buckets = int(np.ceil(24 * 3600 / bucket_secs))
+        self.trips = 0
+        self.wait_by_distance = np.zeros((1, self.bins), dtype=np.int64)
+        self.travel_by_distance = np.zeros((1, self.bins), dtype=np.int64)
+        self.wait_by_time = np.zeros((self.buckets, self.bins), dtype=np.int64)
+        self.travel_by_time = np.zeros((self.buckets, self.bins), dtype=np.int64)
+
+    def add(self, columns):
+        """counts a chunk of trips
+
+        :param columns dict: arrays of elevator_called_secs, elevator_arrived_secs, travel_secs and distance, as in
+        a chunk of a trip file
+        """
+        called = np.asarray(columns["elevator_called_secs"], dtype=np.float64)
+        wait = self.__bin(np.asarray(columns["elevator_arrived_secs"], dtype=np.float64) - called)
+        travel = self.__bin(np.asarray(columns["travel_secs"], dtype=np.float64))
+        distance = np.asarray(columns["distance"], dtype=np.int64)
+        bucket = ((called % (24 * 3600)) // self.bucket_secs).astype(np.int64)
+
+        if len(distance) and distance.max() >= len(self.wait_by_distance):
+            rows = distance.max() + 1
+            self.wait_by_distance = self.__grow(self.wait_by_distance, rows)
+            self.travel_by_distance = self.__grow(self.travel_by_distance, rows)
+        self.wait_by_distance += self.__count(distance, wait, len(self.wait_by_distance))
+        self.travel_by_distance += self.__count(distance, travel, len(self.travel_by_distance))
+        self.wait_by_time += self.__count(bucket, wait, self.buckets)
+        self.travel_by_time += self.__count(bucket, travel, self.buckets)
+        self.trips += len(called)
+
+    def __bin(self, secs):
+        return np.clip(secs // self.bin_secs, 0, self.bins - 1).astype(np.int64)
+
+    def __count(self, rows, bins, num_rows):
+        return np.bincount(rows * self.bins + bins, minlength=num_rows * self.bins).reshape(num_rows, self.bins)
+
+    def __grow(self, counts, rows):
+        grown = np.zeros((rows, self.bins), dtype=np.int64)
+        grown[:len(counts)] = counts
+        return grown
+
+    @property
+    def wait(self):
+        """the histogram of the wait times of every trip"""
+        return self.wait_by_time.sum(axis=0)
+
+    @property
+    def travel(self):
+        """the histogram of the travel times of every trip"""
+        return self.travel_by_time.sum(axis=0)
+
+    @property
+    def bin_edges(self):
+        """the lower edge of each bin in seconds"""
+        return np.arange(self.bins) * self.bin_secs
+
+    @property
+    def bucket_edges(self):
+        """the start of each time of day bucket in seconds since midnight"""
+        return np.arange(self.buckets) * self.bucket_secs
+
+    def percentiles(self, histograms, q=PERCENTILES):
+        """returns the percentiles of the histograms, see histogram_percentiles"""
+        return histogram_percentiles(histograms, self.bin_secs, q)
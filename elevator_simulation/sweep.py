@@ -0,0 +1,111 @@
+#!/usr/bin/env python
+# encoding: utf-8
+
+import copy
+import itertools
+import json
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from elevator_simulation.data import ElevatorTrip
+from elevator_simulation.data import to_csv, to_csv_header
+from elevator_simulation.readers import binary
+from elevator_simulation.readers.json import build_simulation
+
+
+Configuration = namedtuple("Configuration", "scenario elevators_per_bank elevator_capacity call_strategy seed dispatch_strategy")
+
+
+def sweep_configurations(scenarios, elevators_per_bank=(None, ), elevator_capacity=(None, ), call_strategy=(None, ), seed=(None, ),
+                         dispatch_strategy=(None, )):
+    """Expands the scenario files and parameter grid into every configuration to run.
+
+    A value of None for a parameter leaves the setting from the scenario file untouched.
+
+    :param scenarios list: paths of the json simulation files
+    :param elevators_per_bank list: numbers of elevators to place in every elevator bank
+    :param elevator_capacity list: capacities to give every elevator
+    :param call_strategy list: names of the call strategy every person uses
+    :param seed list: seeds of the random streams of the people, see agents.Simulation
+    :param dispatch_strategy list: names of the dispatch strategy every elevator bank uses
+    :rtype list: the configurations, one per point of the grid
+    """
+    grid = itertools.product(scenarios, elevators_per_bank, elevator_capacity, call_strategy, seed, dispatch_strategy)
+    return [Configuration(*point) for point in grid]
+
+
+def apply_configuration(data, configuration):
+    """returns a copy of the decoded simulation file with the configuration's settings applied"""
+    data = copy.deepcopy(data)
+
+    for elevator_bank in data["elevator_banks"]:
+        if configuration.dispatch_strategy is not None:
+            elevator_bank["strategy"] = configuration.dispatch_strategy
+
+        elevators = elevator_bank["elevators"]
+        if configuration.elevators_per_bank is not None:
+            template = {k: v for k, v in elevators[-1].items() if k != "uuid"} if elevators else {}
+            del elevators[configuration.elevators_per_bank:]
+            while len(elevators) < configuration.elevators_per_bank:
+                elevators.append(dict(template))
+
+        if configuration.elevator_capacity is not None:
+            for elevator in elevators:
+                elevator["capacity"] = configuration.elevator_capacity
+
+    if configuration.call_strategy is not None:
+        for person in data.get("people", []):
+            person["elevator_call_strategy"] = configuration.call_strategy
+
+    return data
+
+
+def run_configuration(configuration, fast_forward=False, engine="simpy"):
+    """Runs the simulation for a single configuration (executed in the worker processes).
+
+    Binary scenarios are memory mapped rather than decoded, which makes them the cheaper choice when the same large
+    scenario runs under many settings.
+
+    :param configuration Configuration: the configuration to simulate
+    :param fast_forward bool: run the simulation in fast forward mode, see agents.Simulation (def: False)
+    :param engine str: the engine running the simulation, see readers.json.ENGINES (def: simpy)
+    :rtype tuple: the configuration and the list of elevator trips completed during the run
+    """
+    trips = []
+    if binary.is_binary_simulation(configuration.scenario):
+        scenario = binary.BinaryScenario(configuration.scenario)
+        settings = apply_configuration({"building": scenario.building, "elevator_banks": scenario.elevator_banks}, configuration)
+        scenario.elevator_banks = settings["elevator_banks"]
+        simulation = binary.build_simulation(scenario, trip_complete=trips.append, call_strategy=configuration.call_strategy,
+                                           seed=configuration.seed, engine=engine)
+    else:
+        with open(configuration.scenario, "r", encoding="utf-8") as f:
+            data = apply_configuration(json.load(f), configuration)
+        simulation = build_simulation(data, trip_complete=trips.append, seed=configuration.seed, engine=engine)
+    simulation.fast_forward = fast_forward
+    simulation.run()
+    return configuration, trips
+
+
+def run_sweep(configurations, max_workers=None, fast_forward=False, engine="simpy"):
+    """Fans the configurations out over a pool of worker processes.
+
+    :param configurations list: the configurations to simulate
+    :param max_workers int: the number of worker processes (def: number of processors)
+    :param fast_forward bool: run the simulations in fast forward mode (def: False)
+    :param engine str: the engine running the simulations (def: simpy)
+    :rtype generator: yields (configuration, trips) in the order the configurations were given
+    """
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        for result in executor.map(partial(run_configuration, fast_forward=fast_forward, engine=engine), configurations):
+            yield result
+
+
+def to_tagged_csv_header():
+    """returns the csv header of a merged sweep result set"""
+    return ",".join(Configuration._fields) + "," + to_csv_header(ElevatorTrip)
+
+
+def to_tagged_csv(configuration, trip):
+    """returns the trip as a comma separated value string tagged with its configuration"""
+    return ",".join([str(value) for value in configuration]) + "," + to_csv(trip)
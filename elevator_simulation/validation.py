@@ -0,0 +1,102 @@
+#!/usr/bin/env python
+# encoding: utf-8
+
+import functools
+import itertools
+import os
+
+
+STRICT = "strict"  # every call is validated
+SAMPLED = "sampled"  # one call in every interval is validated
+OFF = "off"  # nothing is validated
+MODES = (STRICT, SAMPLED, OFF)
+
+ENVIRONMENT_VARIABLE = "ELEVATOR_SIMULATION_VALIDATION"
+
+_mode = STRICT
+_interval = 100
+
+
+def set_validation(mode, interval=None):
+    """sets how the arguments of validated functions and setters are checked
+
+    Functions decorated while the mode is off are left unchecked for good, so set the mode through the
+    ELEVATOR_SIMULATION_VALIDATION environment variable, read when the package is imported, for runs that should pay
+    nothing for validation. Later changes still turn the checks of the other functions on, down or off.
+
+    :param mode str: strict, sampled or off
+    :param interval int: number of calls per validated call in sampled mode (def: None, unchanged, initially 100)
+    """
+    global _mode, _interval
+    if mode not in MODES:
+        raise ValueError("Unknown validation mode '{}', expected one of: {}".format(mode, MODES))
+    if interval is not None:
+        if interval < 1:
+            raise ValueError("The validation interval must be at least 1, not {}".format(interval))
+        _interval = interval
+    _mode = mode
+
+
+def get_validation():
+    """returns the current validation mode"""
+    return _mode
+
+
+def _checking(calls):
+    """returns True if the next call counted by calls is validated in the current mode"""
+    if _mode == STRICT:
+        return True
+    return _mode == SAMPLED and next(calls) % _interval == 0
+
+
+def validated(check):
+    """decorator calling check with the arguments of the decorated function before it, as the mode says
+
+    The check raises if the arguments are invalid. When the mode is off the function is returned as is.
+
+    :param check func: called with the arguments of every validated call
+    """
+    def decorate(f):
+        if _mode == OFF:
+            return f
+        calls = itertools.count()
+
+        @functools.wraps(f)
+        def checked(*args, **kwargs):
+            if _checking(calls):
+                check(*args, **kwargs)
+            return f(*args, **kwargs)
+        return checked
+    return decorate
+
+
+def typecheck(f):
+    """decorator asserting the types of the arguments and return value that are annotated with a type, as the mode
+    says. When the mode is off the function is returned as is."""
+    if _mode == OFF:
+        return f
+    code = f.__code__
+    annotations = {name: argtype for name, argtype in f.__annotations__.items() if isinstance(argtype, type)}
+    arguments = [(i, name, annotations[name]) for i, name in enumerate(code.co_varnames[:code.co_argcount + code.co_kwonlyargcount])
+                 if name in annotations]
+    returntype = annotations.get("return")
+    calls = itertools.count()
+
+    @functools.wraps(f)
+    def decorated(*args, **kws):
+        if not _checking(calls):
+            return f(*args, **kws)
+        for i, name, argtype in arguments:
+            # First len(args) are positional, after that keywords
+            if i < len(args):
+                assert isinstance(args[i], argtype)
+            elif name in kws:
+                assert isinstance(kws[name], argtype)
+        result = f(*args, **kws)
+        if returntype is not None:
+            assert isinstance(result, returntype)
+        return result
+    return decorated
+
+
+set_validation(os.environ.get(ENVIRONMENT_VARIABLE, STRICT))
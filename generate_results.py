@@ -1,23 +1,33 @@
 #!/usr/bin/env python
 # encoding: utf-8
 
-from ggplot import *
+from elevator_simulation.readers.trips import read_trip_chunks
+from elevator_simulation.sinks import TRIP_FILE_MAGIC
+from elevator_simulation.stats import PERCENTILES, TripHistograms
 
-import pandas as pd
+import numpy as np
+import csv
+import itertools
 import logging
 import os
 
 script_directory = os.path.dirname(os.path.realpath(__file__))
 logger = logging.getLogger(__name__)
 
+COLUMNS = ["elevator_called_secs", "elevator_arrived_secs", "travel_secs", "distance"]
+
 
 def get_args():
     from argparse import ArgumentParser
     parser = ArgumentParser(description="generates results for a run of the simulation")
     parser.add_argument("-v", "--verbose", action="count", help="the logging verbosity (more gives more detail)")
-    parser.add_argument("-i", "--input_file", required=True, help="path to the simulation results csv file.")
+    parser.add_argument("-i", "--input_file", required=True, help="path to the simulation results, a csv or binary trip file.")
     parser.add_argument("--file_suffix", default="", help="file suffix to add before the extension and after each generated file.")
-    parser.add_argument("-d", "--output_dir", default=os.path.join(script_directory, "sim_results"), help="path to the output directory where plots should go (default: %(default)s)")
+    parser.add_argument("-d", "--output_dir", default=os.path.join(script_directory, "sim_results"), help="path to the output directory where the tables and plots should go (default: %(default)s)")
+    parser.add_argument("--chunk_size", type=int, default=1000000, help="number of csv rows read at a time (default: %(default)s)")
+    parser.add_argument("--bin_secs", type=float, default=5, help="width of the histogram bins in seconds (default: %(default)s)")
+    parser.add_argument("--max_secs", type=float, default=6*3600, help="wait and travel times counted in the last histogram bin (default: %(default)s)")
+    parser.add_argument("--bucket_secs", type=float, default=900, help="length of the time of day buckets in seconds (default: %(default)s)")
     args = parser.parse_args()
 
     if args.verbose == 1:
@@ -31,25 +41,106 @@ def get_args():
     return args
 
 
+def read_chunks(filename, chunk_size):
+    """yields the columns of the trips of a csv or binary trip file, a chunk at a time
+
+    :param filename str: path to the simulation results
+    :param chunk_size int: number of csv rows per chunk, binary trip files keep the chunks they were written in
+    """
+    with open(filename, "rb") as f:
+        is_trip_file = f.read(len(TRIP_FILE_MAGIC)) == TRIP_FILE_MAGIC
+
+    if is_trip_file:
+        for columns, descriptions in read_trip_chunks(filename):
+            yield columns
+        return
+
+    with open(filename, "r", encoding="utf-8", newline="") as f:
+        reader = csv.reader(f)
+        header = next(reader)
+        indices = [header.index(name) for name in COLUMNS]
+        while True:
+            rows = [[row[i] for i in indices] for row in itertools.islice(reader, chunk_size)]
+            if not rows:
+                return
+            values = np.array(rows, dtype=np.float64)
+            yield {name: values[:, i] for i, name in enumerate(COLUMNS)}
+
+
+def percentile_rows(histograms, counts, keys):
+    """returns the percentiles of the histograms that have trips, a (key, trips, percentile, secs) row per key and
+    percentile"""
+    totals = counts.sum(axis=1)
+    result = histograms.percentiles(counts)
+    return [(key.item(), total.item(), "p{}".format(q), secs.item())
+            for i, q in enumerate(PERCENTILES)
+            for key, total, secs in zip(keys[totals > 0], totals[totals > 0], result[i][totals > 0])]
+
+
+def save_table(header, rows, args, name):
+    fn = os.path.join(args.output_dir, "{}{}.csv".format(name, args.file_suffix))
+    logger.info("writing table {}".format(fn))
+    with open(fn, "w", encoding="utf-8", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(header)
+        writer.writerows(rows)
+
+
+def save_plots(histograms, args):
+    """plots the histograms of all trips and their percentiles by time of day and by distance, when matplotlib, from
+    requirements-plot.txt, is installed"""
+    try:
+        import matplotlib
+        matplotlib.use("Agg")
+        import matplotlib.pyplot as plt
+    except ImportError:
+        logger.warning("matplotlib is not installed, see requirements-plot.txt, only the tables were written")
+        return
+
+    distances = np.arange(len(histograms.travel_by_distance))
+    for name, by_distance, by_time, overall in (("travel", histograms.travel_by_distance, histograms.travel_by_time, histograms.travel),
+                                                ("wait", histograms.wait_by_distance, histograms.wait_by_time, histograms.wait)):
+        median = histograms.percentiles(overall, (50,))[0, 0]
+        plots = (("time_histogram", "All Elevator Trips (median = {} secs)".format(median), "{} time (seconds)".format(name), "trips"),
+                 ("time_by_time_of_day", "Elevator Trips by Time of Day", "seconds since midnight", "{} time (seconds)".format(name)),
+                 ("time_by_distance", "Elevator Trips by Distance", "distance (floors)", "{} time (seconds)".format(name)))
+        for plot, title, xlabel, ylabel in plots:
+            fig, ax = plt.subplots(figsize=(15, 10))
+            if plot == "time_histogram":
+                ax.step(histograms.bin_edges, overall, where="post")
+                ax.axvline(median, color="black")
+            else:
+                counts, keys = (by_time, histograms.bucket_edges) if plot == "time_by_time_of_day" else (by_distance, distances)
+                totals = counts.sum(axis=1)
+                for i, q in enumerate(histograms.percentiles(counts)):
+                    ax.plot(keys[totals > 0], q[totals > 0], label="p{}".format(PERCENTILES[i]))
+                ax.legend(title="percentile")
+            ax.set_title(title)
+            ax.set_xlabel(xlabel)
+            ax.set_ylabel(ylabel)
+            pn = os.path.join(args.output_dir, "{}_{}{}.png".format(name, plot, args.file_suffix))
+            logger.info("generating plot {}".format(pn))
+            fig.savefig(pn)
+            plt.close(fig)
+
+
 def main():
     args = get_args()
-    df = pd.read_csv(args.input_file)
-    travel_secs_series = df['travel_secs']
-    median = travel_secs_series.median()
-
-    # travel point plot
-    p = ggplot(df, aes(x='elevator_called_secs', y='travel_secs', color='distance')) + geom_point() + xlab('seconds since midnight') + ylab('travel time (seconds)') + ggtitle("All Elevator Trips (median = {} secs)".format(median))
-    p = p + geom_hline(yintercept=median, color='black')
-    pn = os.path.join(args.output_dir, "travel_time_point{}.png".format(args.file_suffix))
-    logger.info("generating plot {}".format(pn))
-    ggsave(p, pn, height=10, width=15)
-
-    # travel point plot by distance
-    p = ggplot(df, aes(x='elevator_called_secs', y='travel_secs', color='distance')) + geom_point() + xlab('seconds since midnight') + ylab('travel time (seconds)') + facet_wrap('distance') + ggtitle("All Elevator Trips")
-    pn = os.path.join(args.output_dir, "travel_time_point_by_distance{}.png".format(args.file_suffix))
-    logger.info("generating plot {}".format(pn))
-    ggsave(p, pn, height=10, width=15)
+    histograms = TripHistograms(bin_secs=args.bin_secs, max_secs=args.max_secs, bucket_secs=args.bucket_secs)
+    for columns in read_chunks(args.input_file, args.chunk_size):
+        histograms.add(columns)
+        logger.debug("read {} trips".format(histograms.trips))
+    logger.info("aggregated {} trips".format(histograms.trips))
 
+    distances = np.arange(len(histograms.travel_by_distance))
+    for name, by_distance, by_time, overall in (("travel", histograms.travel_by_distance, histograms.travel_by_time, histograms.travel),
+                                                ("wait", histograms.wait_by_distance, histograms.wait_by_time, histograms.wait)):
+        save_table(["secs", "trips"], zip(histograms.bin_edges.tolist(), overall.tolist()), args, "{}_time_histogram".format(name))
+        save_table(["elevator_called_secs", "trips", "percentile", "secs"],
+                   percentile_rows(histograms, by_time, histograms.bucket_edges), args, "{}_time_by_time_of_day".format(name))
+        save_table(["distance", "trips", "percentile", "secs"],
+                   percentile_rows(histograms, by_distance, distances), args, "{}_time_by_distance".format(name))
+    save_plots(histograms, args)
 
 
 if __name__ == '__main__':
@@ -2,12 +2,16 @@
 # encoding: utf-8
 
 import logging
+import numpy as np
 import random
 import sys
+import uuid
 
 from datetime import datetime, timedelta
 from elevator_simulation.agents import Simulation, ElevatorBank, Person
+from elevator_simulation.generators import binary
 from elevator_simulation.generators.json import write_simulation
+from elevator_simulation.generators.population import break_window, takes_break, generate_population, generate_elevator_banks, write_json, write_binary
 
 
 logger = logging.getLogger(__name__)
@@ -32,6 +36,9 @@ def get_args():
     parser.add_argument("--breaks_per_day", default=3, type=int, help="number of breaks for all people during the day (default: %(default)s)")
     parser.add_argument("--break_length_mins", default=15, type=int, help="the length of time taken for breaks for all people in minutes (default: %(default)s)")
     parser.add_argument("--call_strategy", default="call_strategy_random", choices=["call_strategy_random", "call_strategy_all"], help="the call strategy to be employed by the individuals in the simulation (default: %(default)s)")
+    parser.add_argument("--seed", type=int, default=None, help="the seed of the random number generator, the same seed generates the same simulation (default: unseeded)")
+    parser.add_argument("--backend", default="arrays", choices=["arrays", "agents"], help="draw every schedule at once with NumPy and write them from arrays, or build the simulation agents person by person (default: %(default)s)")
+    parser.add_argument("--format", default="json", choices=["json", "binary"], help="the format of the simulation file written to stdout (default: %(default)s)")
     args = parser.parse_args()
 
     if args.verbose == 1:
@@ -45,7 +52,7 @@ def get_args():
     return args
 
 
-def get_random_timedelta_in_interval(start_str, end_str):
+def get_random_timedelta_in_interval(start_str, end_str, rng=random):
     st = datetime.strptime(start_str, "%H:%M:%S")
     et = datetime.strptime(end_str, "%H:%M:%S")
     day = datetime(1900, 1, 1)
@@ -54,48 +61,132 @@ def get_random_timedelta_in_interval(start_str, end_str):
     etd = et - day
 
     secs = int((etd-std).total_seconds())
-    return std + timedelta(seconds=random.randint(0, secs))
-
-
-def main():
-    args = get_args()
-    simulation = Simulation(number_of_floors=args.floors)
+    return std + timedelta(seconds=rng.randint(0, secs))
+
+
+def get_random_uuid(rng=random):
+    return uuid.UUID(int=rng.getrandbits(128), version=4).hex
+
+
+def generate_simulation(people, lunch_on_floor, **kwargs):
+    """Generates a simulation of people working in an office building for a day.
+
+    :param people int: the number of people in the building
+    :param lunch_on_floor list: the floors where people eat lunch
+    :param floors int: the number of floors in the building (def: 9)
+    :param num_elevator_banks int: the number of elevator banks in the building (def: 1)
+    :param num_elevators_per_bank int: the number of elevators in each bank (def: 6)
+    :param elevator_capacity int: the number of people which fit in a single elevator at once (def: 10)
+    :param work_begin str: the earliest time work starts, as H:M:S (def: 6:00:00)
+    :param work_end str: the latest time work starts, as H:M:S (def: 10:00:00)
+    :param work_length_mins int: the time each person spends at the office in minutes (def: 540)
+    :param lunch_begin str: the earliest time lunch starts, as H:M:S (def: 12:00:00)
+    :param lunch_end str: the latest time lunch starts, as H:M:S (def: 13:00:00)
+    :param lunch_length_mins int: the time taken for lunch in minutes (def: 45)
+    :param breaks_per_day int: the number of breaks each person takes on the lunch floor, see
+    generators.population.generate_population (def: 0)
+    :param break_length_mins int: the time taken for a break in minutes (def: 15)
+    :param call_strategy str: the call strategy employed by every person (def: call_strategy_random)
+    :param seed int: the seed of the random number generator, the same seed generates the same simulation
+    (def: None, unseeded)
+    :rtype Simulation: the generated simulation
+    """
+    floors = kwargs.get("floors", 9)
+    work_begin = kwargs.get("work_begin", "6:00:00")
+    work_end = kwargs.get("work_end", "10:00:00")
+    work_length_mins = kwargs.get("work_length_mins", 60*9)
+    lunch_begin = kwargs.get("lunch_begin", "12:00:00")
+    lunch_end = kwargs.get("lunch_end", "13:00:00")
+    lunch_length_mins = kwargs.get("lunch_length_mins", 45)
+    breaks_per_day = kwargs.get("breaks_per_day", 0)
+    break_length_mins = kwargs.get("break_length_mins", 15)
+    call_strategy = kwargs.get("call_strategy", "call_strategy_random")
+    rng = random.Random(kwargs.get("seed"))
+
+    simulation = Simulation(number_of_floors=floors)
 
     # generator elevators
-    for i in range(args.num_elevator_banks):
-        eb = ElevatorBank(simulation)
+    for i in range(kwargs.get("num_elevator_banks", 1)):
+        eb = ElevatorBank(simulation, uuid=get_random_uuid(rng))
         simulation.elevator_banks.append(eb)
-        for j in range(args.num_elevators_per_bank):
-            eb.add_elevator(capacity=args.elevator_capacity)
+        for j in range(kwargs.get("num_elevators_per_bank", 6)):
+            eb.add_elevator(capacity=kwargs.get("elevator_capacity", 10), uuid=get_random_uuid(rng))
 
     # generate people
-    for i in range(args.people):
-        p = Person(simulation, call_strategy=args.call_strategy)
+    for i in range(people):
+        p = Person(simulation, elevator_call_strategy=call_strategy, uuid=get_random_uuid(rng))
         simulation.people.append(p)
 
         # setup schedule for the following events:
 
         # start work
-        td = get_random_timedelta_in_interval(args.work_begin, args.work_end)
-        work_level = random.randint(1, args.floors-1)
-        p.schedule.add_event(td, simulation.building.floors[work_level], "starting the work day")
+        arrival = get_random_timedelta_in_interval(work_begin, work_end, rng)
+        work_level = rng.randint(1, floors-1)
+        p.schedule.add_event(arrival, simulation.building.floors[work_level], "starting the work day")
         # end work
-        td += timedelta(minutes=args.work_length_mins)
-        p.schedule.add_event(td, simulation.building.floors[0], "ending the work day")
+        p.schedule.add_event(arrival + timedelta(minutes=work_length_mins), simulation.building.floors[0], "ending the work day")
 
         # lunch time
-        td = get_random_timedelta_in_interval(args.lunch_begin, args.lunch_end)
-        lunch_level = sorted(args.lunch_on_floor, key=lambda l: abs(work_level-l))[0]
+        td = get_random_timedelta_in_interval(lunch_begin, lunch_end, rng)
+        lunch_level = sorted(lunch_on_floor, key=lambda l: abs(work_level-l))[0]
         p.schedule.add_event(td, simulation.building.floors[lunch_level-1], "going to lunch")
 
         # lunch end
-        td += timedelta(minutes=args.lunch_length_mins)
-        p.schedule.add_event(td, simulation.building.floors[work_level], "back to work after lunch")
+        p.schedule.add_event(td + timedelta(minutes=lunch_length_mins), simulation.building.floors[work_level], "back to work after lunch")
+
         # each break generated
-        # determine when the person should come to work
-        # determine when t
+        for b in range(breaks_per_day):
+            begin, end = break_window(int(arrival.total_seconds()), work_length_mins * 60, breaks_per_day, b)
+            start = rng.randint(begin, end)
+            if takes_break(start, break_length_mins * 60, td.total_seconds(), lunch_length_mins * 60, (arrival + timedelta(minutes=work_length_mins)).total_seconds()):
+                p.schedule.add_event(timedelta(seconds=start), simulation.building.floors[lunch_level-1], "taking a break")
+                p.schedule.add_event(timedelta(seconds=start + break_length_mins * 60), simulation.building.floors[work_level], "back to work after a break")
+
+    return simulation
+
+
+def generate_scenario(args, fh):
+    """draws the schedules of every person at once and writes the scenario straight from arrays, see
+    generators.population"""
+    rng = np.random.default_rng(args.seed)
+    kwargs = {name: getattr(args, name) for name in ("floors", "work_begin", "work_end", "work_length_mins", "lunch_begin",
+                                                     "lunch_end", "lunch_length_mins", "breaks_per_day",
+                                                     "break_length_mins", "call_strategy")}
+    elevator_banks = generate_elevator_banks(rng, num_elevator_banks=args.num_elevator_banks,
+                                             num_elevators_per_bank=args.num_elevators_per_bank,
+                                             elevator_capacity=args.elevator_capacity)
+    population = generate_population(args.people, args.lunch_on_floor, rng, **kwargs)
+    if args.format == "binary":
+        write_binary(population, {"floors": args.floors}, elevator_banks, fh.buffer)
+    else:
+        write_json(population, {"floors": args.floors}, elevator_banks, fh)
+
 
-    write_simulation(simulation, sys.stdout)
+def main():
+    args = get_args()
+    if args.backend == "arrays":
+        generate_scenario(args, sys.stdout)
+        return
+
+    simulation = generate_simulation(args.people, args.lunch_on_floor,
+                                     floors=args.floors,
+                                     num_elevator_banks=args.num_elevator_banks,
+                                     num_elevators_per_bank=args.num_elevators_per_bank,
+                                     elevator_capacity=args.elevator_capacity,
+                                     work_begin=args.work_begin,
+                                     work_end=args.work_end,
+                                     work_length_mins=args.work_length_mins,
+                                     lunch_begin=args.lunch_begin,
+                                     lunch_end=args.lunch_end,
+                                     lunch_length_mins=args.lunch_length_mins,
+                                     breaks_per_day=args.breaks_per_day,
+                                     break_length_mins=args.break_length_mins,
+                                     call_strategy=args.call_strategy,
+                                     seed=args.seed)
+    if args.format == "binary":
+        binary.write_simulation(simulation, sys.stdout.buffer)
+    else:
+        write_simulation(simulation, sys.stdout)
 
 
 if __name__ == '__main__':
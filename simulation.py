@@ -2,10 +2,24 @@
 # encoding: utf-8
 
 
+import contextlib
 import logging
+import os
+import sys
 from elevator_simulation.agents import Simulation
+from elevator_simulation.agents import trace
+from elevator_simulation.agents.person import CALL_STRATEGIES
+from elevator_simulation import campus
+from elevator_simulation import replication
+from elevator_simulation.checkpoint import fork_variants, save_snapshot, load_snapshot, restore
+from elevator_simulation.generators.population import parse_time
 from elevator_simulation.data import to_csv_header, ElevatorTrip
-from elevator_simulation.readers.json import read_simulation
+from elevator_simulation.models.dispatch import DISPATCH_STRATEGIES
+from elevator_simulation.readers.json import ENGINES, read_simulation
+from elevator_simulation.readers.binary import is_binary_simulation, read_simulation as read_binary_simulation
+from elevator_simulation.readers.trips import read_trip_chunks
+from elevator_simulation.sinks import CsvTripSink, NpyTripSink, ChunkedTripSink, TripStore
+from elevator_simulation.sweep import sweep_configurations, run_sweep, to_tagged_csv_header, to_tagged_csv
 
 logger = logging.getLogger(__name__)
 
@@ -14,9 +28,57 @@ def get_args():
     from argparse import ArgumentParser
     parser = ArgumentParser(description="elevator simulation")
     parser.add_argument("-v", "--verbose", default=0, action="count", help="the logging verbosity (more gives more detail)")
-    parser.add_argument("-i", "--input_file", type=str, help="the input simulation file")
+    parser.add_argument("-i", "--input_file", type=str, nargs="+", help="the input json or binary simulation file(s), more than one runs a sweep")
+    parser.add_argument("--elevators_per_bank", type=int, nargs="+", help="sweep over the number of elevators in each bank")
+    parser.add_argument("--elevator_capacity", type=int, nargs="+", help="sweep over the capacity of every elevator")
+    parser.add_argument("--call_strategy", nargs="+", choices=sorted(CALL_STRATEGIES), help="sweep over the call strategy employed by every person")
+    parser.add_argument("--seed", type=int, nargs="+", help="sweep over the seed of the random number generator")
+    parser.add_argument("--dispatch_strategy", nargs="+", choices=sorted(DISPATCH_STRATEGIES), help="sweep over the dispatch strategy used by every elevator bank")
+    parser.add_argument("--lazy", action="store_true", help="create each person when their first event comes due instead of up front")
+    parser.add_argument("--fast_forward", action="store_true", help="let elevators and people skip ahead over stretches where nothing can happen")
+    parser.add_argument("--engine", default="simpy", choices=sorted(ENGINES), help="run the agents as simpy processes, or as state machines on a single event queue, which records the same trips faster (default: %(default)s)")
+    parser.add_argument("--compact", action="store_true", help="hold the people of a binary scenario in arrays, with an agent only while they travel, to fit very large populations in memory (requires --engine events)")
+    parser.add_argument("--sink", default="print", choices=["print", "csv", "npy", "trips", "summary"], help="how trips are written: printed one by one, or buffered to csv, a NumPy .npy array or a chunked binary trip file, or kept in memory and summarized (default: %(default)s)")
+    parser.add_argument("-o", "--output_file", type=str, help="the file trips are written to, required by the npy and trips sinks (default: stdout)")
+    parser.add_argument("--trace", nargs="+", choices=sorted(trace.CATEGORIES), help="the categories of what the agents do that are traced, logged with -v (default: all with -v, none otherwise)")
+    parser.add_argument("--trace_file", type=str, help="keep the most recent trace records and save them to this .npy file at the end of the run, even if it fails (default: all categories)")
+    parser.add_argument("--trace_records", type=int, default=1000000, help="the number of trace records kept for the trace file (default: %(default)s)")
+    parser.add_argument("--campus", action="store_true", help="the input file is a campus of buildings, each simulated in its own worker process")
+    parser.add_argument("--checkpoint", type=time_of_day, help="run up to this time of day, as H:M:S or seconds since midnight, then fork a run of each --fork_dispatch_strategy from there, or stop there and write the --snapshot_file")
+    parser.add_argument("--fork_dispatch_strategy", nargs="+", choices=sorted(DISPATCH_STRATEGIES), help="the dispatch strategies every elevator bank switches to at the checkpoint, one forked run each")
+    parser.add_argument("--snapshot_file", type=str, help="write the state of the model at the checkpoint to this json file, which a run with --engine events and every person created up front can --resume_from")
+    parser.add_argument("--resume_from", type=str, help="carry on from the state of the model in this json snapshot file, written at the checkpoint of a run of the same scenario with the same settings, instead of running the day from its start (requires --engine events)")
+    parser.add_argument("--replications", type=int, help="run this many seeded replications of each --call_strategy and --dispatch_strategy, starting from --seed, with common random numbers, and print confidence intervals of the wait times")
+    parser.add_argument("-j", "--jobs", type=int, default=None, help="number of worker processes used by a sweep, campus, checkpoint or replications (default: number of processors)")
     args = parser.parse_args()
 
+    if args.sink in ("npy", "trips") and not args.output_file:
+        parser.error("the {} sink requires an --output_file".format(args.sink))
+    if (args.trace or args.trace_file) and (is_sweep(args) or args.campus):
+        parser.error("tracing is only available for a single simulation run")
+    grid = (args.elevators_per_bank, args.elevator_capacity, args.call_strategy, args.dispatch_strategy)
+    if args.campus and (len(args.input_file) > 1 or len(args.seed or ()) > 1 or any(values is not None for values in grid)):
+        parser.error("a campus runs a single input file, with at most one seed and no other sweep")
+    if args.campus and args.sink in ("npy", "trips"):
+        parser.error("the trips of a campus are printed, written to csv or summarized")
+    if args.compact and (args.engine != "events" or is_sweep(args) or args.campus or args.replications is not None):
+        parser.error("--compact runs a single simulation with --engine events")
+    if args.checkpoint is None and (args.fork_dispatch_strategy or args.snapshot_file):
+        parser.error("--fork_dispatch_strategy and --snapshot_file require a --checkpoint")
+    if args.checkpoint is not None and not (args.fork_dispatch_strategy or args.snapshot_file):
+        parser.error("a --checkpoint forks a run of each --fork_dispatch_strategy or writes the --snapshot_file")
+    if args.replications is not None and (args.replications < 1 or len(args.input_file) > 1 or len(args.seed or ()) > 1 or args.campus or args.checkpoint is not None
+                                          or args.elevators_per_bank or args.elevator_capacity or args.trace or args.trace_file):
+        parser.error("replications run at least once a single input file, from at most one --seed, for each --call_strategy and --dispatch_strategy")
+    if args.checkpoint is not None and (args.campus or is_sweep(args)):
+        parser.error("a checkpoint stops a single simulation run")
+    if args.fork_dispatch_strategy and (args.trace or args.trace_file or args.sink in ("npy", "trips")):
+        parser.error("a checkpoint forks a single simulation run, whose trips are printed, written to csv or summarized")
+    if args.resume_from and (args.engine != "events" or args.lazy or args.campus or is_sweep(args) or args.replications is not None):
+        parser.error("--resume_from carries on a single simulation run with --engine events, whose people are created up front")
+    if args.resume_from and args.sink == "npy":
+        parser.error("--resume_from adds the trips to those written before the snapshot, which the npy sink cannot, write csv or trips")
+
     if args.verbose >= 1:
         level = logging.DEBUG
     else:
@@ -27,6 +89,100 @@ def get_args():
     return args
 
 
+def time_of_day(value):
+    """returns the seconds since midnight of a time given as H:M:S or as seconds"""
+    return parse_time(value) if ":" in value else float(value)
+
+
+def is_sweep(args):
+    """returns True if the arguments ask for more than a single simulation run"""
+    grid = (args.elevators_per_bank, args.elevator_capacity, args.call_strategy, args.seed, args.dispatch_strategy)
+    return len(args.input_file) > 1 or any(values is not None for values in grid)
+
+
+def sweep(args):
+    """runs every configuration of the sweep in parallel and prints the merged, tagged trips"""
+    configurations = sweep_configurations(args.input_file,
+                                          elevators_per_bank=args.elevators_per_bank or (None, ),
+                                          elevator_capacity=args.elevator_capacity or (None, ),
+                                          call_strategy=args.call_strategy or (None, ),
+                                          seed=args.seed or (None, ),
+                                          dispatch_strategy=args.dispatch_strategy or (None, ))
+    logger.info("running a sweep of {} configurations".format(len(configurations)))
+    print(to_tagged_csv_header())
+    for configuration, trips in run_sweep(configurations, max_workers=args.jobs, fast_forward=args.fast_forward,
+                                          engine=args.engine):
+        for trip in trips:
+            print(to_tagged_csv(configuration, trip))
+
+
+def run_campus(args):
+    """runs every building of the campus in parallel, then writes their trips tagged with the building or prints
+    the summary of each building and of the whole campus"""
+    sites = campus.read_campus(args.input_file[0])
+    logger.info("running a campus of {} buildings".format(len(sites)))
+    results = campus.run_campus(sites, max_workers=args.jobs, fast_forward=args.fast_forward,
+                                seed=args.seed[0] if args.seed else None, engine=args.engine)
+    stores = write_results(args, "building", ((site.name, store) for site, store in results))
+    if args.sink == "summary":
+        print("campus")
+        print_summary(campus.merge_stores(stores))
+
+
+def run_replications(args):
+    """runs the replications of every combination of strategies in parallel and prints their confidence intervals"""
+    first_seed = args.seed[0] if args.seed else 0
+    replications = replication.replications(replication.read_scenario(args.input_file[0]),
+                                            range(first_seed, first_seed + args.replications),
+                                            call_strategy=args.call_strategy or (None, ),
+                                            dispatch_strategy=args.dispatch_strategy or (None, ))
+    logger.info("running {} replications".format(len(replications)))
+    results = replication.run_replications(replications, max_workers=args.jobs, fast_forward=args.fast_forward,
+                                           engine=args.engine)
+    rows = replication.compare(list(results))
+    print(",".join(rows[0]))
+    for row in rows:
+        print(",".join([str(value) for value in row.values()]))
+
+
+def run_variants(simulation, args, state=None):
+    """runs the simulation up to the checkpoint, then each dispatch strategy from there on in a forked process
+
+    :param state dict: the snapshot the run resumes from (def: None, run from the start of the day)
+    """
+    simulation.trip_sink = TripStore()
+    run_from(simulation, args, state)
+    logger.info("reached the checkpoint at {} secs with {} trips".format(simulation.env.now, len(simulation.trip_sink)))
+    results = fork_variants(simulation, args.fork_dispatch_strategy, max_workers=args.jobs)
+    write_results(args, "dispatch_strategy", results)
+
+
+def write_results(args, tag, results):
+    """writes the trips of each (name, store) result tagged with its name, or prints the summary of each
+
+    :rtype list: the stores of the results
+    """
+    stores = []
+    if args.sink == "summary":
+        for name, store in results:
+            print("{} {}".format(tag, name))
+            print_summary(store)
+            print()
+            stores.append(store)
+        return stores
+
+    fh = open(args.output_file, "w", encoding="utf-8") if args.output_file else sys.stdout
+    try:
+        fh.write(campus.to_tagged_csv_header(tag) + "\n")
+        for name, store in results:
+            fh.write(campus.to_tagged_csv(name, store))
+            stores.append(store)
+    finally:
+        if fh is not sys.stdout:
+            fh.close()
+    return stores
+
+
 def main():
     """Main simulation loop.
 
@@ -34,9 +190,129 @@ def main():
     """
     args = get_args()
 
-    simulation = read_simulation(args.input_file)
-    print(to_csv_header(ElevatorTrip))
-    simulation.run()
+    if args.campus:
+        run_campus(args)
+        return
+
+    if args.replications is not None:
+        run_replications(args)
+        return
+
+    if is_sweep(args):
+        sweep(args)
+        return
+
+    if is_binary_simulation(args.input_file[0]):
+        simulation = read_binary_simulation(args.input_file[0], lazy=args.lazy, engine=args.engine, compact=args.compact)
+    elif args.compact:
+        raise ValueError("Only binary scenarios can be run with compact people, convert '{}' first".format(args.input_file[0]))
+    else:
+        simulation = read_simulation(args.input_file[0], lazy=args.lazy, engine=args.engine)
+    simulation.fast_forward = args.fast_forward
+    if args.trace:
+        simulation.tracer.categories = sum(trace.CATEGORIES[category] for category in set(args.trace))
+    elif args.trace_file:
+        simulation.tracer.enable(trace.ALL)
+    if args.trace_file:
+        simulation.tracer.keep_records(args.trace_records)
+
+    state = None
+    if args.resume_from:
+        with open(args.resume_from, encoding="utf-8") as fh:
+            state = load_snapshot(fh)
+
+    if args.fork_dispatch_strategy:
+        run_variants(simulation, args, state)
+        return
+
+    try:
+        run(simulation, args, state)
+    finally:
+        if args.trace_file:
+            simulation.tracer.save(args.trace_file)
+
+
+def run_from(simulation, args, state):
+    """runs the simulation from the snapshot, if any, up to the checkpoint, where it writes the snapshot file, if any
+
+    Without a checkpoint the simulation runs until the end of the day.
+
+    :param state dict: the snapshot the simulation is restored from, see checkpoint.restore, None to start the day
+    """
+    if state is not None:
+        restore(simulation, state)
+        logger.info("resumed at {} secs after {} trips".format(state["time"], state["trips"]))
+    simulation.run(until=args.checkpoint)
+    if args.snapshot_file:
+        with open(args.snapshot_file, "w", encoding="utf-8") as fh:
+            save_snapshot(simulation, fh)
+
+
+def run(simulation, args, state=None):
+    """runs the simulation, writing the trips to the sink chosen by the arguments
+
+    When the run resumes from a snapshot, its trips carry on those written before the snapshot: the csv header is not
+    written again, and an output file gets the trips added to its end, once checked to hold the trips of the snapshot.
+
+    :param state dict: the snapshot the run resumes from (def: None, run from the start of the day)
+    """
+    resuming = state is not None
+    if args.sink == "print":
+        if not resuming:
+            print(to_csv_header(ElevatorTrip))
+        run_from(simulation, args, state)
+        return
+
+    if args.sink == "summary":
+        simulation.trip_sink = TripStore()
+        run_from(simulation, args, state)
+        print_summary(simulation.trip_sink)
+        return
+
+    if resuming and args.output_file:
+        written = written_trips(args.output_file, args.sink)
+        if written != state["trips"]:
+            raise ValueError("The resumed run adds its trips to the {} trips written before the snapshot, but '{}' holds "
+                             "{}".format(state["trips"], args.output_file, "no file" if written is None else written))
+
+    # the output file is closed once the sink has written its last trips into it
+    with contextlib.ExitStack() as stack:
+        if args.sink == "npy":
+            sink = NpyTripSink(args.output_file)
+        elif args.sink == "trips":
+            sink = ChunkedTripSink(stack.enter_context(open(args.output_file, "ab" if resuming else "wb")), magic=not resuming)
+        elif args.output_file:
+            sink = CsvTripSink(stack.enter_context(open(args.output_file, "a" if resuming else "w", encoding="utf-8")),
+                               header=not resuming)
+        else:
+            sink = CsvTripSink(sys.stdout, header=not resuming)
+        simulation.trip_sink = stack.enter_context(sink)
+        run_from(simulation, args, state)
+
+
+def written_trips(filename, sink):
+    """returns the number of trips in the output file of the sink, None if the file does not exist
+
+    :param sink str: csv or trips, the sink that wrote the file
+    """
+    if not os.path.exists(filename):
+        return None
+    if sink == "trips":
+        return sum(len(columns["person"]) for columns, _ in read_trip_chunks(filename))
+    with open(filename, "r", encoding="utf-8") as fh:
+        return sum(1 for _ in fh) - 1  # the header line
+
+
+def print_summary(store):
+    """prints the summary statistics of the trips, overall then by floor of departure and by hour of the call"""
+    summary = store.summary()
+    print(",".join(summary))
+    print(",".join([str(value) for value in summary.values()]))
+    for breakdown in (store.by_floor(), store.by_hour()):
+        print()
+        print(",".join(breakdown))
+        for row in zip(*[column.tolist() for column in breakdown.values()]):
+            print(",".join(map(str, row)))
 
 
 if __name__ == '__main__':
@@ -0,0 +1,4 @@
+import os
+
+# the tests check that invalid arguments are rejected, whatever mode production runs use
+os.environ["ELEVATOR_SIMULATION_VALIDATION"] = "strict"
@@ -3,8 +3,9 @@
 
 
 import unittest
+import simpy
 from elevator_simulation.agents import AgentMixin
-from elevator_simulation.agents import Simulation
+from elevator_simulation.agents import Simulation, Environment
 
 
 class TestAgentMixin(unittest.TestCase):
@@ -38,3 +39,82 @@ class TestAgentMixin(unittest.TestCase):
         self.agent.notify_event("event2")
         self.sim.env.run(until=2)
         self.assertTrue(invoked)
+
+    def test_channel(self):
+        """tests that a channel wakes its waiters and subscribers, and allocates nothing when no one listens"""
+        channel = self.agent.channel("event1")
+        channel.notify()
+        self.assertFalse(channel.waiting)
+        self.assertEqual(1, channel.notifications)
+        self.assertEqual(0, channel.deliveries)
+
+        order = []
+        def waiter():
+            value = yield channel.wait()
+            order.append(("waiter", value))
+
+        self.sim.env.process(waiter())
+        self.sim.env.run(until=1)
+        self.assertTrue(channel.waiting)
+        self.assertIs(channel.wait(), channel.wait())
+        channel.subscribe(lambda event: order.append(("subscriber", event.value)))
+        channel.notify("value")
+        self.assertFalse(channel.waiting)
+        self.sim.env.run(until=2)
+        self.assertEqual([("waiter", "value"), ("subscriber", "value")], order)
+
+        channel.notify("again")
+        self.sim.env.run(until=3)
+        self.assertEqual(("subscriber", "again"), order[-1])
+        self.assertEqual(3, channel.notifications)
+        self.assertEqual(2, channel.deliveries)
+
+        with self.assertRaises(ValueError):
+            self.agent.channel("fakename")
+
+
+class TestEnvironment(unittest.TestCase):
+    """Tests the order the environment has simpy process simultaneous events and chains of timeouts in."""
+
+    def setUp(self):
+        self.env = Environment()
+        self.order = []
+
+    def tearDown(self):
+        pass
+
+    def test_schedule(self):
+        """tests that events are processed by time, priority and the order they were scheduled in, each active in turn"""
+        def record(name):
+            return lambda event: self.order.append((name, self.env.active))
+
+        def process():
+            self.order.append(("process", self.env.active))
+            yield self.env.timeout(0)
+
+        self.env.timeout(5).callbacks.append(record("first"))
+        self.env.timeout(0).callbacks.append(record("now"))
+        self.env.timeout(5, value="value").callbacks.append(record("second"))
+        self.env.process(process())
+        self.env.run()
+        self.assertEqual([("process", (0, simpy.events.URGENT, 3)), ("now", (0, simpy.events.NORMAL, 1)),
+                          ("first", (5, simpy.events.NORMAL, 0)), ("second", (5, simpy.events.NORMAL, 2))], self.order)
+        # with the timeout of the process and its end
+        self.assertEqual(6, self.env.processed)
+
+    def test_chain_order(self):
+        """tests that the timeouts of a chain keep the place of the first one among simultaneous events"""
+        def record(name):
+            return lambda event: self.order.append(name)
+
+        event, chain = self.env.timeout_at(5)
+        event.callbacks.append(record("chain 1"))
+        self.env.timeout(5).callbacks.append(record("other"))
+        event, chain = self.env.timeout_at(5, chain)
+        event.callbacks.append(record("chain 2"))
+        eid, chain = self.env.reserve(chain)
+        self.env.call_at(5, eid, record("chain 3"))
+        self.env.run()
+        self.assertEqual(["chain 1", "chain 2", "chain 3", "other"], self.order)
+        with self.assertRaises(ValueError):
+            self.env.timeout_at(4)
@@ -0,0 +1,56 @@
+#!/usr/bin/env python
+# encoding: utf-8
+
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+from benchmarks import run
+from generate_simulation import generate_simulation
+from elevator_simulation.generators.json import simulation_to_data
+
+
+class TestBenchmarks(unittest.TestCase):
+    """Tests that the reference scenarios are deterministic and their runs are timed and compared."""
+
+    SCENARIOS = {"tiny": dict(people=20, lunch_on_floor=[3], floors=5, num_elevator_banks=2, num_elevators_per_bank=2, seed=7)}
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_generate_simulation(self):
+        """tests that the same seed generates the same simulation"""
+        data = simulation_to_data(generate_simulation(**self.SCENARIOS["tiny"]))
+        self.assertEqual(20, len(data["people"]))
+        self.assertEqual(2, len(data["elevator_banks"]))
+        self.assertEqual(data, simulation_to_data(generate_simulation(**self.SCENARIOS["tiny"])))
+        self.assertNotEqual(data, simulation_to_data(generate_simulation(**dict(self.SCENARIOS["tiny"], seed=8))))
+
+    def test_run_benchmark(self):
+        """tests that a scenario runs the same in every format and mode, and its phases are timed"""
+        with mock.patch.dict(run.SCENARIOS, self.SCENARIOS):
+            results = []
+            for fmt in ("json", "binary"):
+                filename = run.write_scenario("tiny", self.directory, fmt)
+                for fast_forward in (False, True):
+                    results.append(run.run_benchmark(filename, seed=1, fast_forward=fast_forward))
+        for result in results:
+            for phase in run.PHASES:
+                self.assertGreaterEqual(result[phase], 0)
+            self.assertTrue(result["trips"])
+            self.assertTrue(result["events"])
+            self.assertEqual(results[0]["checksum"], result["checksum"])
+
+    def test_compare(self):
+        """tests that slow phases are reported as regressions and changes in what was simulated as changes"""
+        baseline = {"load_secs": 1.0, "run_secs": 10.0, "output_secs": 0.01, "trips": 5, "events": 100, "checksum": "a"}
+        regressions, changes = run.compare(dict(baseline, run_secs=12.0, output_secs=0.03), baseline)
+        self.assertEqual([], regressions)
+        self.assertEqual([], changes)
+        regressions, changes = run.compare(dict(baseline, run_secs=13.0, events=90), baseline)
+        self.assertEqual(1, len(regressions))
+        self.assertTrue(regressions[0].startswith("run_secs"))
+        self.assertEqual(["events changed from 100 to 90"], changes)
@@ -0,0 +1,87 @@
+#!/usr/bin/env python
+# encoding: utf-8
+
+import json
+import os
+import tempfile
+import unittest
+from elevator_simulation.generators.binary import write_scenario, write_simulation
+from elevator_simulation.readers.binary import BinaryScenario, is_binary_simulation, read_simulation
+from elevator_simulation.readers.json import read_simulation as read_json_simulation
+
+
+
+def identities(simulation):
+    """returns the uuids of the people, elevator banks and elevators of the simulation, which identify them across
+    simulations"""
+    return ([person.uuid for person in simulation.people], [bank.uuid for bank in simulation.elevator_banks],
+            [elevator.uuid for bank in simulation.elevator_banks for elevator in bank.elevators])
+
+
+class TestBinaryScenario(unittest.TestCase):
+    """Tests that scenarios convert between json and the binary scenario format."""
+
+    def setUp(self):
+        test_data_path = os.path.join(os.path.dirname(__file__), "data")
+        self.simple_test_file = os.path.join(test_data_path, "simple.json")
+        with open(self.simple_test_file, "r", encoding="utf-8") as f:
+            self.data = json.load(f)
+        self.data["people"][0]["uuid"] = "8e42031ab549420ab9627a40a806bc22"
+        self.data["people"][0]["elevator_call_strategy"] = "call_strategy_all"
+        self.data["people"].append({"schedule": [{"start": 7.5, "level": 4, "description": "early"}]})
+        self.directory = tempfile.TemporaryDirectory()
+        self.binary_file = os.path.join(self.directory.name, "simple.sim")
+        with open(self.binary_file, "wb") as fh:
+            write_scenario(self.data, fh)
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_round_trip(self):
+        """tests that converting to binary and back gives the json data"""
+        self.assertTrue(is_binary_simulation(self.binary_file))
+        self.assertFalse(is_binary_simulation(self.simple_test_file))
+        del self.data["people"][0]["name"]  # only the uuid, call strategy and schedule are stored
+        self.assertEqual(self.data, BinaryScenario(self.binary_file).to_data())
+
+    def test_arrays(self):
+        """tests the columnar event arrays of the scenario"""
+        scenario = BinaryScenario(self.binary_file)
+        self.assertEqual(2, len(scenario))
+        self.assertEqual([0, 0, 0, 1], scenario.arrays["event_person"].tolist())
+        self.assertEqual([2, 3, 1, 4], scenario.arrays["event_level"].tolist())
+        self.assertEqual(([7.5], [4], ["early"]), scenario.events(1))
+        self.assertEqual({"uuid": "8e42031ab549420ab9627a40a806bc22", "elevator_call_strategy": "call_strategy_all"}, scenario.person(0))
+        self.assertEqual({}, scenario.person(1))
+
+    def test_read_simulation(self):
+        """tests that the simulation read from the binary file matches the json one"""
+        expected = read_json_simulation(self.simple_test_file)
+        sim = read_simulation(self.binary_file)
+        self.assertEqual(len(expected.building.floors), len(sim.building.floors))
+        self.assertEqual(len(expected.elevator_banks[0].elevators), len(sim.elevator_banks[0].elevators))
+        self.assertEqual(expected.people[0].schedule, sim.people[0].schedule)
+        self.assertEqual("call_strategy_all", sim.people[0].call_strategy.__name__)
+
+        with open(self.binary_file, "wb") as fh:
+            write_simulation(sim, fh)
+        self.assertEqual(identities(sim), identities(read_simulation(self.binary_file)))
+
+    def test_read_lazy(self):
+        """tests that people read lazily from the binary file are created once their first event comes due"""
+        json_file = os.path.join(self.directory.name, "simple.json")
+        with open(json_file, "w", encoding="utf-8") as f:
+            json.dump(self.data, f)
+        expected = []
+        read_json_simulation(json_file, lazy=True, trip_complete=expected.append).run()
+
+        trips = []
+        sim = read_simulation(self.binary_file, lazy=True, trip_complete=trips.append)
+        self.assertEqual([], sim.people)
+        self.assertEqual(2, len(sim.calendar))
+        sim.run(until=8)
+        self.assertEqual(1, len(sim.people))
+        sim.run()
+        self.assertEqual(2, len(sim.people))
+        self.assertEqual([(trip.start, trip.destination, trip.elevator_called_secs) for trip in expected],
+                         [(trip.start, trip.destination, trip.elevator_called_secs) for trip in trips])
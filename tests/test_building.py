@@ -2,7 +2,7 @@
 # encoding: utf-8
 
 import unittest
-from elevator_simulation.models.building import Building, Floor
+from elevator_simulation.models.building import Building, Floor, level_of
 
 
 class TestBuilding(unittest.TestCase):
@@ -24,3 +24,10 @@ class TestBuilding(unittest.TestCase):
         self.assertEqual(3, len(self.building.floors))
         for i in range(len(self.building.floors)):
             self.assertEqual(i+1, self.building.floors[i].level)
+
+    def test_level_of(self):
+        """tests that floors can be given either as Floor or as their level"""
+        self.building.add_floor()
+        self.building.add_floor()
+        self.assertEqual(2, level_of(self.building.floors[1]))
+        self.assertEqual(2, level_of(2))
@@ -0,0 +1,35 @@
+#!/usr/bin/env python
+# encoding: utf-8
+
+import unittest
+from elevator_simulation.calendar import Calendar
+from elevator_simulation.engine import EventQueue
+
+
+class TestCalendar(unittest.TestCase):
+    """Tests that calendar entries come due in the order their timeouts would have."""
+
+    def setUp(self):
+        self.env = EventQueue()
+        self.calendar = Calendar(self.env)
+        self.order = []
+
+    def tearDown(self):
+        pass
+
+    def test_order(self):
+        """tests that entries are interleaved with the timeouts of the queue as timeouts of their own would be"""
+        chain = self.calendar.add(5, self.order.append, value="entry 1")
+        self.env.timeout_at(5, self.order.append, value="timeout")
+        self.calendar.add(5, self.order.append, chain, "entry 2")
+        self.calendar.add(3, self.order.append, value="early entry")
+        self.calendar.add(7, self.order.append, value="late entry")
+        self.assertEqual(4, len(self.calendar))
+        self.assertEqual(3, self.calendar.peek())
+        self.assertEqual(3, len(self.env))  # the timeout, and the events of the earliest entries as they were added
+
+        self.env.run()
+        self.assertEqual(["early entry", "entry 1", "entry 2", "timeout", "late entry"], self.order)
+        self.assertEqual(0, len(self.calendar))
+        with self.assertRaises(ValueError):
+            self.calendar.add(6, self.order.append)
@@ -0,0 +1,56 @@
+#!/usr/bin/env python
+# encoding: utf-8
+
+import json
+import os
+import tempfile
+import unittest
+from elevator_simulation.campus import read_campus, run_campus, merge_stores, to_tagged_csv
+
+
+class TestCampus(unittest.TestCase):
+    """Tests that the buildings of a campus run in separate processes and their trips are merged."""
+
+    def setUp(self):
+        test_data_path = os.path.join(os.path.dirname(__file__), "data")
+        self.simple_test_file = os.path.join(test_data_path, "simple.json")
+        with open(self.simple_test_file, "r", encoding="utf-8") as f:
+            self.data = json.load(f)
+        self.directory = tempfile.TemporaryDirectory()
+        self.campus_file = os.path.join(self.directory.name, "campus.json")
+        with open(self.campus_file, "w", encoding="utf-8") as f:
+            json.dump({"buildings": [{"name": "north", "scenario": self.simple_test_file}, self.data]}, f)
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_read_campus(self):
+        """tests that buildings are read by path or inline and named"""
+        sites = read_campus(self.campus_file)
+        self.assertEqual(["north", "building1"], [site.name for site in sites])
+        self.assertEqual(self.simple_test_file, sites[0].scenario)
+        self.assertEqual(self.data, sites[1].scenario)
+
+        with open(self.campus_file, "w", encoding="utf-8") as f:
+            json.dump({"buildings": [dict(self.data, name="a"), dict(self.data, name="a")]}, f)
+        with self.assertRaises(ValueError):
+            read_campus(self.campus_file)
+
+    def test_run_campus(self):
+        """tests that each building is simulated and the trips of the campus keep their people apart"""
+        results = list(run_campus(read_campus(self.campus_file), max_workers=2))
+        self.assertEqual(["north", "building1"], [site.name for site, store in results])
+        for site, store in results:
+            self.assertEqual(3, len(store))
+            self.assertEqual([2, 3, 1], store.column("destination").tolist())
+
+        merged = merge_stores([store for site, store in results])
+        self.assertEqual(6, len(merged))
+        self.assertEqual(2, len(merged.people))
+        self.assertEqual([0, 0, 0, 1, 1, 1], merged.column("person").tolist())
+        self.assertEqual(results[1][1].people[0], merged.people[1])
+
+        lines = to_tagged_csv("north", results[0][1]).splitlines()
+        self.assertEqual(3, len(lines))
+        self.assertTrue(lines[0].startswith("north,28800.0,"))
+        self.assertTrue(lines[0].endswith(",work,1,1"))
@@ -0,0 +1,203 @@
+#!/usr/bin/env python
+# encoding: utf-8
+
+import io
+import os
+import random
+import shutil
+import sys
+import tempfile
+import unittest
+from datetime import timedelta
+from unittest import mock
+import simulation
+from elevator_simulation import agents, engine
+from elevator_simulation.checkpoint import snapshot, save_snapshot, load_snapshot, restore, fork_variants
+from elevator_simulation.readers.trips import read_trip_chunks
+from elevator_simulation.sinks import TripStore
+
+SCENARIO = os.path.join(os.path.dirname(__file__), "data", "simple.json")
+
+
+def create_simulation(people=40, seed=1, module=agents, strategy="call_strategy_all", **kwargs):
+    """creates a building where people with random morning schedules use two banks of elevators
+
+    :param seed int: the seed of the schedules and of the simulation
+    :param module module: where the simulation, elevator bank and person classes come from, agents or engine
+    :note: other keyword arguments are passed to the simulation
+    """
+    rng = random.Random(seed)
+    sim = module.Simulation(number_of_floors=20, trip_sink=TripStore(), seed=seed, **kwargs)
+    for _ in range(2):
+        bank = module.ElevatorBank(sim)
+        for _ in range(2):
+            bank.add_elevator(capacity=4)
+        sim.elevator_banks.append(bank)
+    for i in range(people):
+        person = module.Person(sim, elevator_call_strategy=strategy, uuid="{:032x}".format(i))
+        for _ in range(6):
+            start = timedelta(seconds=rng.randrange(7 * 3600, 9 * 3600))
+            person.schedule.add_event(start, sim.building.floors[rng.randrange(20)])
+        sim.people.append(person)
+    return sim
+
+
+def trips_of(store):
+    """returns the trips of the store as tuples, people given by identity"""
+    return list(zip([store.people[i] for i in store.column("person")], store.column("elevator_called_secs").tolist(),
+                    store.column("elevator_arrived_secs").tolist(), store.column("travel_secs").tolist()))
+
+
+def break_dispatch(simulation):
+    raise RuntimeError("broken variant")
+
+
+class TestCheckpoint(unittest.TestCase):
+    """Tests that simulations stopped at a checkpoint continue, and fork, from the state they stopped in."""
+
+    def setUp(self):
+        self.straight = create_simulation()
+        self.straight.run()
+
+    def tearDown(self):
+        pass
+
+    def test_continue(self):
+        """tests that a run stopped along the way records the trips of a run straight through"""
+        sim = create_simulation()
+        for until in (7.5 * 3600, 7.5 * 3600, 8 * 3600, 8 * 3600 + 0.5):
+            sim.run(until=until)
+            self.assertEqual(until, sim.env.now)
+        sim.run()
+        self.assertEqual(trips_of(self.straight.trip_sink), trips_of(sim.trip_sink))
+
+    def test_snapshot(self):
+        """tests that the snapshot holds the state of the model at the checkpoint"""
+        sim = create_simulation()
+        sim.run(until=8 * 3600)
+        state = snapshot(sim)
+        self.assertEqual(8 * 3600, state["time"])
+        self.assertEqual(len(sim.trip_sink), state["trips"])
+        self.assertEqual(4, len(state["elevators"]))
+        riding = sum(len(elevator["passengers"]) for elevator in state["elevators"])
+        waiting = sum(len(calls["people"]) for calls in state["waiting"]) // 2  # everyone calls both banks
+        self.assertGreater(riding + waiting, 0)
+        self.assertEqual(40, len(state["people"]))
+        self.assertTrue(all(0 < person["position"] <= 6 for person in state["people"]))
+
+    def test_resume(self):
+        """tests that a run of the events engine resumed from a snapshot records the trips of a run straight through"""
+        for fast_forward in (False, True):
+            settings = {"module": engine, "strategy": "call_strategy_random", "seed": 2, "fast_forward": fast_forward}
+            straight = create_simulation(**settings)
+            straight.run()
+            for until in (7.5 * 3600, 8 * 3600 + 0.5):
+                sim = create_simulation(**settings)
+                sim.run(until=until)
+                fh = io.StringIO()
+                save_snapshot(sim, fh)
+                fh.seek(0)
+                state = load_snapshot(fh)
+                self.assertIsNotNone(state["resume"])
+                resumed = create_simulation(**settings)
+                restore(resumed, state)
+                self.assertEqual(until, resumed.env.now)
+                self.assertEqual(state["trips"], resumed.trip_sink.written)
+                resumed.run()
+                self.assertGreater(len(resumed.trip_sink), 0)
+                self.assertEqual(trips_of(straight.trip_sink)[state["trips"]:], trips_of(resumed.trip_sink))
+                sim.run()
+                self.assertEqual(trips_of(straight.trip_sink), trips_of(sim.trip_sink))
+
+    def test_resume_invalid(self):
+        """tests that only snapshots of the events engine resume, into simulations which have not run yet"""
+        sim = create_simulation()
+        sim.run(until=8 * 3600)
+        state = snapshot(sim)
+        self.assertIsNone(state["resume"])
+        with self.assertRaisesRegex(ValueError, "only for inspection"):
+            restore(create_simulation(module=engine), state)
+        sim = create_simulation(module=engine)
+        sim.run(until=8 * 3600)
+        state = snapshot(sim)
+        with self.assertRaisesRegex(ValueError, "has not run yet"):
+            restore(sim, state)
+        with self.assertRaisesRegex(ValueError, "40 people, not 4 and 39"):
+            restore(create_simulation(people=39, module=engine), state)
+
+    def test_fork_variants(self):
+        """tests that forked variants carry on from the checkpoint, leaving the simulation as it was"""
+        sim = create_simulation()
+        sim.run(until=8 * 3600)
+        morning = len(sim.trip_sink)
+        results = list(fork_variants(sim, ["nearest_elevator", "eta"], max_workers=1))
+        self.assertEqual(["nearest_elevator", "eta"], [variant for variant, store in results])
+        self.assertEqual(trips_of(self.straight.trip_sink), trips_of(results[0][1]))
+        self.assertEqual(trips_of(self.straight.trip_sink)[:morning], trips_of(results[1][1])[:morning])
+        self.assertNotEqual(trips_of(self.straight.trip_sink), trips_of(results[1][1]))
+        self.assertEqual(8 * 3600, sim.env.now)
+        self.assertEqual(morning, len(sim.trip_sink))
+        self.assertEqual("nearest_elevator", sim.elevator_banks[0].dispatch_strategy)
+
+        sim.run()
+        self.assertEqual(trips_of(self.straight.trip_sink), trips_of(sim.trip_sink))
+
+    def test_failed_variant(self):
+        """tests that a variant failing in its process is reported"""
+        sim = create_simulation()
+        sim.run(until=8 * 3600)
+        with self.assertRaisesRegex(RuntimeError, "broken variant"):
+            list(fork_variants(sim, [break_dispatch]))
+
+
+class TestResumeOutput(unittest.TestCase):
+    """Tests that a run resumed from the command line adds its trips to the output file of the run up to the checkpoint."""
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.snapshot_file = os.path.join(self.directory, "snapshot.json")
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def run_main(self, *args):
+        with mock.patch.object(sys, "argv", ["simulation.py", "-i", SCENARIO, "--engine", "events"] + list(args)):
+            simulation.main()
+
+    def rows(self, filename):
+        """returns the lines of the csv file without the person column, whose uuids each run of the scenario mints"""
+        with open(filename, encoding="utf-8") as fh:
+            return [line.split(",")[:3] + line.split(",")[4:] for line in fh]
+
+    def run_resumed(self, sink, output_file):
+        """runs the scenario up to the checkpoint, then resumes it, into the same output file"""
+        self.run_main("--sink", sink, "-o", output_file, "--checkpoint", "10:00:00", "--snapshot_file", self.snapshot_file)
+        self.assertEqual(1, simulation.written_trips(output_file, sink))
+        self.run_main("--sink", sink, "-o", output_file, "--resume_from", self.snapshot_file)
+
+    def test_csv(self):
+        """tests that the resumed csv file holds the header once and the rows of a run straight through"""
+        straight = os.path.join(self.directory, "straight.csv")
+        self.run_main("--sink", "csv", "-o", straight)
+        resumed = os.path.join(self.directory, "resumed.csv")
+        self.run_resumed("csv", resumed)
+        self.assertEqual(4, len(self.rows(straight)))
+        self.assertEqual(self.rows(straight), self.rows(resumed))
+
+    def test_trips(self):
+        """tests that the resumed trip file holds the chunks of both runs"""
+        resumed = os.path.join(self.directory, "resumed.trips")
+        self.run_resumed("trips", resumed)
+        self.assertEqual([1, 2], [len(columns["person"]) for columns, _ in read_trip_chunks(resumed)])
+        self.assertEqual(3, simulation.written_trips(resumed, "trips"))
+
+    def test_mismatch(self):
+        """tests that a resumed run refuses an output file which does not hold the trips of the snapshot"""
+        output_file = os.path.join(self.directory, "resumed.csv")
+        self.run_main("--sink", "csv", "-o", output_file, "--checkpoint", "10:00:00", "--snapshot_file", self.snapshot_file)
+        with self.assertRaisesRegex(ValueError, "1 trips written before the snapshot, but '.*other.csv' holds no file"):
+            self.run_main("--sink", "csv", "-o", os.path.join(self.directory, "other.csv"), "--resume_from", self.snapshot_file)
+        self.run_main("--sink", "csv", "-o", output_file, "--resume_from", self.snapshot_file)
+        with self.assertRaisesRegex(ValueError, "holds 3"):
+            self.run_main("--sink", "csv", "-o", output_file, "--resume_from", self.snapshot_file)
+        self.assertEqual(4, len(self.rows(output_file)))
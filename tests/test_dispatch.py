@@ -0,0 +1,136 @@
+#!/usr/bin/env python
+# encoding: utf-8
+
+import itertools
+import unittest
+from elevator_simulation.models.building import Floor
+from elevator_simulation.models.elevator import ElevatorBank, nearest_elevator_dispatch_strategy
+from elevator_simulation.models.dispatch import DISPATCH_STRATEGIES, nearest_elevator
+from elevator_simulation.agents.person import goes_their_way
+
+
+class TestDispatchState(unittest.TestCase):
+    """Tests that the dispatch state follows the elevators of the bank."""
+
+    def setUp(self):
+        self.floors = [Floor(i+1) for i in range(10)]
+        self.ctrl = ElevatorBank(self.floors)
+        self.first_floor_elevator = self.ctrl.add_elevator(capacity=2)
+        self.fifth_floor_elevator = self.ctrl.add_elevator(starting_location=self.floors[4])
+        self.state = self.ctrl.dispatch_state
+
+    def tearDown(self):
+        pass
+
+    def test_elevator_changes_tracked(self):
+        """tests that changes to the elevators are written into the state arrays"""
+        self.assertEqual([1, 5], list(self.state.position))
+        self.assertEqual([2, 10], list(self.state.capacity))
+        self.fifth_floor_elevator.location = self.floors[8]
+        self.fifth_floor_elevator.direction = -1
+        self.first_floor_elevator.add_stop(self.floors[3])
+        self.first_floor_elevator.open_doors()
+        self.first_floor_elevator.enter(object())
+        self.assertEqual([1, 9], list(self.state.position))
+        self.assertEqual([0, -1], list(self.state.direction))
+        self.assertEqual([1, 0], list(self.state.stop_count))
+        self.assertEqual([1, 0], list(self.state.load))
+        self.first_floor_elevator.remove_stop(self.floors[3])
+        self.fifth_floor_elevator.direction = None
+        self.assertEqual([0, 0], list(self.state.stop_count))
+        self.assertEqual([0, 0], list(self.state.direction))
+
+    def test_nearest_elevator_matches(self):
+        """tests that the vectorized nearest elevator strategy agrees with the elevator by elevator one"""
+        elevators = self.ctrl.elevators
+        for first, fifth, level, direction in itertools.product(self.floors[::2], self.floors[1::2], self.floors, (1, -1)):
+            for first_direction, fifth_direction in itertools.product((1, -1, 0), repeat=2):
+                elevators[0].location, elevators[0].direction = first, first_direction
+                elevators[1].location, elevators[1].direction = fifth, fifth_direction
+                expected = nearest_elevator_dispatch_strategy(elevators, self.floors, level, direction)
+                self.assertIs(expected, elevators[nearest_elevator(self.state, level.level, direction)])
+
+    def test_eta(self):
+        """tests that the elevator expected to arrive first is dispatched"""
+        strategy = DISPATCH_STRATEGIES["eta"]
+        self.assertEqual(1, strategy(self.state, 7, -1))
+        # the fifth floor elevator heads up and away, the first floor elevator is closer in time
+        self.fifth_floor_elevator.direction = 1
+        self.assertEqual(0, strategy(self.state, 3, 1))
+        # stops add the time spent with the doors open
+        self.state.travel_secs[:] = 7
+        self.state.stop_secs[:] = 15
+        self.first_floor_elevator.add_stop(self.floors[1])
+        self.first_floor_elevator.add_stop(self.floors[2])
+        self.fifth_floor_elevator.direction = -1
+        self.assertEqual(1, strategy(self.state, 3, -1))
+
+    def test_load_balancing(self):
+        """tests that the least busy elevator is dispatched and full elevators are avoided"""
+        strategy = DISPATCH_STRATEGIES["load_balancing"]
+        self.assertEqual(0, strategy(self.state, 1, 1))
+        self.first_floor_elevator.open_doors()
+        self.first_floor_elevator.enter(object())
+        self.assertEqual(1, strategy(self.state, 1, 1))
+        self.fifth_floor_elevator.add_stop(self.floors[8])
+        self.fifth_floor_elevator.add_stop(self.floors[9])
+        self.assertEqual(0, strategy(self.state, 1, 1))
+        self.first_floor_elevator.enter(object())
+        self.assertEqual(1, strategy(self.state, 1, 1))
+
+    def test_destination(self):
+        """tests that riders going to the same floor are grouped and cars assigned their capacity are avoided"""
+        strategy = DISPATCH_STRATEGIES["destination"]
+        self.ctrl.dispatch_strategy = "destination"
+        self.assertTrue(self.ctrl.destination_dispatch)
+        self.assertIs(self.first_floor_elevator, self.ctrl.call_to(self.floors[0], 1, self.floors[6]))
+        self.assertEqual(1, self.state.assigned[0, 7])
+        # the fifth floor elevator would add a stop on the destination the first floor elevator already has riders for
+        self.fifth_floor_elevator.location = self.floors[0]
+        self.assertEqual(0, strategy(self.state, 1, 1, 7))
+        self.assertIs(self.first_floor_elevator, self.ctrl.call_to(self.floors[0], 1, self.floors[6]))
+        # the first floor elevator was assigned as many riders as it holds
+        self.assertEqual(1, strategy(self.state, 1, 1, 7))
+        self.ctrl.release(self.first_floor_elevator, self.floors[6])
+        self.assertEqual([1, 0], list(self.state.riders))
+        self.assertEqual(0, strategy(self.state, 1, 1, 7))
+
+    def test_goes_their_way(self):
+        """tests that riders only board their assigned car when it sets off their way, or has nowhere else to go"""
+        self.ctrl.dispatch_strategy = "destination"
+        car = self.fifth_floor_elevator
+        assigned = [(self.ctrl, self.ctrl.call_to(self.floors[4], -1, self.floors[1]))]
+        self.assertIs(car, assigned[0][1])
+        car.remove_stop(self.floors[4])  # the doors open on the caller's floor
+        self.assertTrue(goes_their_way(assigned, car, -1))
+        car.add_stop(self.floors[8])
+        self.assertFalse(goes_their_way(assigned, car, -1))
+        self.assertTrue(goes_their_way(assigned, car, 1))
+        # any car is boarded by riders of another bank, which are only notified of cars going their way
+        self.assertTrue(goes_their_way([], car, -1))
+
+    def test_hears_hall_events(self):
+        """tests that people waiting for their assigned car are notified of the elevators going either way"""
+        self.ctrl.wait(object(), self.floors[2], -1)
+        self.assertFalse(self.ctrl.hears_hall_events(self.floors[2], 1))
+        self.ctrl.dispatch_strategy = "destination"
+        self.assertTrue(self.ctrl.hears_hall_events(self.floors[2], 1))
+        self.assertFalse(self.ctrl.hears_hall_events(self.floors[3], 1))
+
+
+class TestDispatchByName(unittest.TestCase):
+    """Tests that elevator banks dispatch with the strategies registered by name."""
+
+    def test_call_to(self):
+        floors = [Floor(i+1) for i in range(10)]
+        for name in DISPATCH_STRATEGIES:
+            ctrl = ElevatorBank(floors, dispatch_strategy=name)
+            ctrl.add_elevator()
+            elevator = ctrl.add_elevator(starting_location=floors[8])
+            self.assertEqual(name, ctrl.dispatch_strategy)
+            self.assertIs(elevator, ctrl.call_to(floors[9], -1))
+            self.assertIn(floors[9], elevator.stops)
+
+    def test_unknown_strategy(self):
+        with self.assertRaises(ValueError):
+            ElevatorBank([Floor(1)], dispatch_strategy="fake_strategy")
@@ -72,3 +72,21 @@ class TestElevatorAgent(unittest.TestCase):
         self.sim.run()
         self.assertEqual(num_tests, len(self.elevator_bank.floors))
         self.assertFalse(self.elevator.stops)
+
+    def test_hall_event(self):
+        """tests that the people waiting on a floor share one event, triggered when an elevator opens for them"""
+        floor = self.sim.building.floors[0]
+        event = self.elevator_bank.hall_event("elevator_door_open", floor, 1)
+        self.assertIs(event, self.elevator_bank.hall_event("elevator_door_open", floor, 1.0))
+        self.assertIsNot(event, self.elevator_bank.hall_event("elevator_door_open", floor, -1))
+        with self.assertRaises(ValueError):
+            self.elevator_bank.hall_event("floor_reached", floor, 1)
+
+        person = Person(self.sim)
+        self.sim.env.run(until=1)
+        self.elevator_bank.wait(person, floor, 1)
+        self.elevator_bank.call_to(floor, 1)
+        self.sim.env.run(until=100)
+        self.assertTrue(event.processed)
+        self.assertIs(self.elevator, event.value)
+        self.assertIsNot(event, self.elevator_bank.hall_event("elevator_door_open", floor, 1))
@@ -35,6 +35,32 @@ class TestElevatorBank(unittest.TestCase):
         self.ctrl.add_elevator()
         self.assertEqual(3, len(self.ctrl.elevators))
 
+    def test_hall_calls(self):
+        """tests that waiting people are indexed by floor and direction in the order they called"""
+        floor = self.ctrl.floors[3]
+        first, second = object(), object()
+        self.assertFalse(self.ctrl.has_waiting(floor, 1))
+        self.assertIsNone(self.ctrl.hall_calls.first_call(floor, 1))
+
+        self.ctrl.wait(first, floor, 1, 10.0)
+        self.ctrl.wait(second, floor, 1.0, 12.0)
+        self.ctrl.wait(second, floor, -1, 13.0)
+        self.assertTrue(self.ctrl.has_waiting(floor, 1))
+        self.assertEqual([first, second], list(self.ctrl.hall_calls.waiting(floor, 1)))
+        self.assertEqual(frozenset([first, second]), self.ctrl.waiting_passengers(floor, 1))
+        self.assertEqual(2, self.ctrl.hall_calls.count(floor, 1))
+        self.assertEqual(1, self.ctrl.hall_calls.count(floor, -1))
+        self.assertEqual(10.0, self.ctrl.hall_calls.first_call(floor, 1))
+        self.assertIs(self.ctrl.hall_calls, self.ctrl.dispatch_state.hall_calls)
+
+        self.ctrl.stop_waiting(first, floor, 1)
+        self.assertEqual(1, self.ctrl.hall_calls.count(floor, 1))
+        self.assertEqual(12.0, self.ctrl.hall_calls.first_call(floor, 1))
+        with self.assertRaises(KeyError):
+            self.ctrl.stop_waiting(first, floor, 1)
+        with self.assertRaises(ValueError):
+            self.ctrl.wait(first, floor, 0)
+
     def test_dispatch_nearest_elevator(self):
         """tests that the nearest elevator is dispatched correctly according
         to the nearest elevator streategy.
@@ -108,6 +134,70 @@ class TestElevator(unittest.TestCase):
         with self.assertRaises(ValueError):
             self.elevator.remove_stop(self.ctrl.floors[1])
 
+    def test_stops_ahead(self):
+        """tests that the nearest stop ahead is found in either direction"""
+        floors = self.ctrl.floors
+        self.elevator.location = floors[4]
+        self.assertIsNone(self.elevator.nearest_stop_ahead(1))
+        for level in (2, 5, 8, 10):
+            self.elevator.add_stop(floors[level-1])
+        self.assertTrue(self.elevator.has_stops)
+        self.assertTrue(self.elevator.has_stop(floors[4]))
+        self.assertFalse(self.elevator.has_stop(floors[5]))
+        self.assertEqual(floors[7], self.elevator.nearest_stop_ahead(1))
+        self.assertEqual(floors[1], self.elevator.nearest_stop_ahead(-1))
+        self.assertIsNone(self.elevator.nearest_stop_ahead())  # idle
+
+        self.elevator.direction = 1
+        self.elevator.remove_stop(floors[7])
+        self.assertEqual(floors[9], self.elevator.nearest_stop_ahead())
+        self.elevator.location = floors[9]
+        self.assertFalse(self.elevator.has_stops_ahead())
+        self.assertTrue(self.elevator.has_stops_ahead(-1))
+
+    def test_levels(self):
+        """tests that the location and stops can be given as levels and are seen as floors"""
+        floors = self.ctrl.floors
+        self.elevator.level = 4
+        self.assertEqual(floors[3], self.elevator.location)
+        self.elevator.direction = 1
+        self.assertEqual(5, self.elevator.next_level)
+        self.assertEqual(floors[4], self.elevator.next_location)
+        self.elevator.add_stop(7)
+        self.elevator.add_stop(floors[7])
+        self.assertEqual(frozenset([floors[6], floors[7]]), self.elevator.stops)
+        self.assertTrue(self.elevator.has_stop(floors[6]))
+        self.assertEqual(3, self.elevator.distance(7))
+        self.elevator.remove_stop(floors[6])
+        self.assertFalse(self.elevator.has_stop(7))
+        with self.assertRaises(ValueError):
+            self.elevator.add_stop(11)
+
+    def test_next_direction(self):
+        """tests that the next direction keeps on to the stops ahead and turns back when there are none"""
+        floors = self.ctrl.floors
+        self.assertEqual(1, self.elevator.next_direction)  # bottom floor
+        self.elevator.location = floors[4]
+        self.assertEqual(0, self.elevator.next_direction)  # idle without stops
+        self.elevator.add_stop(floors[1])
+        self.assertEqual(1, self.elevator.next_direction)  # idle elevators set off upwards
+        self.elevator.direction = -1
+        self.assertEqual(-1, self.elevator.next_direction)
+        self.elevator.direction = 1
+        self.assertEqual(-1, self.elevator.next_direction)
+        self.elevator.add_stop(floors[8])
+        self.assertEqual(1, self.elevator.next_direction)
+        self.elevator.location = floors[8]
+        self.assertEqual(-1, self.elevator.next_direction)
+
+        # the same as moving towards any of the stops
+        for level in range(2, 10):
+            self.elevator.location = floors[level-1]
+            for direction in (1, -1):
+                self.elevator.direction = direction
+                towards = not all([self.elevator.moving_away(floor) for floor in self.elevator.stops])
+                self.assertEqual(direction if towards else -direction, self.elevator.next_direction)
+
     def test_distance(self):
         """tests that the distance between elevator and various levels is correct"""
         for floor in self.ctrl.floors:
@@ -0,0 +1,173 @@
+#!/usr/bin/env python
+# encoding: utf-8
+
+import os
+import random
+import unittest
+from datetime import timedelta
+from elevator_simulation import agents, engine
+from elevator_simulation.checkpoint import snapshot
+from elevator_simulation.engine import EventQueue, Channel, URGENT
+from elevator_simulation.readers.json import read_simulation
+
+
+data_directory = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data")
+
+
+def create_simulation(module, fast_forward=False, people=60, seed=1, dispatch_strategy="nearest_elevator"):
+    """creates a tall building where people with random schedules use two banks of small elevators
+
+    :param module module: agents or engine, the module of the simulation and agent classes
+    :param dispatch_strategy str: the dispatch strategy of the banks (def: nearest_elevator)
+    """
+    rng = random.Random(seed)
+    trips = []
+    sim = module.Simulation(number_of_floors=30, fast_forward=fast_forward)
+    for i in range(2):
+        bank = module.ElevatorBank(sim, uuid="b{:031x}".format(i), dispatch_strategy=dispatch_strategy)
+        for j in range(3):
+            bank.add_elevator(uuid="e{:031x}".format(3 * i + j), capacity=4)
+        sim.elevator_banks.append(bank)
+    for i in range(people):
+        person = module.Person(sim, uuid="{:032x}".format(i + 1), elevator_call_strategy="call_strategy_all",
+                               trip_complete=trips.append)
+        for _ in range(6):
+            start = timedelta(seconds=rng.randrange(7 * 3600, 8 * 3600))
+            person.schedule.add_event(start, sim.building.floors[rng.randrange(30)])
+        sim.people.append(person)
+    return sim, trips
+
+
+def trips_of(trips):
+    return [(trip.person, trip.start, trip.destination, trip.elevator_called_secs, trip.elevator_arrived_secs,
+             trip.travel_secs) for trip in trips]
+
+
+class TestEventQueue(unittest.TestCase):
+    """Tests that the event queue orders events as simpy does."""
+
+    def setUp(self):
+        self.env = EventQueue()
+        self.order = []
+
+    def tearDown(self):
+        pass
+
+    def test_order(self):
+        """tests that events are processed by time, then urgent first, then in the order they were scheduled"""
+        self.env.schedule(2, self.order.append, "late")
+        self.env.schedule(1, self.order.append, "first normal")
+        self.env.schedule(1, self.order.append, "urgent", URGENT)
+        self.env.timeout(1, self.order.append, "second normal")
+        self.env.run()
+        self.assertEqual(["urgent", "first normal", "second normal", "late"], self.order)
+        self.assertEqual(2, self.env.now)
+        self.assertEqual(4, self.env.processed)
+
+    def test_chain(self):
+        """tests that the timeouts of a chain keep the place of the first one among simultaneous events"""
+        chain = self.env.timeout_at(5, self.order.append, value="chain 1")
+        self.env.timeout_at(5, self.order.append, value="other")
+        self.env.timeout_at(5, self.order.append, chain, "chain 2")
+        self.env.run()
+        self.assertEqual(["chain 1", "chain 2", "other"], self.order)
+        with self.assertRaises(ValueError):
+            self.env.timeout_at(4, self.order.append)
+
+    def test_run_until(self):
+        """tests that a run leaves the events due at the time it stops at for the next run"""
+        self.env.schedule(3, self.order.append, 3)
+        self.env.run(until=3)
+        self.assertEqual([], self.order)
+        self.assertEqual(3, self.env.now)
+        self.env.run(until=4)
+        self.assertEqual([3], self.order)
+
+    def test_channel(self):
+        """tests that a notification reaches subscribers before waiters, and waiters only once"""
+        channel = Channel(self.env)
+        channel.notify()
+        self.assertEqual(0, len(self.env))
+        channel.wait(lambda value: self.order.append(("waiter", value)))
+        channel.subscribe(lambda value: self.order.append(("subscriber", value)))
+        channel.notify(1)
+        channel.notify(2)
+        self.env.run()
+        self.assertEqual([("waiter", 1), ("subscriber", 1), ("subscriber", 2)], self.order)
+        self.assertEqual(3, channel.notifications)
+        self.assertEqual(2, channel.deliveries)
+
+
+class TestEngine(unittest.TestCase):
+    """Tests that the event queue engine records the very trips of the simpy agents."""
+
+    def setUp(self):
+        pass
+
+    def tearDown(self):
+        pass
+
+    def test_same_trips(self):
+        """tests that both engines record the same trips in the same order, stepwise and fast forwarded"""
+        for fast_forward in (False, True):
+            results = []
+            for module in (agents, engine):
+                sim, trips = create_simulation(module, fast_forward)
+                sim.run()
+                results.append(trips_of(trips))
+            self.assertTrue(results[0])
+            self.assertEqual(results[0], results[1])
+
+    def test_same_scenario_trips(self):
+        """tests that both engines record the same trips on a scenario file, with people created lazily or not"""
+        for lazy in (False, True):
+            results = []
+            for name in ("simpy", "events"):
+                trips = []
+                sim = read_simulation(os.path.join(data_directory, "bala_all_call.json"), engine=name, lazy=lazy,
+                                      trip_complete=trips.append)
+                sim.run()
+                results.append(trips_of(trips))
+            self.assertEqual(results[0], results[1])
+
+    def test_destination_dispatch(self):
+        """tests that both engines record the same trips when people are assigned cars by destination"""
+        for fast_forward in (False, True):
+            results = []
+            for module in (agents, engine):
+                sim, trips = create_simulation(module, fast_forward, dispatch_strategy="destination")
+                sim.run()
+                results.append(trips_of(trips))
+                for bank in sim.elevator_banks:
+                    self.assertEqual(0, bank.dispatch_state.riders.sum())
+            self.assertTrue(results[0])
+            self.assertEqual(results[0], results[1])
+
+    def test_checkpoint(self):
+        """tests that both engines stop in the same state and carry on to the same trips"""
+        results = []
+        for module in (agents, engine):
+            sim, trips = create_simulation(module, fast_forward=True)
+            sim.run(until=7.5 * 3600)
+            state = snapshot(sim)
+            # what the engines wait for differs, only the events engine can resume from its snapshot
+            self.assertEqual(module is engine, state.pop("resume") is not None)
+            sim.run()
+            results.append((state, trips_of(trips)))
+        self.assertEqual(results[0], results[1])
+
+    def test_parked_people(self):
+        """tests that people between trips wait in the calendar, not in processes of their own"""
+        for module in (agents, engine):
+            sim, trips = create_simulation(module, people=10)
+            sim.run(until=7 * 3600)
+            self.assertEqual(10, len(sim.calendar))
+            if module is agents:
+                self.assertFalse(any(person.action.is_alive for person in sim.people))
+            sim.run()
+            self.assertEqual(0, len(sim.calendar))
+            self.assertTrue(trips)
+
+    def test_unknown_engine(self):
+        with self.assertRaises(ValueError):
+            read_simulation(os.path.join(data_directory, "bala_all_call.json"), engine="fake")
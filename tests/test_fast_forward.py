@@ -0,0 +1,135 @@
+#!/usr/bin/env python
+# encoding: utf-8
+
+import random
+import unittest
+from concurrent.futures import ProcessPoolExecutor
+from datetime import timedelta
+from elevator_simulation.agents import Simulation, ElevatorBank, Person
+
+
+def count_events(env, until):
+    """runs the environment until the given time, returns the number of events processed"""
+    events = 0
+    while env.peek() < until:
+        env.step()
+        events += 1
+    return events
+
+
+def create_simulation(fast_forward, people=60, seed=1):
+    """creates a tall building where people with random schedules use two banks of elevators"""
+    rng = random.Random(seed)
+    trips = []
+    sim = Simulation(number_of_floors=30, fast_forward=fast_forward)
+    for _ in range(2):
+        bank = ElevatorBank(sim)
+        for _ in range(3):
+            bank.add_elevator(capacity=4)
+        sim.elevator_banks.append(bank)
+    for _ in range(people):
+        person = Person(sim, elevator_call_strategy="call_strategy_all", trip_complete=trips.append)
+        for _ in range(6):
+            start = timedelta(seconds=rng.randrange(7 * 3600, 8 * 3600))
+            person.schedule.add_event(start, sim.building.floors[rng.randrange(30)])
+        sim.people.append(person)
+    return sim, trips
+
+
+def run_simulation(fast_forward):
+    """runs the simulation, returns its trips, people given by index, and the number of events processed"""
+    sim, trips = create_simulation(fast_forward)
+    events = count_events(sim.env, Simulation.EOD)
+    index = {person.uuid: i for i, person in enumerate(sim.people)}
+    trips = [(index[trip.person], trip.elevator_called_secs, trip.elevator_arrived_secs, trip.travel_secs) for trip in trips]
+    return trips, events
+
+
+class TestFastForward(unittest.TestCase):
+    """Tests that fast forwarded runs record the same trips as stepwise ones with fewer events."""
+
+    def setUp(self):
+        pass
+
+    def tearDown(self):
+        pass
+
+    def test_same_trips(self):
+        """tests that fast forwarding records exactly the trips of the stepwise run"""
+        # each run gets a fresh process, so that both create their people with the same identities
+        with ProcessPoolExecutor(max_workers=1) as executor:
+            stepwise_trips, stepwise_events = executor.submit(run_simulation, False).result()
+        with ProcessPoolExecutor(max_workers=1) as executor:
+            fast_trips, fast_events = executor.submit(run_simulation, True).result()
+        self.assertTrue(stepwise_trips)
+        self.assertEqual(stepwise_trips, fast_trips)
+        self.assertLess(fast_events, stepwise_events)
+
+    def test_express_leg(self):
+        """tests that an elevator travels to a distant stop with one timeout and arrives on time"""
+        sim = Simulation(number_of_floors=30, fast_forward=True)
+        bank = ElevatorBank(sim)
+        elevator = bank.add_elevator()
+        sim.elevator_banks.append(bank)
+        sim.env.run(until=1)
+        elevator.add_stop(sim.building.floors[29])
+        events = count_events(sim.env, 29 * elevator.elevator_travel_secs + 1)
+        self.assertEqual(1, elevator.location.level)
+        events += count_events(sim.env, 29 * elevator.elevator_travel_secs + 2)
+        self.assertEqual(30, elevator.location.level)
+        self.assertLess(events, 5)
+
+    def test_catch_up(self):
+        """tests that the bank sees where a fast forwarding elevator is when dispatching"""
+        sim = Simulation(number_of_floors=30, fast_forward=True)
+        bank = ElevatorBank(sim)
+        elevator = bank.add_elevator()
+        sim.elevator_banks.append(bank)
+        sim.env.run(until=1)
+        elevator.add_stop(sim.building.floors[29])
+        sim.env.run(until=10 * elevator.elevator_travel_secs + 2)
+        bank.call_to(sim.building.floors[29], -1)
+        self.assertEqual(11, elevator.location.level)
+
+    def test_interrupted_leg(self):
+        """tests that a stop added on the way cuts the leg short at the time a stepwise elevator would stop"""
+        arrivals = []
+        for fast_forward in (False, True):
+            sim = Simulation(number_of_floors=30, fast_forward=fast_forward)
+            bank = ElevatorBank(sim)
+            elevator = bank.add_elevator()
+            sim.elevator_banks.append(bank)
+            sim.env.run(until=1)
+            elevator.add_stop(sim.building.floors[29])
+            sim.env.run(until=10 * elevator.elevator_travel_secs + 2)
+            elevator.add_stop(sim.building.floors[14])
+            opened = []
+            while len(opened) < 2:
+                sim.env.step()
+                if elevator.is_open and (not opened or opened[-1][1] != elevator.location.level):
+                    opened.append((sim.env.now, elevator.location.level))
+            arrivals.append(opened)
+        self.assertEqual([15, 30], [level for _, level in arrivals[1]])
+        self.assertEqual(arrivals[0], arrivals[1])
+
+    def test_skip_events(self):
+        """tests that a person skips the events on their current floor without waking up for each"""
+        results = []
+        for fast_forward in (False, True):
+            sim = Simulation(number_of_floors=10, fast_forward=fast_forward)
+            bank = ElevatorBank(sim)
+            bank.add_elevator()
+            sim.elevator_banks.append(bank)
+            trips = []
+            person = Person(sim, trip_complete=trips.append)
+            for hours in range(1, 8):
+                person.schedule.add_event(timedelta(hours=hours), sim.building.floors[0])
+            person.schedule.add_event(timedelta(hours=8), sim.building.floors[5])
+            sim.people.append(person)
+            events = count_events(sim.env, timedelta(hours=8).total_seconds())
+            sim.run()
+            self.assertEqual(1, len(trips))
+            results.append((events, trips[0].elevator_called_secs, trips[0].travel_secs))
+        self.assertLess(results[1][0], results[0][0])
+        self.assertEqual(results[0][1:], results[1][1:])
+        self.assertEqual(timedelta(hours=8).total_seconds(), results[1][1])
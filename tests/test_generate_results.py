@@ -0,0 +1,74 @@
+#!/usr/bin/env python
+# encoding: utf-8
+
+import csv
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+from unittest import mock
+import generate_results
+from elevator_simulation.data import ElevatorTrip
+from elevator_simulation.sinks import ChunkedTripSink, CsvTripSink
+
+
+def make_trip(i):
+    trip = ElevatorTrip()
+    trip.elevator_called_secs = 8 * 3600.0 + 60 * i
+    trip.elevator_arrived_secs = trip.elevator_called_secs + 5 * (i % 4)
+    trip.travel_secs = 20.0 + 7 * (i % 3)
+    trip.person = "{:032x}".format(i)
+    trip.start = 1
+    trip.destination = 2 + i % 3
+    trip.description = "work"
+    trip.direction = 1
+    trip.distance = 1 + i % 3
+    return trip
+
+
+class TestGenerateResults(unittest.TestCase):
+    """Tests that the results script aggregates trip files chunk by chunk into its tables."""
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.trips = [make_trip(i) for i in range(30)]
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def generate(self, input_file, suffix, *args):
+        argv = ["generate_results.py", "-i", input_file, "-d", self.directory, "--file_suffix", suffix] + list(args)
+        with mock.patch.object(sys, "argv", argv):
+            generate_results.main()
+        tables = dict()
+        for name in ("travel", "wait"):
+            for table in ("time_histogram", "time_by_time_of_day", "time_by_distance"):
+                with open(os.path.join(self.directory, "{}_{}{}.csv".format(name, table, suffix)), encoding="utf-8") as fh:
+                    tables[name, table] = list(csv.reader(fh))
+        return tables
+
+    def test_chunked_trip_file(self):
+        """tests the tables of a trip file written in several chunks, and of the same trips as csv read in chunks"""
+        trip_file = os.path.join(self.directory, "trips.bin")
+        with open(trip_file, "wb") as fh:
+            with ChunkedTripSink(fh, chunk_size=7) as sink:
+                for trip in self.trips:
+                    sink.append(trip)
+        tables = self.generate(trip_file, "_trips")
+
+        histogram = tables["wait", "time_histogram"]
+        self.assertEqual(["secs", "trips"], histogram[0])
+        self.assertEqual(30, sum(int(trips) for secs, trips in histogram[1:]))
+        by_distance = tables["travel", "time_by_distance"]
+        self.assertEqual(["distance", "trips", "percentile", "secs"], by_distance[0])
+        self.assertEqual(["1", "10", "p50", "20.0"], by_distance[1])
+        self.assertEqual(9, len(by_distance) - 1)  # three distances, three percentiles
+        self.assertEqual(["28800", "15", "p50"], tables["wait", "time_by_time_of_day"][1][:3])
+
+        csv_file = os.path.join(self.directory, "trips.csv")
+        with open(csv_file, "w", encoding="utf-8") as fh:
+            with CsvTripSink(fh) as sink:
+                for trip in self.trips:
+                    sink.append(trip)
+        self.assertEqual(tables, self.generate(csv_file, "_csv", "--chunk_size", "4"))
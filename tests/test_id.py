@@ -0,0 +1,67 @@
+#!/usr/bin/env python
+# encoding: utf-8
+
+import os
+import unittest
+import uuid
+from elevator_simulation.models import IdentMixin, IdentRegistry
+from elevator_simulation.readers.json import read_simulation
+
+
+class TestIdentMixin(unittest.TestCase):
+    """Tests the integer identities and their uuid side table."""
+
+    def test_sequential_idents(self):
+        """tests that objects get distinct sequential integers which they hash by"""
+        first, second = IdentMixin(), IdentMixin()
+        self.assertEqual(first.ident + 1, second.ident)
+        self.assertEqual(first.ident, hash(first))
+        self.assertNotEqual(first, second)
+
+    def test_uuid_round_trip(self):
+        """tests that the uuid passed in is kept and maps back to the same identity"""
+        value = uuid.uuid4()
+        obj = IdentMixin(uuid=value.hex)
+        self.assertEqual(value.hex, obj.uuid)
+        same = IdentMixin(uuid=str(value))
+        self.assertEqual(obj.ident, same.ident)
+        self.assertEqual(obj, same)
+
+    def test_generated_uuid(self):
+        """tests that uuids are generated once on demand and identify the object afterwards"""
+        obj = IdentMixin()
+        value = obj.uuid
+        self.assertEqual(32, len(value))
+        self.assertEqual(value, obj.uuid)
+        self.assertEqual(obj, IdentMixin(uuid=value))
+
+    def test_registries(self):
+        """tests that objects of different registries are never equal, and registries do not share their tables"""
+        first, second = IdentRegistry(), IdentRegistry()
+        value = uuid.uuid4().hex
+        obj, other = IdentMixin(uuid=value, idents=first), IdentMixin(idents=second)
+        self.assertEqual(1, obj.ident)
+        self.assertEqual(1, other.ident)
+        self.assertNotEqual(obj, other)
+        self.assertEqual(1, len(first))
+        self.assertEqual(0, len(second))  # comparing did not generate a uuid
+
+        # the same uuid in two registries: equal objects would have to hash alike, so they are never equal
+        same = IdentMixin(uuid=value, idents=second)
+        self.assertNotEqual(obj, same)
+        self.assertNotIn(same, {obj})
+        self.assertEqual(same, IdentMixin(uuid=value, idents=second))
+        self.assertIn(IdentMixin(uuid=value, idents=second), {same})
+        self.assertNotEqual(obj, "not an object with an identity")
+
+    def test_simulation_registry(self):
+        """tests that each simulation identifies its objects in a registry of its own"""
+        path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "simple.json")
+        first, second = read_simulation(path), read_simulation(path)
+        self.assertIsNot(first.idents, second.idents)
+        self.assertEqual(len(first.idents), len(second.idents))
+        for simulation in (first, second):
+            for agent in simulation.people + simulation.elevator_banks + list(simulation.elevator_banks[0].elevators):
+                self.assertIs(simulation.idents, agent.idents)
+        # the people of the scenario have no uuid, each simulation generates its own
+        self.assertNotEqual(first, second)
@@ -5,10 +5,17 @@ import json
 import os
 import tempfile
 import unittest
-from elevator_simulation.readers.json import read_simulation
+from elevator_simulation.readers.json import read_simulation, build_simulation
 from elevator_simulation.generators.json import write_simulation
 
 
+def identities(simulation):
+    """returns the uuids of the people, elevator banks and elevators of the simulation, which identify them across
+    simulations"""
+    return ([person.uuid for person in simulation.people], [bank.uuid for bank in simulation.elevator_banks],
+            [elevator.uuid for bank in simulation.elevator_banks for elevator in bank.elevators])
+
+
 class TestJSONGenerator(unittest.TestCase):
     """Test that the json generator and reader is able to read json files correcly."""
 
@@ -25,9 +32,10 @@ class TestJSONGenerator(unittest.TestCase):
             write_simulation(self.simulation, fh)
 
         sim = read_simulation(fh.name)
-        self.assertEqual(self.simulation, sim)
+        self.assertEqual(identities(self.simulation), identities(sim))
+        self.assertNotEqual(self.simulation, sim)  # objects of different simulations are never equal
         sim2 = read_simulation(self.simple_test_file)
-        self.assertNotEqual(sim, sim2)
+        self.assertNotEqual(identities(sim), identities(sim2))
 
 
 class TestJSONReader(unittest.TestCase):
@@ -77,3 +85,51 @@ class TestJSONReader(unittest.TestCase):
                 self.assertEqual(event_data["start"], event.start_time.total_seconds())
                 self.assertEqual(event_data["level"], event.location.level)
             i += 1
+
+
+class TestJSONStreamingReader(unittest.TestCase):
+    """Tests that the json reader decodes files incrementally and can create people lazily."""
+
+    def setUp(self):
+        test_data_path = os.path.join(os.path.dirname(__file__), "data")
+        self.simple_test_file = os.path.join(test_data_path, "simple.json")
+        with open(self.simple_test_file, "r", encoding="utf-8") as f:
+            self.data = json.load(f)
+        self.data["people"][0]["uuid"] = "8e42031ab549420ab9627a40a806bc22"
+
+    def tearDown(self):
+        pass
+
+    def test_small_chunks(self):
+        """tests that values spanning chunk boundaries are decoded the same way"""
+        with tempfile.NamedTemporaryFile("w", encoding="utf-8", delete=False) as fh:
+            json.dump(self.data, fh, indent=1)
+
+        expected = build_simulation(self.data)
+        for chunk_size in (1, 7, 64):
+            sim = read_simulation(fh.name, chunk_size=chunk_size)
+            self.assertEqual(len(expected.people), len(sim.people))
+            self.assertEqual(expected.people[0].uuid, sim.people[0].uuid)
+            self.assertEqual(expected.people[0].schedule, sim.people[0].schedule)
+        os.remove(fh.name)
+
+    def test_people_before_building(self):
+        """tests that people listed before the building are still read"""
+        with tempfile.NamedTemporaryFile("w", encoding="utf-8", delete=False) as fh:
+            fh.write(json.dumps({"people": self.data["people"], "building": self.data["building"], "elevator_banks": self.data["elevator_banks"]}))
+
+        sim = read_simulation(fh.name, chunk_size=16)
+        os.remove(fh.name)
+        self.assertEqual(1, len(sim.people))
+        self.assertEqual(3, len(sim.people[0].schedule))
+
+    def test_lazy_people(self):
+        """tests that lazily created people only exist once their first event is due"""
+        trips = []
+        sim = read_simulation(self.simple_test_file, lazy=True, trip_complete=trips.append)
+        self.assertEqual(0, len(sim.people))
+        sim.env.run(until=28799)
+        self.assertEqual(0, len(sim.people))
+        sim.run()
+        self.assertEqual(1, len(sim.people))
+        self.assertEqual([2, 3, 1], [trip.destination for trip in trips])
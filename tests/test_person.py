@@ -87,3 +87,44 @@ class TestSchedule(unittest.TestCase):
         for next_event in self.schedule.events[1:]:
             self.assertLess(event, next_event)
             event = next_event
+
+    def test_next_event(self):
+        """tests that the next event is the first one starting at or after the given time."""
+        floor2 = Floor(level=2)
+        self.schedule.add_event(timedelta(hours=9), floor2, "work")
+        self.schedule.add_event(timedelta(hours=17), self.floor, "home")
+        self.assertEqual("work", self.schedule.next_event(timedelta(hours=8)).description)
+        self.assertEqual("work", self.schedule.next_event(timedelta(hours=9)).description)
+        self.assertEqual("home", self.schedule.next_event(timedelta(hours=9, seconds=1)).description)
+        self.assertIsNone(self.schedule.next_event(timedelta(hours=18)))
+
+    def test_advance(self):
+        """tests that the cursor moves forward through the schedule without returning events twice."""
+        self.schedule.add_event(timedelta(hours=9), self.floor, "work")
+        self.schedule.add_event(timedelta(hours=12), self.floor, "lunch")
+        self.schedule.add_event(timedelta(hours=17), self.floor, "home")
+        self.assertEqual("work", self.schedule.advance(timedelta(hours=8)).description)
+        self.assertEqual(1, self.schedule.position)
+        self.assertEqual("lunch", self.schedule.advance(timedelta(hours=8)).description)
+        self.assertEqual("home", self.schedule.advance(timedelta(hours=13)).description)
+        self.assertIsNone(self.schedule.advance(timedelta(hours=13)))
+        self.assertEqual(3, self.schedule.position)
+
+        # events inserted before the cursor do not move it backwards
+        self.schedule.add_event(timedelta(hours=10), self.floor, "tea")
+        self.assertEqual(4, self.schedule.position)
+
+        self.schedule.rewind()
+        self.assertEqual("work", self.schedule.advance(timedelta()).description)
+
+    def test_add_events(self):
+        """tests that events added in bulk are sorted and merged with the existing events."""
+        self.schedule.add_event(timedelta(hours=5), self.floor, "existing")
+        self.schedule.advance(timedelta())
+        self.schedule.add_events([timedelta(hours=h) for h in (9, 1, 7)], [self.floor] * 3, ["nine", "one", "seven"])
+        self.assertEqual(["one", "existing", "seven", "nine"], [event.description for event in self.schedule.events])
+        self.assertEqual(2, self.schedule.position)
+        self.assertEqual("seven", self.schedule.advance(timedelta()).description)
+
+        with self.assertRaises(TypeError):
+            self.schedule.add_events([timedelta()], [None], ["bad"])
@@ -4,6 +4,7 @@
 import logging
 import unittest
 from elevator_simulation.agents import Person, Simulation, ElevatorBank
+from elevator_simulation.agents.person import CallStream, stream_name
 from datetime import timedelta
 
 
@@ -57,3 +58,26 @@ class TestPersonAgent(unittest.TestCase):
         self.sim.env.run(until=until_time)
         self.assertEqual(self.first_elevator.location, self.person.schedule.events[2].location)
         self.assertEqual(self.person.location, self.person.schedule.events[2].location)
+
+    def test_call_stream(self):
+        """tests that the stream of a call only depends on the seed, the person and the number of calls before it"""
+        first = CallStream(3, "person", 2)
+        draws = [first.random() for _ in range(100)] + [first.randint(0, 4) for _ in range(100)]
+        again = CallStream(3, "person", 2)
+        self.assertEqual(draws, [again.random() for _ in range(100)] + [again.randint(0, 4) for _ in range(100)])
+        self.assertTrue(all(0.0 <= value < 1.0 for value in draws[:100]))
+        self.assertEqual({0, 1, 2, 3, 4}, set(draws[100:]))
+        self.assertNotEqual(draws[0], CallStream(3, "person", 1).random())
+        self.assertNotEqual(draws[0], CallStream(3, "other", 2).random())
+        self.assertNotEqual(draws[0], CallStream(4, "person", 2).random())
+
+    def test_stream_name(self):
+        """tests that a seeded person draws from the streams of its uuid, or of its index without a uuid"""
+        self.assertEqual("abc", stream_name(1, "abc", 4))
+        self.assertEqual("#4", stream_name(1, None, 4))
+        self.assertIsNone(stream_name(None, None, None))
+        seeded = Simulation(number_of_floors=10, seed=1)
+        with self.assertRaisesRegex(ValueError, "uuid or its index"):
+            Person(seeded)
+        self.assertEqual(Person(seeded, index=4).rng.random(), Person(seeded, index=4).rng.random())
+        self.assertNotEqual(Person(seeded, index=4).rng.random(), Person(seeded, index=5).rng.random())
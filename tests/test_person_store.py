@@ -0,0 +1,93 @@
+#!/usr/bin/env python
+# encoding: utf-8
+
+import json
+import random
+import unittest
+import numpy as np
+from elevator_simulation.checkpoint import snapshot, restore
+from elevator_simulation.data import to_csv
+from elevator_simulation.engine import PersonStore
+from elevator_simulation.generators.population import generate_population, generate_elevator_banks, build_simulation
+
+
+class TestPersonStore(unittest.TestCase):
+    """Tests that people held in arrays record the trips of people created as agents up front."""
+
+    def setUp(self):
+        self.population = generate_population(300, [5, 15], np.random.default_rng(2), floors=20, breaks_per_day=2)
+        self.elevator_banks = generate_elevator_banks(np.random.default_rng(2), num_elevator_banks=2, num_elevators_per_bank=3)
+
+    def tearDown(self):
+        pass
+
+    def build(self, compact, **kwargs):
+        random.seed(1)  # people of unseeded simulations draw from the shared random stream
+        trips = []
+        sim = build_simulation(self.population, {"floors": 20}, self.elevator_banks, engine="events", compact=compact,
+                               trip_complete=trips.append, **kwargs)
+        return sim, trips
+
+    def test_same_trips(self):
+        """tests that the people of the store make the same trips, stepwise and fast forwarded, seeded or not"""
+        for fast_forward in (False, True):
+            for seed in (None, 4):
+                results = []
+                for compact in (False, True):
+                    sim, trips = self.build(compact, seed=seed)
+                    sim.fast_forward = fast_forward
+                    sim.run()
+                    results.append([to_csv(trip) for trip in trips])
+                self.assertTrue(results[0])
+                self.assertEqual(results[0], results[1])
+
+    def test_store(self):
+        """tests that the people only exist in the arrays of the store"""
+        sim, trips = self.build(True)
+        self.assertIsInstance(sim.population, PersonStore)
+        self.assertEqual([], sim.people)
+        self.assertEqual(300, len(sim.population))
+        self.assertEqual(self.population.uuids[7], sim.population.uuid(7))
+        self.assertEqual(0, sim.population.level.sum())
+        sim.run()
+        self.assertTrue((sim.population.level > 0).all())
+        self.assertGreaterEqual(sim.population.calls.sum(), len(trips))
+        self.assertEqual(0, len(sim.calendar))
+
+    def test_snapshot(self):
+        """tests that a stopped simulation has the state it would have with agents"""
+        states = []
+        for compact in (False, True):
+            sim, trips = self.build(compact)
+            sim.run(until=8 * 3600)
+            state = snapshot(sim)
+            # agents and the store wait for their events differently
+            self.assertIsNotNone(state.pop("resume"))
+            states.append(state)
+        self.assertEqual(300, len(states[1]["people"]))
+        self.assertEqual(states[0], states[1])
+
+    def test_resume(self):
+        """tests that the people of the store resume from a snapshot with the trips of a run straight through"""
+        sim, trips = self.build(True)
+        sim.run()
+        sim, before = self.build(True)
+        sim.run(until=12 * 3600)
+        state = json.loads(json.dumps(snapshot(sim)))
+        resumed, after = self.build(True)
+        random.seed(2)  # the calls of unseeded people draw from the state of the shared stream in the snapshot
+        restore(resumed, state)
+        resumed.run()
+        self.assertTrue(before)
+        self.assertTrue(after)
+        self.assertEqual([to_csv(trip) for trip in trips], [to_csv(trip) for trip in before + after])
+
+    def test_engine(self):
+        """tests that only the events engine runs the people of a store"""
+        with self.assertRaises(ValueError):
+            build_simulation(self.population, {"floors": 20}, self.elevator_banks, compact=True)
+
+    def test_unknown_call_strategy(self):
+        """tests that a call strategy the people do not know is reported by name"""
+        with self.assertRaisesRegex(ValueError, "call_strategy_nearest"):
+            self.build(True, call_strategy="call_strategy_nearest")
@@ -0,0 +1,64 @@
+#!/usr/bin/env python
+# encoding: utf-8
+
+import io
+import json
+import os
+import tempfile
+import unittest
+import numpy as np
+from elevator_simulation.generators.population import DESCRIPTIONS, generate_population, generate_elevator_banks, write_json, write_binary
+from elevator_simulation.readers.binary import BinaryScenario
+
+
+class TestPopulation(unittest.TestCase):
+    """Tests that populations drawn at once have the schedules of a working day and are written as scenarios."""
+
+    def setUp(self):
+        self.kwargs = dict(floors=20, breaks_per_day=3, call_strategy="call_strategy_all")
+        self.population = generate_population(500, [5, 15], np.random.default_rng(1), **self.kwargs)
+        self.elevator_banks = generate_elevator_banks(np.random.default_rng(1), num_elevator_banks=2, num_elevators_per_bank=3)
+        self.directory = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_schedules(self):
+        """tests that every person works, lunches and takes breaks on the expected floors and in order"""
+        population = self.population
+        self.assertEqual(500, len(population))
+        self.assertEqual(500, len(set(population.uuids)))
+        self.assertTrue(np.all(np.diff(population.event_person) >= 0))
+        counts = np.bincount(population.event_description, minlength=len(DESCRIPTIONS))
+        self.assertEqual([500] * 4, counts[:4].tolist())
+        self.assertEqual(counts[4], counts[5])
+        self.assertGreater(counts[4], 500)
+
+        for i in range(0, 500, 50):
+            events = population.event_person == i
+            starts = population.event_start[events]
+            levels = population.event_level[events]
+            descriptions = [DESCRIPTIONS[d] for d in population.event_description[events]]
+            self.assertTrue(np.all(np.diff(starts) >= 0))
+            self.assertEqual("starting the work day", descriptions[0])
+            self.assertEqual("ending the work day", descriptions[-1])
+            self.assertEqual(1, levels[-1])
+            self.assertTrue(6 * 3600 <= starts[0] <= 10 * 3600)
+            self.assertTrue(2 <= levels[0] <= 20)
+            self.assertIn(levels[descriptions.index("going to lunch")], (5, 15))
+
+        same = generate_population(500, [5, 15], np.random.default_rng(1), **self.kwargs)
+        np.testing.assert_array_equal(population.event_start, same.event_start)
+
+    def test_write(self):
+        """tests that the json and binary scenarios written from the arrays hold the same people"""
+        fh = io.StringIO()
+        write_json(self.population, {"floors": 20}, self.elevator_banks, fh, chunk_size=64)
+        data = json.loads(fh.getvalue())
+        self.assertEqual(3, len(data["elevator_banks"][1]["elevators"]))
+        self.assertEqual(500, len(data["people"]))
+
+        binary_file = os.path.join(self.directory.name, "population.sim")
+        with open(binary_file, "wb") as fh:
+            write_binary(self.population, {"floors": 20}, self.elevator_banks, fh)
+        self.assertEqual(data, BinaryScenario(binary_file).to_data())
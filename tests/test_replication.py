@@ -0,0 +1,66 @@
+#!/usr/bin/env python
+# encoding: utf-8
+
+import json
+import os
+import tempfile
+import unittest
+from elevator_simulation.replication import Replication, read_scenario, replications, build_replication, run_replication, run_replications, compare
+
+
+class TestReplication(unittest.TestCase):
+    """Tests that seeded replications are repeatable and compare strategies with common random numbers."""
+
+    def setUp(self):
+        self.settings = {"people": 60, "lunch_on_floor": [4], "floors": 8, "num_elevator_banks": 2,
+                         "num_elevators_per_bank": 1}
+        self.directory = tempfile.TemporaryDirectory()
+        self.scenario_file = os.path.join(self.directory.name, "population.json")
+        with open(self.scenario_file, "w", encoding="utf-8") as f:
+            json.dump({"population": self.settings}, f)
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_replications(self):
+        """tests that every seed runs every combination of strategies"""
+        scenario = read_scenario(self.scenario_file)
+        self.assertEqual(self.settings, scenario)
+        runs = replications(scenario, range(3), call_strategy=["call_strategy_all", "call_strategy_random"])
+        self.assertEqual(6, len(runs))
+        self.assertEqual([0, 0, 1, 1, 2, 2], [run.seed for run in runs])
+
+    def test_common_random_numbers(self):
+        """tests that replications sharing a seed share schedules and person streams, whatever the strategy"""
+        one = build_replication(Replication(self.settings, "call_strategy_all", None, 7))
+        other = build_replication(Replication(self.settings, "call_strategy_random", "eta", 7))
+        self.assertEqual([person.uuid for person in one.people], [person.uuid for person in other.people])
+        self.assertEqual(one.people[5].schedule.events, other.people[5].schedule.events)
+        self.assertEqual("eta", other.elevator_banks[0].dispatch_strategy)
+        one_rng, other_rng = one.people[5].rng, other.people[5].rng
+        self.assertEqual([one_rng.random() for _ in range(3)], [other_rng.random() for _ in range(3)])
+
+        different = build_replication(Replication(self.settings, "call_strategy_all", None, 8))
+        self.assertNotEqual(one.people[5].schedule.events, different.people[5].schedule.events)
+
+    def test_run_replications(self):
+        """tests that a replication gives the same summary in any process"""
+        runs = replications(self.settings, [1, 2], call_strategy=["call_strategy_random"])
+        results = list(run_replications(runs, max_workers=2))
+        self.assertEqual(runs, [run for run, summary in results])
+        self.assertEqual(results[1][1], run_replication(runs[1])[1])
+        self.assertGreater(results[0][1]["trips"], 0)
+
+    def test_compare(self):
+        """tests that combinations are compared with the first one seed by seed"""
+        results = [(Replication(None, strategy, None, seed), {"wait_mean": value, "wait_p95": value * 2})
+                   for seed, base in enumerate([10.0, 20.0, 30.0])
+                   for strategy, value in (("a", base), ("b", base + 5.0))]
+        rows = compare(results)
+        self.assertEqual(["a", "b"], [row["call_strategy"] for row in rows])
+        self.assertEqual(3, rows[1]["replications"])
+        self.assertAlmostEqual(25.0, rows[1]["wait_mean"])
+        self.assertAlmostEqual(4.303 * 10.0 / 3 ** 0.5, rows[1]["wait_mean_ci"])
+        self.assertAlmostEqual(5.0, rows[1]["wait_mean_diff"])
+        self.assertAlmostEqual(0.0, rows[1]["wait_mean_diff_ci"])
+        self.assertAlmostEqual(10.0, rows[1]["wait_p95_diff"])
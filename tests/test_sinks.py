@@ -0,0 +1,133 @@
+#!/usr/bin/env python
+# encoding: utf-8
+
+import io
+import os
+import tempfile
+import unittest
+import numpy as np
+from elevator_simulation.data import ElevatorTrip, to_csv_header
+from elevator_simulation.readers.json import read_simulation
+from elevator_simulation.readers.trips import read_trip_chunks
+from elevator_simulation.sinks import CsvTripSink, NpyTripSink, ChunkedTripSink, TripStore
+
+
+def make_trip(i):
+    trip = ElevatorTrip()
+    trip.elevator_called_secs = 100.0 + i
+    trip.elevator_arrived_secs = 110.0 + i
+    trip.travel_secs = 30.0
+    trip.person = "{:032x}".format(i)
+    trip.start = 1
+    trip.destination = 2 + i % 3
+    trip.description = "work" if i % 2 else "lunch"
+    trip.direction = 1
+    trip.distance = 1 + i % 3
+    return trip
+
+
+class TestTripSinks(unittest.TestCase):
+    """Tests that trip sinks buffer trips and write them out in bulk."""
+
+    def setUp(self):
+        self.trips = [make_trip(i) for i in range(10)]
+
+    def tearDown(self):
+        pass
+
+    def test_csv_sink(self):
+        """tests that trips are only written when the buffer fills up or is flushed"""
+        fh = io.StringIO()
+        sink = CsvTripSink(fh, chunk_size=4)
+        for trip in self.trips[:3]:
+            sink.append(trip)
+        self.assertEqual(0, sink.written)
+        sink.append(self.trips[3])
+        self.assertEqual(4, sink.written)
+        for trip in self.trips[4:]:
+            sink(trip)
+        sink.close()
+        self.assertEqual(10, sink.written)
+
+        lines = fh.getvalue().splitlines()
+        self.assertEqual(to_csv_header(ElevatorTrip), lines[0])
+        self.assertEqual("101.0,111.0,30.0,{:032x},1,3,work,1,2".format(1), lines[2])
+        self.assertEqual(11, len(lines))
+
+    def test_chunked_sink(self):
+        """tests that the chunked binary trip file reads back chunk by chunk"""
+        with tempfile.NamedTemporaryFile(delete=False) as fh:
+            with ChunkedTripSink(fh, chunk_size=4) as sink:
+                for trip in self.trips:
+                    sink.append(trip)
+
+        chunks = list(read_trip_chunks(fh.name))
+        os.remove(fh.name)
+        self.assertEqual([4, 4, 2], [len(columns["person"]) for columns, descriptions in chunks])
+        called = np.concatenate([columns["elevator_called_secs"] for columns, descriptions in chunks])
+        self.assertEqual([trip.elevator_called_secs for trip in self.trips], called.tolist())
+        columns, descriptions = chunks[-1]
+        self.assertEqual(["lunch", "work"], [descriptions[i] for i in columns["description"]])
+        self.assertEqual("{:032x}".format(9).encode("ascii"), columns["person"][-1])
+
+    def test_npy_sink(self):
+        """tests that the npy sink saves every trip into one structured array"""
+        with tempfile.TemporaryDirectory() as directory:
+            filename = os.path.join(directory, "trips.npy")
+            with NpyTripSink(filename, chunk_size=3) as sink:
+                for trip in self.trips:
+                    sink.append(trip)
+            trips = np.load(filename)
+
+        self.assertEqual(10, len(trips))
+        self.assertEqual([trip.description for trip in self.trips], trips["description"].tolist())
+        self.assertEqual([trip.person for trip in self.trips], trips["person"].tolist())
+        self.assertEqual([trip.distance for trip in self.trips], trips["distance"].tolist())
+
+    def test_simulation_sink(self):
+        """tests that people record their trips in the trip sink of the simulation"""
+        test_data_path = os.path.join(os.path.dirname(__file__), "data")
+        simulation = read_simulation(os.path.join(test_data_path, "simple.json"))
+        fh = io.StringIO()
+        simulation.trip_sink = CsvTripSink(fh, header=False)
+        simulation.run()
+        self.assertEqual(3, simulation.trip_sink.written)
+        self.assertEqual(["2", "3", "1"], [line.split(",")[5] for line in fh.getvalue().splitlines()])
+
+    def test_trip_store(self):
+        """tests that the store grows its columns, numbers people and summarizes the trips"""
+        store = TripStore(capacity=2, chunk_size=3)
+        for trip in self.trips + self.trips[:2]:
+            store.append(trip)
+        self.assertEqual(12, len(store))
+        self.assertEqual(list(range(10)) + [0, 1], store.column("person").tolist())
+        self.assertEqual("{:032x}".format(3), store.people[3])
+        self.assertEqual(["lunch", "work"], [store.descriptions[i] for i in store.column("description")[:2]])
+
+        summary = store.summary()
+        self.assertEqual(12, summary["trips"])
+        self.assertEqual(10.0, summary["wait_p99"])
+        self.assertEqual(30.0, summary["travel_mean"])
+
+        by_floor = store.by_floor("destination")
+        self.assertEqual([2, 3, 4], by_floor["level"].tolist())
+        self.assertEqual([5, 4, 3], by_floor["trips"].tolist())
+        destinations = store.column("destination")
+        for level, median in zip(by_floor["level"], by_floor["wait_p50"]):
+            self.assertEqual(np.median(store.wait_secs[destinations == level]), median)
+        self.assertEqual([0], store.by_hour()["hour"].tolist())
+        self.assertEqual(30.0, store.by_hour()["travel_mean"][0])
+
+    def test_trip_store_extend(self):
+        """tests that extending a store renumbers the people and descriptions of the other store onto its own"""
+        store, other = TripStore(), TripStore()
+        for trip in self.trips[:4]:
+            store.append(trip)
+        for trip in self.trips[3:0:-1]:
+            other.append(trip)
+        store.extend(other)
+        self.assertEqual(7, len(store))
+        self.assertEqual([0, 1, 2, 3, 3, 2, 1], store.column("person").tolist())
+        self.assertEqual(["lunch", "work", "lunch", "work", "work", "lunch", "work"],
+                         [store.descriptions[i] for i in store.column("description")])
+        self.assertEqual(other.column("destination").tolist(), store.column("destination")[4:].tolist())
@@ -0,0 +1,75 @@
+#!/usr/bin/env python
+# encoding: utf-8
+
+import unittest
+import numpy as np
+from elevator_simulation.stats import percentiles, grouped_percentiles, histogram_percentiles, TripHistograms
+from elevator_simulation.stats import t_quantile, confidence_interval
+
+
+class TestStats(unittest.TestCase):
+    """Tests that percentiles are computed per group like numpy computes them for one."""
+
+    def setUp(self):
+        rng = np.random.RandomState(0)
+        self.groups = rng.randint(0, 5, size=1000)
+        self.values = rng.exponential(30.0, size=1000)
+
+    def tearDown(self):
+        pass
+
+    def test_grouped_percentiles(self):
+        """tests that the percentiles of every group match numpy.percentile"""
+        keys, counts, result = grouped_percentiles(self.groups, self.values, (0, 50, 95, 99, 100))
+        self.assertEqual(list(range(5)), keys.tolist())
+        self.assertEqual(np.bincount(self.groups).tolist(), counts.tolist())
+        for i, key in enumerate(keys):
+            np.testing.assert_allclose(np.percentile(self.values[self.groups == key], (0, 50, 95, 99, 100)), result[:, i])
+
+    def test_empty(self):
+        """tests that there are no groups and nan percentiles without values"""
+        keys, counts, result = grouped_percentiles(np.zeros(0, dtype=np.int64), np.zeros(0))
+        self.assertEqual(0, len(keys))
+        self.assertEqual((3, 0), result.shape)
+        self.assertTrue(np.isnan(percentiles(np.zeros(0))).all())
+
+    def test_histogram_percentiles(self):
+        """tests that percentiles of whole seconds read off 1 second histograms match numpy.percentile's lower ones"""
+        values = np.floor(self.values)
+        counts = np.bincount(values.astype(np.int64))
+        result = histogram_percentiles(np.vstack((counts, np.zeros_like(counts))), 1, (0, 50, 95, 100))
+        np.testing.assert_array_equal(np.percentile(values, (0, 50, 95, 100), method="inverted_cdf"), result[:, 0])
+        self.assertTrue(np.isnan(result[:, 1]).all())
+
+    def test_trip_histograms(self):
+        """tests that trips added in chunks are counted by distance, time of day and overall"""
+        called = np.arange(1000) * 90.0
+        columns = {"elevator_called_secs": called, "elevator_arrived_secs": called + np.floor(self.values),
+                   "travel_secs": np.floor(self.values) + 10, "distance": self.groups}
+        histograms = TripHistograms(bin_secs=1, max_secs=100, bucket_secs=3600)
+        for start in range(0, 1000, 300):
+            histograms.add({name: column[start:start + 300] for name, column in columns.items()})
+
+        self.assertEqual(1000, histograms.trips)
+        self.assertEqual(1000, histograms.wait.sum())
+        self.assertEqual((5, 101), histograms.travel_by_distance.shape)
+        self.assertEqual(np.bincount(self.groups).tolist(), histograms.wait_by_distance.sum(axis=1).tolist())
+        self.assertEqual(np.bincount((called % 86400 // 3600).astype(np.int64)).tolist(),
+                         histograms.wait_by_time.sum(axis=1).tolist())
+        self.assertEqual((self.values >= 100).sum(), histograms.wait[-1])
+        waits = np.minimum(np.floor(self.values[self.groups == 2]), 100)
+        np.testing.assert_array_equal(np.percentile(waits, (50, 95), method="inverted_cdf"),
+                                      histograms.percentiles(histograms.wait_by_distance, (50, 95))[:, 2])
+
+    def test_confidence_interval(self):
+        """tests the t quantiles interpolated in the table and the intervals of the mean built from them"""
+        self.assertAlmostEqual(12.706, t_quantile(1))
+        self.assertAlmostEqual(2.042, t_quantile(30))
+        # the exact quantiles are 2.0301, 1.9845 and 1.9623
+        self.assertAlmostEqual(2.030, t_quantile(35), places=3)
+        self.assertAlmostEqual(1.984, t_quantile(100), places=3)
+        self.assertAlmostEqual(1.962, t_quantile(1000), places=3)
+        mean, half_width = confidence_interval([1.0, 2.0, 3.0, 4.0])
+        self.assertEqual(2.5, mean)
+        self.assertAlmostEqual(3.182 * np.std([1, 2, 3, 4], ddof=1) / 2, half_width)
+        self.assertTrue(np.isnan(confidence_interval([1.0])[1]))
@@ -0,0 +1,74 @@
+#!/usr/bin/env python
+# encoding: utf-8
+
+import json
+import os
+import random
+import tempfile
+import unittest
+from elevator_simulation.data import to_csv
+from elevator_simulation.readers.json import build_simulation
+from elevator_simulation.sweep import Configuration, sweep_configurations, apply_configuration, run_configuration, run_sweep
+
+
+class TestSweep(unittest.TestCase):
+    """Tests that parameter sweeps expand and run every configuration."""
+
+    def setUp(self):
+        test_data_path = os.path.join(os.path.dirname(__file__), "data")
+        self.simple_test_file = os.path.join(test_data_path, "simple.json")
+        with open(self.simple_test_file, "r", encoding="utf-8") as f:
+            self.data = json.load(f)
+
+    def tearDown(self):
+        pass
+
+    def test_configurations(self):
+        """tests that every point of the parameter grid becomes a configuration"""
+        configurations = sweep_configurations([self.simple_test_file], elevators_per_bank=[1, 2, 3], seed=[1, 2])
+        self.assertEqual(6, len(configurations))
+        self.assertEqual(6, len(set(configurations)))
+        for configuration in configurations:
+            self.assertIsNone(configuration.elevator_capacity)
+            self.assertIsNone(configuration.call_strategy)
+
+    def test_apply_configuration(self):
+        """tests that the configuration settings are applied to a copy of the simulation data"""
+        configuration = Configuration(self.simple_test_file, 3, 4, "call_strategy_all", None, "eta")
+        data = apply_configuration(self.data, configuration)
+        self.assertEqual(2, len(self.data["elevator_banks"][0]["elevators"]))
+        self.assertEqual(3, len(data["elevator_banks"][0]["elevators"]))
+        for elevator in data["elevator_banks"][0]["elevators"]:
+            self.assertEqual(4, elevator["capacity"])
+        for person in data["people"]:
+            self.assertEqual("call_strategy_all", person["elevator_call_strategy"])
+        self.assertEqual("eta", data["elevator_banks"][0]["strategy"])
+
+        data = apply_configuration(self.data, configuration._replace(elevators_per_bank=1))
+        self.assertEqual(1, len(data["elevator_banks"][0]["elevators"]))
+
+    def test_run_sweep(self):
+        """tests that each configuration is simulated and its trips are returned with it"""
+        configurations = sweep_configurations([self.simple_test_file], elevators_per_bank=[1, 2])
+        results = list(run_sweep(configurations, max_workers=2))
+        self.assertEqual(configurations, [configuration for configuration, trips in results])
+        for configuration, trips in results:
+            self.assertEqual(3, len(trips))
+            self.assertEqual([2, 3, 1], [trip.destination for trip in trips])
+
+    def test_seeded_configuration(self):
+        """tests that the people of a seeded configuration draw their calls from the streams of the seed"""
+        data = dict(self.data, elevator_banks=self.data["elevator_banks"] * 2)  # a choice of banks to call
+        data["people"] = [dict(person, uuid="{:032x}".format(i)) for i, person in enumerate(data["people"] * 20)]
+        with tempfile.TemporaryDirectory() as directory:
+            scenario = os.path.join(directory, "two_banks.json")
+            with open(scenario, "w", encoding="utf-8") as f:
+                json.dump(data, f)
+            configuration = Configuration(scenario, None, None, "call_strategy_random", 3, None)
+            random.seed(1)  # whatever else touched the shared stream in the worker
+            swept = [to_csv(trip) for trip in run_configuration(configuration)[1]]
+        trips = []
+        simulation = build_simulation(apply_configuration(data, configuration), trip_complete=trips.append, seed=3)
+        simulation.run()
+        self.assertEqual(60, len(swept))
+        self.assertEqual([to_csv(trip) for trip in trips], swept)
@@ -0,0 +1,54 @@
+#!/usr/bin/env python
+# encoding: utf-8
+
+import os
+import shutil
+import tempfile
+import unittest
+from datetime import timedelta
+from elevator_simulation.agents import Simulation, ElevatorBank, Person
+from elevator_simulation.agents import trace
+
+
+class TestTrace(unittest.TestCase):
+    """Tests that agents trace what they do by category into a ring buffer."""
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.sim = Simulation(number_of_floors=10, trace=0)
+        bank = ElevatorBank(self.sim)
+        self.elevator = bank.add_elevator()
+        self.sim.elevator_banks.append(bank)
+        self.person = Person(self.sim)
+        self.person.schedule.add_event(timedelta(hours=1), self.sim.building.floors[5])
+        self.sim.people.append(self.person)
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_categories(self):
+        """tests that only the enabled categories are traced"""
+        self.sim.tracer.keep_records(100)
+        self.sim.tracer.enable(trace.DOORS | trace.PEOPLE)
+        self.sim.tracer.disable(trace.PEOPLE)
+        self.sim.run()
+        records = self.sim.tracer.records()
+        self.assertEqual([trace.ELEVATOR_AT_STOP] * 2, list(records["kind"]))
+        self.assertEqual([1, 6], list(records["level"]))
+        self.assertEqual(self.elevator.ident, records["agent"][0])
+        self.assertEqual("3600.0: elevator({}) is at stop on floor 1, opening doors".format(self.elevator.ident), trace.describe(records[0]))
+
+    def test_ring_buffer(self):
+        """tests that the ring buffer keeps the most recent records, oldest first, and saves them"""
+        self.sim.tracer.enable(trace.ALL)
+        self.sim.run()
+        self.assertEqual(0, len(self.sim.tracer.records()))
+
+        tracer = trace.Tracer(trace.ALL)
+        tracer.keep_records(3)
+        for time in range(5):
+            tracer.trace(time, trace.PERSON_RESUMING, 1)
+        self.assertEqual([2, 3, 4], list(tracer.records()["time"]))
+        filename = os.path.join(self.directory, "trace.npy")
+        tracer.save(filename)
+        self.assertEqual([2, 3, 4], list(trace.load_trace(filename)["time"]))
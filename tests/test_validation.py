@@ -0,0 +1,80 @@
+#!/usr/bin/env python
+# encoding: utf-8
+
+import unittest
+from elevator_simulation import typecheck, validated, set_validation, get_validation
+from elevator_simulation.models.building import Floor
+from elevator_simulation.models.elevator import ElevatorBank
+
+
+class TestValidation(unittest.TestCase):
+    """Tests that validation can be strict, sampled or switched off."""
+
+    def setUp(self):
+        self.mode = get_validation()
+        self.checked = []
+        floors = [Floor(i+1) for i in range(10)]
+        self.elevator = ElevatorBank(floors).add_elevator()
+
+    def tearDown(self):
+        set_validation(self.mode, interval=100)
+
+    def check(self, value):
+        self.checked.append(value)
+        if value < 0:
+            raise ValueError("negative")
+
+    def test_strict(self):
+        """tests that every call is validated in strict mode"""
+        set_validation("strict")
+        f = validated(self.check)(lambda value: value)
+        self.assertEqual([1, 2], [f(1), f(2)])
+        self.assertEqual([1, 2], self.checked)
+        with self.assertRaises(ValueError):
+            f(-1)
+        with self.assertRaises(TypeError):
+            self.elevator.location = 1
+        with self.assertRaises(ValueError):
+            self.elevator.level = 11
+
+    def test_sampled(self):
+        """tests that one call in every interval is validated in sampled mode"""
+        set_validation("sampled", interval=3)
+        f = validated(self.check)(lambda value: value)
+        for value in range(7):
+            f(value)
+        self.assertEqual([0, 3, 6], self.checked)
+
+    def test_off(self):
+        """tests that functions decorated in off mode are not wrapped, and others stop checking"""
+        set_validation("strict")
+        checked = validated(self.check)(lambda value: value)
+        set_validation("off")
+        f = lambda value: value
+        self.assertIs(f, validated(self.check)(f))
+        self.assertIs(f, typecheck(f))
+        self.assertEqual(-1, checked(-1))
+        self.assertEqual([], self.checked)
+        self.elevator.level = 11  # checked when the model was imported, but switched off
+
+    def test_typecheck(self):
+        """tests that annotated argument and return types are asserted"""
+        set_validation("strict")
+
+        @typecheck
+        def f(a: int, b: str = "") -> int:
+            return a
+
+        self.assertEqual(1, f(1, b="x"))
+        with self.assertRaises(AssertionError):
+            f("1")
+        with self.assertRaises(AssertionError):
+            f(1, b=2)
+
+    def test_bad_mode(self):
+        """tests that unknown modes and intervals are rejected"""
+        with self.assertRaises(ValueError):
+            set_validation("sometimes")
+        with self.assertRaises(ValueError):
+            set_validation("sampled", interval=0)
+        self.assertEqual(self.mode, get_validation())